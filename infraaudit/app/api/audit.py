@@ -1,9 +1,13 @@
-from fastapi import APIRouter, HTTPException
-from app.models.audit import AuditRequest, AuditResponse
+from fastapi import APIRouter, HTTPException, Query
+from app.api.responses import AuditResponseCache
+from app.models.audit import AuditDiffResponse, AuditRequest, AuditResponse
+from app.services.admission import AdmissionRejected
 from app.services.audit_service import AuditService
 
 router = APIRouter()
 audit_service = AuditService()
+# 점검 응답은 response_model 재검증 없이 직접 직렬화 (response_model은 API 문서용)
+audit_responses = AuditResponseCache()
 
 @router.post("/start", response_model=AuditResponse)
 async def start_audit(request: AuditRequest):
@@ -12,9 +16,20 @@ async def start_audit(request: AuditRequest):
             request.account_id,
             request.role_name,
             request.checks,
-            request.external_id
+            request.external_id,
+            check_timeout=request.check_timeout,
+            deadline=request.deadline,
+            wait=request.wait,
+            force_refresh=request.force_refresh,
+            spill=request.spill,
+            mode=request.mode,
+            max_api_calls=request.max_api_calls,
+            api_call_limits=request.api_call_limits,
+            fail_only=request.fail_only
         )
-        return result
+        return audit_responses.render(result)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -22,6 +37,28 @@ async def start_audit(request: AuditRequest):
 async def get_audit_status(audit_id: str):
     try:
         status = audit_service.get_audit_status(audit_id)
-        return status
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
+    return audit_responses.render(status)
+
+@router.get("/diff", response_model=AuditDiffResponse)
+async def diff_audits(from_audit_id: str = Query(..., alias="from"), to_audit_id: str = Query(..., alias="to")):
+    try:
+        audit_service.get_audit_status(from_audit_id)
+        audit_service.get_audit_status(to_audit_id)
+    except Exception as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    try:
+        return audit_service.diff_audits(from_audit_id, to_audit_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.delete("/{audit_id}", response_model=AuditResponse)
+async def cancel_audit(audit_id: str):
+    try:
+        audit = audit_service.get_audit_status(audit_id)
+    except Exception as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if audit['status'] not in ('queued', 'running'):
+        raise HTTPException(status_code=409, detail=f"Audit {audit_id} is already {audit['status']}")
+    return audit_responses.render(await audit_service.cancel_audit(audit_id))
@@ -0,0 +1,69 @@
+import os
+from collections import OrderedDict
+from typing import Dict, Iterator
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from app.core.serialization import dumps
+from app.models.audit import AuditResponse, CheckResult
+from app.services.result_sink import iter_spilled_results
+
+# 응답에 포함하는 필드 (response_model=AuditResponse와 같은 출력을 검증/복사 없이 생성)
+AUDIT_FIELDS = tuple(AuditResponse.model_fields)
+RESULT_FIELDS = tuple(CheckResult.model_fields)
+# 더 이상 바뀌지 않는 점검 상태 (직렬화 결과를 캐시)
+FINAL_STATUSES = ('completed', 'partial', 'cancelled', 'failed')
+# 캐시에 보관하는 응답 본문 크기 합계 상한(MB). 넘으면 가장 오래 조회되지 않은 점검부터 제거. 0이면 캐시하지 않음
+RESPONSE_CACHE_LIMIT = int(float(os.environ.get('AUDIT_RESPONSE_CACHE_MB', '64')) * 1024 * 1024)
+
+def audit_payload(audit: Dict) -> Dict:
+    """점검 기록에서 AuditResponse 필드만 추림 (내부 전용 필드 raw, policy_documents 등은 제외)"""
+    payload = {field: audit.get(field) for field in AUDIT_FIELDS}
+    if payload['results'] is not None:
+        payload['results'] = [{field: result.get(field) for field in RESULT_FIELDS} for result in payload['results']]
+    return payload
+
+def spilled_body(audit: Dict) -> Iterator[bytes]:
+    """spill 모드 점검의 응답 본문. 디스크에 기록된 결과 줄을 그대로 results 배열에 이어 붙임 (결과 전체를 메모리에 올리지 않음)"""
+    payload = audit_payload(audit)
+    del payload['results']
+    head = dumps(payload)
+    yield head[:-1] + b',"results":['
+    first = True
+    for line in iter_spilled_results(audit['spill']['directory'], audit['spill']['checks']):
+        yield line if first else b',' + line
+        first = False
+    yield b']}'
+
+class AuditResponseCache:
+    """점검 응답 직렬화 결과(bytes) 캐시. 끝난 점검은 한 번만 직렬화하고 이후 조회는 같은 bytes를 반환
+
+    본문 크기 합계가 limit 바이트를 넘으면 가장 오래 조회되지 않은 점검부터 제거한다 (LRU).
+    limit보다 큰 본문은 보관하지 않는다.
+    """
+
+    def __init__(self, limit: int = RESPONSE_CACHE_LIMIT):
+        self.limit = limit
+        self._bodies: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._size = 0
+
+    def render(self, audit: Dict) -> Response:
+        if audit.get('spill'):
+            # 결과가 디스크에 있는 점검은 캐시하지 않고 조회할 때마다 파일에서 읽어 보냄
+            return StreamingResponse(spilled_body(audit), media_type='application/json')
+        body = self._bodies.get(audit['audit_id'])
+        if body is None:
+            body = dumps(audit_payload(audit))
+            if audit['status'] in FINAL_STATUSES:
+                self._store(audit['audit_id'], body)
+        else:
+            self._bodies.move_to_end(audit['audit_id'])
+        return Response(content=body, media_type='application/json')
+
+    def _store(self, audit_id: str, body: bytes) -> None:
+        if len(body) > self.limit:
+            return
+        self._bodies[audit_id] = body
+        self._size += len(body)
+        while self._size > self.limit:
+            _, evicted = self._bodies.popitem(last=False)
+            self._size -= len(evicted)
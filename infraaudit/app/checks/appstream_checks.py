@@ -3,6 +3,7 @@ from typing import List, Dict
 
 class AppStreamOverlyPermissiveCheck(BaseCheck):
     """AppStream 2.0 환경을 통한 과도한 권한 및 자격 증명 탈취"""
+    cost_hint = 5
 
     def _find_vulnerable_statements(self, policy_document: Dict) -> List[Dict]:
         vulnerable_statements = []
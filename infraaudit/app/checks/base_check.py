@@ -1,20 +1,96 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import Any, AsyncIterator, List, Dict, Iterable, Optional, Tuple, Union
 import boto3
+from app.core.inventory import AuditInventory
+from .result_record import CheckResultRecord
+
+class RawRecord:
+    """스트리밍 체크가 내보내는 raw 항목 (결과와 구분하기 위한 래퍼)"""
+    __slots__ = ('data',)
+    
+    def __init__(self, data: Any):
+        self.data = data
 
 class BaseCheck(ABC):
-    def __init__(self, session: boto3.Session):
+    # 체크가 사용하는 인벤토리 데이터셋 (app.core.inventory.DATASETS). AuditService가 실행 전에 한 번씩 동시에 조회
+    requires: Tuple[str, ...] = ()
+    # 실행 기록이 없을 때 스케줄링에 사용하는 예상 실행 시간(초). 리소스마다 API를 호출하는 체크는 크게 설정
+    cost_hint: float = 1.0
+    # summary 모드 점검 여부 (AuditService가 설정). True면 결과의 details와 raw 항목을 만들지 않아도 됨
+    summary_only: bool = False
+    # FAIL 대상만 서버 측 필터로 조회할 수 있는 체크가 fail_only 점검에서 requires 대신 사용하는 데이터셋
+    fail_only_requires: Optional[Tuple[str, ...]] = None
+    # fail_only 점검 여부 (AuditService가 fail_only_requires를 선언한 체크에만 설정). True면 PASS 결과를 만들지 않음
+    fail_only: bool = False
+    
+    def __init__(self, session: boto3.Session, inventory: AuditInventory = None):
         self.session = session
+        # 점검 단위로 공유되는 인벤토리 (단독 실행 시에는 체크 전용 인벤토리 사용)
+        self.inventory = inventory if inventory is not None else AuditInventory(session)
+        # get_result로 만든 결과 (시간 초과로 중단된 경우 그때까지의 결과를 부분 결과로 사용, 스트리밍 체크는 None)
+        self.emitted_results: Optional[List[Dict]] = []
     
     @abstractmethod
     async def check(self) -> List[Dict]:
         pass
     
-    def get_result(self, status: str, resource_id: str, message: str, details: Dict = None) -> Dict:
-        return {
-            'check_id': self.__class__.__name__,
-            'status': status,
-            'resource_id': resource_id,
-            'message': message,
-            'details': details or {}
-        }
\ No newline at end of file
+    @classmethod
+    def datasets(cls, fail_only: bool = False) -> Tuple[str, ...]:
+        """점검 전에 미리 조회할 데이터셋 (fail_only 점검이면 fail_only_requires 우선)"""
+        if fail_only and cls.fail_only_requires is not None:
+            return cls.fail_only_requires
+        return cls.requires
+    
+    def dataset(self, name: str) -> Any:
+        """선언한 데이터셋의 읽기 전용 뷰 (미리 조회되지 않았다면 이때 조회)"""
+        return self.inventory.dataset(name)
+    
+    def get_result(self, status: str, resource_id: str, message: str, details: Dict = None,
+                   params: Tuple = None) -> CheckResultRecord:
+        """결과 1건 생성. params를 주면 message는 str.format 템플릿으로 보관되고 응답을 만들 때 렌더링된다"""
+        if self.summary_only:
+            details = None
+        result = CheckResultRecord(self.__class__.__name__, status, resource_id, message, params, details)
+        if self.emitted_results is not None:
+            self.emitted_results.append(result)
+        return result
+    
+    def raw_record(self, data: Any) -> RawRecord:
+        return RawRecord(data)
+    
+    def network_exposure(self, group_ids: Iterable[str], port: int, description_contains: str = None) -> Optional[Dict]:
+        """보안 그룹/포트 기준 리소스의 인터넷 노출 정보 (네트워크 정보 조회 실패 시 None)
+
+        도달성 데이터(서브넷/라우트/NACL/ENI)는 처음 호출될 때 조회하므로, 점검할 리소스가 있을 때만 호출한다.
+        """
+        try:
+            return self.inventory.reachability().resource_exposure(group_ids, port, description_contains)
+        except Exception:
+            return None
+
+class StreamingCheck(BaseCheck):
+    """결과와 raw 항목을 만드는 즉시 내보내는(yield) 체크
+
+    stream()은 get_result()로 만든 결과와 raw_record()로 감싼 raw 항목을 async generator로 내보낸다.
+    AuditService는 스트림을 바로 소비하므로 체크 객체는 결과를 쌓아 두지 않으며(emitted_results 없음),
+    check()는 단독 실행을 위해 기존 형식({'results', 'raw', 'guideline_id'})으로 모아 반환한다.
+    """
+    guideline_id: Optional[int] = None
+    
+    def __init__(self, session: boto3.Session, inventory: AuditInventory = None):
+        super().__init__(session, inventory)
+        self.emitted_results = None
+    
+    @abstractmethod
+    def stream(self) -> AsyncIterator[Union[CheckResultRecord, RawRecord]]:
+        pass
+    
+    async def check(self) -> Dict:
+        results = []
+        raw = []
+        async for item in self.stream():
+            if isinstance(item, RawRecord):
+                raw.append(item.data)
+            else:
+                results.append(item)
+        return {'results': results, 'raw': raw, 'guideline_id': self.guideline_id}
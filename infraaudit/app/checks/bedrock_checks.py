@@ -3,6 +3,8 @@ from typing import List, Dict
 
 class BedrockModelAccessCheck(BaseCheck):
     """Bedrock 모델 접근 권한 점검"""
+    requires = ('iam.users_with_policies', 'iam.roles_with_policies')
+    cost_hint = 5
     
     def _find_vulnerable_bedrock_statements(self, policy_document: Dict) -> List[Dict]:
         vulnerable_statements = []
@@ -40,143 +42,68 @@ class BedrockModelAccessCheck(BaseCheck):
         return vulnerable_statements
     
     async def check(self) -> Dict:
-        iam = self.session.client('iam')
         results = []
         raw = []
         vulnerable_principals = set()
 
         try:
-            # IAM 사용자 스캔
-            user_paginator = iam.get_paginator('list_users')
-            total_users = 0
+            users = self.dataset('iam.users_with_policies')
+            roles = self.dataset('iam.roles_with_policies')
+            total_users = len(users)
+            total_roles = len(roles)
+            labels = {'user': '사용자', 'role': '역할'}
             
-            for page in user_paginator.paginate():
-                for user in page['Users']:
-                    total_users += 1
-                    user_name = user['UserName']
-                    user_arn = user['Arn']
-                    
-                    user_data = {
-                        'type': 'user',
-                        'name': user_name,
-                        'arn': user_arn,
-                        'vulnerable_policies': []
-                    }
-                    
-                    # 인라인 정책 스캔
-                    inline_policies = iam.list_user_policies(UserName=user_name).get('PolicyNames', [])
-                    for policy_name in inline_policies:
-                        response = iam.get_user_policy(UserName=user_name, PolicyName=policy_name)
-                        policy_doc = response['PolicyDocument']
-                        
-                        vuln_stmts = self._find_vulnerable_bedrock_statements(policy_doc)
-                        if vuln_stmts:
-                            vulnerable_principals.add(user_arn)
-                            user_data['vulnerable_policies'].append({
-                                'name': policy_name,
-                                'type': 'inline',
-                                'vulnerable_statements': vuln_stmts
-                            })
-                            results.append(self.get_result(
-                                'FAIL', user_name,
-                                f"사용자 [{user_name}]의 인라인 정책 [{policy_name}]에 과도한 Bedrock 권한(Resource: '*')이 있습니다.",
-                                {"principal_arn": user_arn, "policy_name": policy_name, "vulnerable_statements": vuln_stmts}
-                            ))
-
-                    # 연결된 정책 스캔
-                    attached_policies = iam.list_attached_user_policies(UserName=user_name).get('AttachedPolicies', [])
-                    for policy in attached_policies:
-                        policy_arn = policy['PolicyArn']
-                        if "aws:iam::aws:policy" in policy_arn:
-                            continue
-                            
-                        policy_details = iam.get_policy(PolicyArn=policy_arn)
-                        version_id = policy_details['Policy']['DefaultVersionId']
-                        policy_version = iam.get_policy_version(PolicyArn=policy_arn, VersionId=version_id)
-                        policy_doc = policy_version['PolicyVersion']['Document']
-
-                        vuln_stmts = self._find_vulnerable_bedrock_statements(policy_doc)
-                        if vuln_stmts:
-                            vulnerable_principals.add(user_arn)
-                            user_data['vulnerable_policies'].append({
-                                'arn': policy_arn,
-                                'type': 'attached',
-                                'vulnerable_statements': vuln_stmts
-                            })
-                            results.append(self.get_result(
-                                'FAIL', user_name,
-                                f"사용자 [{user_name}]에 연결된 정책 [{policy_arn}]에 과도한 Bedrock 권한(Resource: '*')이 있습니다.",
-                                {"principal_arn": user_arn, "policy_arn": policy_arn, "vulnerable_statements": vuln_stmts}
-                            ))
-                    
-                    if user_data['vulnerable_policies']:
-                        raw.append(user_data)
-
-            # IAM 역할 스캔
-            role_paginator = iam.get_paginator('list_roles')
-            total_roles = 0
-            
-            for page in role_paginator.paginate():
-                for role in page['Roles']:
-                    total_roles += 1
-                    role_name = role['RoleName']
-                    role_arn = role['Arn']
-                    
-                    role_data = {
-                        'type': 'role',
-                        'name': role_name,
-                        'arn': role_arn,
-                        'vulnerable_policies': []
-                    }
-                    
-                    # 인라인 정책 스캔
-                    inline_policies = iam.list_role_policies(RoleName=role_name).get('PolicyNames', [])
-                    for policy_name in inline_policies:
-                        response = iam.get_role_policy(RoleName=role_name, PolicyName=policy_name)
-                        policy_doc = response['PolicyDocument']
-
-                        vuln_stmts = self._find_vulnerable_bedrock_statements(policy_doc)
-                        if vuln_stmts:
-                            vulnerable_principals.add(role_arn)
-                            role_data['vulnerable_policies'].append({
-                                'name': policy_name,
-                                'type': 'inline',
-                                'vulnerable_statements': vuln_stmts
-                            })
-                            results.append(self.get_result(
-                                'FAIL', role_name,
-                                f"역할 [{role_name}]의 인라인 정책 [{policy_name}]에 과도한 Bedrock 권한(Resource: '*')이 있습니다.",
-                                {"principal_arn": role_arn, "policy_name": policy_name, "vulnerable_statements": vuln_stmts}
-                            ))
-                    
-                    # 연결된 정책 스캔
-                    attached_policies = iam.list_attached_role_policies(RoleName=role_name).get('AttachedPolicies', [])
-                    for policy in attached_policies:
-                        policy_arn = policy['PolicyArn']
-                        if "aws:iam::aws:policy" in policy_arn:
-                            continue
-
-                        policy_details = iam.get_policy(PolicyArn=policy_arn)
-                        version_id = policy_details['Policy']['DefaultVersionId']
-                        policy_version = iam.get_policy_version(PolicyArn=policy_arn, VersionId=version_id)
-                        policy_doc = policy_version['PolicyVersion']['Document']
-
-                        vuln_stmts = self._find_vulnerable_bedrock_statements(policy_doc)
-                        if vuln_stmts:
-                            vulnerable_principals.add(role_arn)
-                            role_data['vulnerable_policies'].append({
-                                'arn': policy_arn,
-                                'type': 'attached',
-                                'vulnerable_statements': vuln_stmts
-                            })
-                            results.append(self.get_result(
-                                'FAIL', role_name,
-                                f"역할 [{role_name}]에 연결된 정책 [{policy_arn}]에 과도한 Bedrock 권한(Resource: '*')이 있습니다.",
-                                {"principal_arn": role_arn, "policy_arn": policy_arn, "vulnerable_statements": vuln_stmts}
-                            ))
+            for principal in list(users) + list(roles):
+                label = labels[principal['type']]
+                principal_name = principal['name']
+                principal_arn = principal['arn']
+                
+                principal_data = {
+                    'type': principal['type'],
+                    'name': principal_name,
+                    'arn': principal_arn,
+                    'vulnerable_policies': []
+                }
+                
+                # 인라인 정책 스캔
+                for policy in principal['inline_policies']:
+                    policy_name = policy['name']
+                    vuln_stmts = self._find_vulnerable_bedrock_statements(policy['document'])
+                    if vuln_stmts:
+                        vulnerable_principals.add(principal_arn)
+                        principal_data['vulnerable_policies'].append({
+                            'name': policy_name,
+                            'type': 'inline',
+                            'vulnerable_statements': vuln_stmts
+                        })
+                        results.append(self.get_result(
+                            'FAIL', principal_name,
+                            f"{label} [{principal_name}]의 인라인 정책 [{policy_name}]에 과도한 Bedrock 권한(Resource: '*')이 있습니다.",
+                            {"principal_arn": principal_arn, "policy_name": policy_name, "vulnerable_statements": vuln_stmts}
+                        ))
+                
+                # 연결된 정책 스캔 (AWS 관리형 정책 제외)
+                for policy in principal['attached_policies']:
+                    policy_arn = policy['arn']
+                    if "aws:iam::aws:policy" in policy_arn:
+                        continue
                     
-                    if role_data['vulnerable_policies']:
-                        raw.append(role_data)
+                    vuln_stmts = self._find_vulnerable_bedrock_statements(self.inventory.policy_document(policy_arn))
+                    if vuln_stmts:
+                        vulnerable_principals.add(principal_arn)
+                        principal_data['vulnerable_policies'].append({
+                            'arn': policy_arn,
+                            'type': 'attached',
+                            'vulnerable_statements': vuln_stmts
+                        })
+                        results.append(self.get_result(
+                            'FAIL', principal_name,
+                            f"{label} [{principal_name}]에 연결된 정책 [{policy_arn}]에 과도한 Bedrock 권한(Resource: '*')이 있습니다.",
+                            {"principal_arn": principal_arn, "policy_arn": policy_arn, "vulnerable_statements": vuln_stmts}
+                        ))
+                
+                if principal_data['vulnerable_policies']:
+                    raw.append(principal_data)
 
             # 스캔 요약
             scan_summary = {
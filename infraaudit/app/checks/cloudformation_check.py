@@ -32,6 +32,8 @@ def _resource_has_star(resources: List[str]) -> bool:
     return False
 
 class IAMRoleCloudFormationPassRoleCheck(BaseCheck):
+    cost_hint = 8
+    
     async def check(self) -> List[Dict]:
         iam = self.session.client('iam')
         results: List[Dict] = []
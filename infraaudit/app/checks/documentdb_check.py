@@ -2,6 +2,8 @@ from .base_check import BaseCheck
 from typing import List, Dict
 
 class DocumentDBSnapshotPrivateCheck(BaseCheck):
+    cost_hint = 10
+    
     async def check(self) -> List[Dict]:
         docdb = self.session.client('docdb')
         results = []
@@ -89,6 +91,10 @@ class DocumentDBEncryptionCheck(BaseCheck):
                 cluster_id = cluster.get('DBClusterIdentifier')
                 encrypted = cluster.get('StorageEncrypted', False)
                 kms_key_id = cluster.get('KmsKeyId')
+                internet_exposure = self.network_exposure(
+                    [sg['VpcSecurityGroupId'] for sg in cluster.get('VpcSecurityGroups', [])],
+                    cluster.get('Port', 27017), 'RDSNetworkInterface'
+                )
                 
                 raw.append({
                     'cluster_id': cluster_id,
@@ -104,7 +110,8 @@ class DocumentDBEncryptionCheck(BaseCheck):
                         {
                             'cluster_id': cluster_id,
                             'encrypted': True,
-                            'kms_key_id': kms_key_id
+                            'kms_key_id': kms_key_id,
+                            'internet_exposure': internet_exposure
                         }
                     ))
                 else:
@@ -114,7 +121,8 @@ class DocumentDBEncryptionCheck(BaseCheck):
                         {
                             'cluster_id': cluster_id,
                             'encrypted': encrypted,
-                            'kms_key_id': kms_key_id
+                            'kms_key_id': kms_key_id,
+                            'internet_exposure': internet_exposure
                         }
                     ))
         
@@ -1,63 +1,63 @@
 from .base_check import BaseCheck
-from typing import List, Dict
-import ipaddress
+from typing import List, Dict, Optional
 
 class EC2IMDSv2Check(BaseCheck):
+    requires = ('ec2.instances',)
+    # fail_only 점검에서는 HttpTokens=optional 인스턴스만 서버 측 필터로 조회 (FAIL 항목만 반환)
+    fail_only_requires = ('ec2.instances:optional',)
+    
     async def check(self) -> List[Dict]:
-        ec2 = self.session.client('ec2')
         results = []
         raw = []
         
         try:
-            instances = ec2.describe_instances()
+            instances = self.dataset('ec2.instances:optional' if self.fail_only else 'ec2.instances')
             
-            if not instances['Reservations']:
+            if not instances:
                 results.append(self.get_result(
                     'PASS', 'N/A',
-                    "EC2 인스턴스가 존재하지 않습니다."
+                    "IMDSv2가 Optional로 설정된 EC2 인스턴스가 없습니다." if self.fail_only
+                    else "EC2 인스턴스가 존재하지 않습니다."
                 ))
                 return {'results': results, 'raw': raw, 'guideline_id': 1}
             
-            for reservation in instances['Reservations']:
-                for instance in reservation['Instances']:
-                    instance_id = instance['InstanceId']
-                    metadata_options = instance.get('MetadataOptions', {})
-                    http_tokens = metadata_options.get('HttpTokens', 'optional')
-                    
-                    raw.append({
-                        'instance_id': instance_id,
-                        'metadata_options': metadata_options,
-                        'instance_data': instance
-                    })
-                    
-                    if http_tokens != 'required':
-                        results.append(self.get_result(
-                            'FAIL', instance_id,
-                            f"인스턴스 {instance_id}는 IMDSv2가 Optional로 설정되어 있습니다. EC2 인스턴스에서 IMDSv2를 필수로 설정해야 합니다.",
-                            {
-                                'http_tokens': http_tokens,
-                                'http_put_response_hop_limit': metadata_options.get('HttpPutResponseHopLimit'),
-                                'http_endpoint': metadata_options.get('HttpEndpoint'),
-                                'metadata_options_raw': metadata_options
-                            }
-                        ))
-                    else:
-                        results.append(self.get_result(
-                            'PASS', instance_id,
-                            f"인스턴스 {instance_id}는 IMDSv2가 필수로 설정되어 있습니다.",
-                            {
-                                'http_tokens': http_tokens,
-                                'http_put_response_hop_limit': metadata_options.get('HttpPutResponseHopLimit'),
-                                'http_endpoint': metadata_options.get('HttpEndpoint'),
-                                'metadata_options_raw': metadata_options
-                            }
-                        ))
+            for instance in instances:
+                instance_id = instance['InstanceId']
+                metadata_options = instance['MetadataOptions']
+                http_tokens = metadata_options.get('HttpTokens', 'optional')
+                
+                raw.append({
+                    'instance_id': instance_id,
+                    'metadata_options': metadata_options,
+                    'instance_data': instance
+                })
+                
+                details = {
+                    'http_tokens': http_tokens,
+                    'http_put_response_hop_limit': metadata_options.get('HttpPutResponseHopLimit'),
+                    'http_endpoint': metadata_options.get('HttpEndpoint'),
+                    'metadata_options_raw': metadata_options
+                }
+                if http_tokens != 'required':
+                    results.append(self.get_result(
+                        'FAIL', instance_id,
+                        f"인스턴스 {instance_id}는 IMDSv2가 Optional로 설정되어 있습니다. EC2 인스턴스에서 IMDSv2를 필수로 설정해야 합니다.",
+                        details
+                    ))
+                else:
+                    results.append(self.get_result(
+                        'PASS', instance_id,
+                        f"인스턴스 {instance_id}는 IMDSv2가 필수로 설정되어 있습니다.",
+                        details
+                    ))
         except Exception as e:
             results.append(self.get_result('오류', 'N/A', str(e)))
         
         return {'results': results, 'raw': raw , 'guideline_id' : 1}
 
 class EC2AMIPrivateCheck(BaseCheck):
+    cost_hint = 10
+    
     async def check(self) -> List[Dict]:
         ec2 = self.session.client('ec2')
         results = []
@@ -143,6 +143,8 @@ class EC2AMIPrivateCheck(BaseCheck):
         return {'results': results, 'raw': raw, 'guideline_id': 3}
 
 class EBSSnapshotPrivateCheck(BaseCheck):
+    cost_hint = 20
+    
     async def check(self) -> List[Dict]:
         ec2 = self.session.client('ec2')
         results = []
@@ -202,88 +204,90 @@ class EBSSnapshotPrivateCheck(BaseCheck):
         
         return {'results': results, 'raw': raw, 'guideline_id': 6}
 
+# SSH(22), RDP(3389)
+REMOTE_ACCESS_PORTS = (22, 3389)
+
 class SecurityGroupRemoteAccessCheck(BaseCheck):
+    # prefix list 이름(ec2.managed_prefix_lists)은 표시용이므로 조회에 실패해도 판정에는 영향 없음
+    requires = ('ec2.security_groups', 'ec2.security_group_index', 'ec2.managed_prefix_lists')
+    
     async def check(self) -> List[Dict]:
-        ec2 = self.session.client('ec2')
         results = []
         raw = []
         
         try:
-            security_groups = ec2.describe_security_groups()
+            security_groups = self.inventory.security_groups()
             
-            if not security_groups['SecurityGroups']:
+            if not security_groups:
                 results.append(self.get_result(
                     'PASS', 'N/A',
                     "Security Group이 존재하지 않습니다."
                 ))
                 return {'results': results, 'raw': raw, 'guideline_id': 5}
             
-            for sg in security_groups['SecurityGroups']:
+            sg_index = self.inventory.security_group_index()
+            
+            for sg in security_groups:
                 sg_id = sg['GroupId']
                 sg_name = sg.get('GroupName', 'N/A')
                 inbound_rules = sg.get('IpPermissions', [])
                 
-                sg_has_violation = False
+                # IPv4는 /16보다 넓으면, IPv6는 /32보다 넓으면 FAIL (포트 미지정 규칙은 기존과 같이 제외)
+                exposed = sg_index.exposing(
+                    sg_id, REMOTE_ACCESS_PORTS,
+                    max_prefix_v4=16, max_prefix_v6=32,
+                    include_all_ports=False
+                )
                 violations = []
+                for entry in exposed:
+                    violation = {
+                        'port': f"{entry['from_port']}-{entry['to_port']}",
+                        'cidr': entry['cidr'],
+                        'prefix_len': entry['prefix_len'],
+                        'description': entry['description']
+                    }
+                    # 관리형 접두사 목록(prefix list)을 통해 열린 경우 출처 표시
+                    if entry['source_type'] == 'prefix_list':
+                        violation['prefix_list_id'] = entry['prefix_list_id']
+                        violation['prefix_list_name'] = self._prefix_list_name(entry['prefix_list_id'])
+                    violations.append(violation)
                 
-                for rule in inbound_rules: # raw 데이터 수집 전에 미리 raw에 추가하려면 수정 필요
-                    from_port = rule.get('FromPort')
-                    to_port = rule.get('ToPort')
-                    
-                    # SSH(22) 또는 RDP(3389) 포트인지 확인
-                    if from_port is None or to_port is None:
-                        continue
-                    
-                    is_target_port = (from_port <= 22 <= to_port) or (from_port <= 3389 <= to_port)
-                    
-                    if not is_target_port:
-                        continue
-                    
-                    # IPv4 CIDR 검사
-                    ipv4_ranges = rule.get('IpRanges', [])
-                    for cidr_range in ipv4_ranges:
-                        cidr = cidr_range.get('CidrIp')
-                        description = cidr_range.get('Description', '')
-                        
-                        try:
-                            network = ipaddress.IPv4Network(cidr, strict=False)
-                            # /16보다 넓으면 (prefixlen < 16) FAIL
-                            if network.prefixlen < 16:
-                                sg_has_violation = True
-                                violations.append({
-                                    'port': f"{from_port}-{to_port}",
-                                    'cidr': cidr,
-                                    'prefix_len': network.prefixlen,
-                                    'description': description
-                                })
-                        except ValueError:
-                            pass
-                    
-                    # IPv6 CIDR 검사
-                    ipv6_ranges = rule.get('Ipv6Ranges', [])
-                    for cidr_range in ipv6_ranges:
-                        cidr = cidr_range.get('CidrIpv6')
-                        description = cidr_range.get('Description', '')
-                        
-                        try:
-                            network = ipaddress.IPv6Network(cidr, strict=False)
-                            # /32보다 넓으면 (prefixlen < 32) FAIL
-                            if network.prefixlen < 32:
-                                sg_has_violation = True
-                                violations.append({
-                                    'port': f"{from_port}-{to_port}",
-                                    'cidr': cidr,
-                                    'prefix_len': network.prefixlen,
-                                    'description': description
-                                })
-                        except ValueError:
-                            pass
+                # 내용을 확인하지 못한 prefix list로 SSH/RDP가 열린 규칙 (노출 여부를 판정할 수 없음)
+                unresolved = sg_index.unresolved_prefix_lists(sg_id, REMOTE_ACCESS_PORTS, include_all_ports=False)
+                
+                # 다른 계정 / VPC 피어링 / 확인 불가 보안 그룹에 SSH/RDP가 열린 경우
+                peer_violations = [
+                    {
+                        'port': f"{entry['from_port']}-{entry['to_port']}",
+                        'peer_group_id': entry['peer']['peer_group_id'],
+                        'peer_owner_id': entry['peer']['peer_owner_id'],
+                        'vpc_peering_connection_id': entry['peer']['vpc_peering_connection_id'],
+                        'description': entry['description']
+                    }
+                    for entry in sg_index.peer_exposure(sg_id, REMOTE_ACCESS_PORTS, include_all_ports=False)
+                ]
+                sg_has_violation = bool(violations)
+                
+                # 이 보안 그룹이 연결된 ENI 중 실제로 인터넷에서 SSH/RDP로 도달 가능한 ENI
+                exposed_enis = []
+                if violations:
+                    try:
+                        reachability = self.inventory.reachability()
+                        for eni_id in reachability.enis_for([sg_id]):
+                            for port in REMOTE_ACCESS_PORTS:
+                                exposure = reachability.eni_exposure(eni_id, port)
+                                if exposure['exposed']:
+                                    exposed_enis.append(exposure)
+                    except Exception:
+                        pass
                 
                 raw.append({
                     'sg_id': sg_id,
                     'sg_name': sg_name,
                     'inbound_rules': inbound_rules,
                     'violations': violations,
+                    'peer_violations': peer_violations,
+                    'unresolved_prefix_lists': unresolved,
                     'sg_data': sg
                 })
                 
@@ -293,7 +297,30 @@ class SecurityGroupRemoteAccessCheck(BaseCheck):
                         f"Security Group {sg_name}({sg_id})에 SSH 또는 RDP 포트가 /16보다 넓은 CIDR로 열려있습니다.",
                         {
                             'sg_name': sg_name,
-                            'violations': violations
+                            'violations': violations,
+                            'peer_violations': peer_violations,
+                            'unresolved_prefix_lists': unresolved,
+                            'internet_exposed_enis': exposed_enis
+                        }
+                    ))
+                elif peer_violations:
+                    results.append(self.get_result(
+                        'FAIL', sg_id,
+                        f"Security Group {sg_name}({sg_id})의 SSH 또는 RDP 포트가 다른 계정 또는 VPC 피어링의 Security Group에 열려있습니다.",
+                        {
+                            'sg_name': sg_name,
+                            'violations': violations,
+                            'peer_violations': peer_violations,
+                            'unresolved_prefix_lists': unresolved
+                        }
+                    ))
+                elif unresolved:
+                    results.append(self.get_result(
+                        'WARN', sg_id,
+                        f"Security Group {sg_name}({sg_id})의 SSH 또는 RDP 포트가 내용을 확인할 수 없는 prefix list에 열려있습니다.",
+                        {
+                            'sg_name': sg_name,
+                            'unresolved_prefix_lists': unresolved
                         }
                     ))
                 else:
@@ -310,4 +337,10 @@ class SecurityGroupRemoteAccessCheck(BaseCheck):
             results.append(self.get_result('ERROR', 'N/A', str(e)))
         
         return {'results': results, 'raw': raw, 'guideline_id': 5}
-    
\ No newline at end of file
+    
+    def _prefix_list_name(self, prefix_list_id: str) -> Optional[str]:
+        # 이름 조회 실패(권한 부족, 제한 초과 등)는 판정 결과를 바꾸지 않도록 이름 없이 보고
+        try:
+            return self.inventory.managed_prefix_lists().get(prefix_list_id, {}).get('PrefixListName')
+        except Exception:
+            return None
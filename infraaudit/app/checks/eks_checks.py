@@ -3,15 +3,17 @@ import json
 from .base_check import BaseCheck
 
 class EKSIRSARoleCheck(BaseCheck):
+    requires = ('iam.roles', 'iam.roles_with_policies')
+    cost_hint = 8
+    
     async def check(self) -> List[Dict]:
-        iam = self.session.client('iam')
         results = []
         raw = []
         
         try:
             # IRSA용 역할 조회 (Trust Policy에 oidc.eks가 포함된 역할)
-            roles_response = iam.list_roles()
-            roles = roles_response.get('Roles', [])
+            roles = self.dataset('iam.roles')
+            role_policies = {role['name']: role for role in self.dataset('iam.roles_with_policies')}
             
             irsa_roles = []
             for role in roles:
@@ -37,17 +39,18 @@ class EKSIRSARoleCheck(BaseCheck):
                 role_arn = role['Arn']
                 
                 try:
-                    # 역할에 연결된 정책 조회
-                    attached_policies = iam.list_attached_role_policies(RoleName=role_name)
-                    inline_policies = iam.list_role_policies(RoleName=role_name)
+                    # 역할에 연결된 정책 (인벤토리의 GetAccountAuthorizationDetails 결과)
+                    policies = role_policies[role_name]
+                    attached_policies = policies['attached_policies']
+                    inline_policies = policies['inline_policies']
                     
                     has_admin_policy = False
                     vulnerable_policies = []
                     
                     # 관리형 정책 확인
-                    for policy in attached_policies.get('AttachedPolicies', []):
-                        policy_arn = policy['PolicyArn']
-                        policy_name = policy['PolicyName']
+                    for policy in attached_policies:
+                        policy_arn = policy['arn']
+                        policy_name = policy['name']
                         
                         # AdministratorAccess 정책 확인
                         if 'AdministratorAccess' in policy_name:
@@ -59,17 +62,9 @@ class EKSIRSARoleCheck(BaseCheck):
                             })
                             continue
                         
-                        # 정책 버전 조회
+                        # 기본 버전 문서 (ARN당 한 번 조회)
                         try:
-                            policy_version = iam.get_policy(PolicyArn=policy_arn)
-                            default_version_id = policy_version['Policy']['DefaultVersionId']
-                            
-                            policy_document = iam.get_policy_version(
-                                PolicyArn=policy_arn,
-                                VersionId=default_version_id
-                            )
-                            
-                            statements = policy_document['PolicyVersion']['Document'].get('Statement', [])
+                            statements = self.inventory.policy_document(policy_arn).get('Statement', [])
                             
                             # Action: "*", Resource: "*" 확인
                             for statement in statements:
@@ -95,14 +90,10 @@ class EKSIRSARoleCheck(BaseCheck):
                             pass
                     
                     # 인라인 정책 확인
-                    for policy_name in inline_policies.get('PolicyNames', []):
+                    for policy in inline_policies:
+                        policy_name = policy['name']
                         try:
-                            policy_document = iam.get_role_policy(
-                                RoleName=role_name,
-                                PolicyName=policy_name
-                            )
-                            
-                            statements = policy_document['PolicyDocument'].get('Statement', [])
+                            statements = policy['document'].get('Statement', [])
                             
                             for statement in statements:
                                 if statement.get('Effect') == 'Allow':
@@ -130,8 +121,10 @@ class EKSIRSARoleCheck(BaseCheck):
                         'role_arn': role_arn,
                         'has_admin_policy': has_admin_policy,
                         'vulnerable_policies': vulnerable_policies,
-                        'attached_policies': attached_policies.get('AttachedPolicies', []),
-                        'inline_policies': inline_policies.get('PolicyNames', [])
+                        'attached_policies': [
+                            {'PolicyName': policy['name'], 'PolicyArn': policy['arn']} for policy in attached_policies
+                        ],
+                        'inline_policies': [policy['name'] for policy in inline_policies]
                     })
                     
                     if has_admin_policy:
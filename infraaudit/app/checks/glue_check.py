@@ -4,40 +4,38 @@ from typing import List, Dict
 import json
 
 class IAMGluePassRoleCheck(BaseCheck):
+    requires = ('iam.roles_with_policies',)
+    cost_hint = 8
+    
     async def check(self) -> List[Dict]:
-        iam = self.session.client('iam')
         results = []
         raw = []
         
         try:
-            roles = iam.list_roles(MaxItems=1000)
+            roles = self.dataset('iam.roles_with_policies')
             
-            if not roles['Roles']:
+            if not roles:
                 return {'results': results, 'raw': raw, 'guideline_id': 45}
             
-            for role in roles['Roles']:
-                role_name = role['RoleName']
+            for role in roles:
+                role_name = role['name']
                 
                 try:
-                    attached_policies = iam.list_attached_role_policies(RoleName=role_name)
-                    inline_policies = iam.list_role_policies(RoleName=role_name)
+                    attached_policies = role['attached_policies']
+                    inline_policies = role['inline_policies']
                     
                     has_glue_create = False
                     has_pass_role = False
                     all_policies = []
                     
                     # 관리형 정책 확인
-                    for policy in attached_policies['AttachedPolicies']:
+                    for policy in attached_policies:
                         try:
-                            policy_version = iam.get_policy_version(
-                                PolicyArn=policy['PolicyArn'],
-                                VersionId=iam.get_policy(PolicyArn=policy['PolicyArn'])['Policy']['DefaultVersionId']
-                            )
-                            
-                            policy_doc = policy_version['PolicyVersion']['Document']
+                            # 기본 버전 문서 (ARN당 한 번 조회)
+                            policy_doc = self.inventory.policy_document(policy['arn'])
                             all_policies.append({
                                 'type': 'managed',
-                                'name': policy['PolicyName'],
+                                'name': policy['name'],
                                 'document': policy_doc
                             })
                             
@@ -56,17 +54,15 @@ class IAMGluePassRoleCheck(BaseCheck):
                             pass
                     
                     # 인라인 정책 확인
-                    for policy_name in inline_policies['PolicyNames']:
+                    for policy in inline_policies:
                         try:
-                            policy_doc = iam.get_role_policy(RoleName=role_name, PolicyName=policy_name)
-                            
                             all_policies.append({
                                 'type': 'inline',
-                                'name': policy_name,
-                                'document': policy_doc['PolicyDocument']
+                                'name': policy['name'],
+                                'document': policy['document']
                             })
                             
-                            for statement in policy_doc['PolicyDocument'].get('Statement', []):
+                            for statement in policy['document'].get('Statement', []):
                                 if statement.get('Effect') == 'Allow':
                                     actions = statement.get('Action', [])
                                     if isinstance(actions, str):
@@ -95,8 +91,8 @@ class IAMGluePassRoleCheck(BaseCheck):
                                 'role_name': role_name,
                                 'has_glue_create': has_glue_create,
                                 'has_pass_role': has_pass_role,
-                                'attached_policies_count': len(attached_policies['AttachedPolicies']),
-                                'inline_policies_count': len(inline_policies['PolicyNames']),
+                                'attached_policies_count': len(attached_policies),
+                                'inline_policies_count': len(inline_policies),
                                 'policy_documents': all_policies
                             }
                         ))
@@ -109,8 +105,8 @@ class IAMGluePassRoleCheck(BaseCheck):
                                     'role_name': role_name,
                                     'has_glue_create': has_glue_create,
                                     'has_pass_role': has_pass_role,
-                                    'attached_policies_count': len(attached_policies['AttachedPolicies']),
-                                    'inline_policies_count': len(inline_policies['PolicyNames']),
+                                    'attached_policies_count': len(attached_policies),
+                                    'inline_policies_count': len(inline_policies),
                                     'policy_documents': all_policies
                                 }
                             ))
@@ -1,6 +1,15 @@
-from .base_check import BaseCheck
+from .base_check import BaseCheck, StreamingCheck
+from .iam_trust_policy import get_trust_analysis
 from datetime import datetime
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict
+
+# 신뢰 정책 체크 메시지 템플릿 (역할 이름은 결과의 params로 전달되어 응답 생성 시 렌더링)
+TRUST_WILDCARD_FAIL = "역할 {}의 신뢰 정책에 Principal이 '*'로 설정되어 있고 Condition이 없습니다. Trust Policy의 Principal: *를 제거하고, 사용할 계정/역할/서비스의 ARN만 명시해야 합니다."
+TRUST_WILDCARD_PASS = "역할 {}의 신뢰 정책이 적절히 구성되어 있습니다."
+TRUST_IDP_FAIL = "역할 {}의 IdP 연동 설정에서 Principal이 특정 IdP ARN으로 제한되지 않거나 Condition이 IdP 속성으로 제한되지 않았습니다."
+TRUST_IDP_PASS = "역할 {}의 IdP 연동 설정이 적절히 구성되어 있습니다."
+TRUST_CROSS_ACCOUNT_FAIL = "역할 {}의 Cross-Account 설정에서 Principal이 특정 ARN으로 제한되지 않거나 sts:ExternalId 조건이 없습니다."
+TRUST_CROSS_ACCOUNT_PASS = "역할 {}의 Cross-Account 설정이 적절히 구성되어 있습니다."
 
 # 루트 mfa삭제
 class IAMRootMFACheck(BaseCheck):
@@ -25,136 +34,129 @@ class IAMRootMFACheck(BaseCheck):
         
         return results
 
-class IAMTrustPolicyWildcardCheck(BaseCheck):
-    async def check(self) -> List[Dict]:
-        iam = self.session.client('iam')
-        results = []
-        raw = []
-        
+class IAMTrustPolicyWildcardCheck(StreamingCheck):
+    requires = ('iam.roles',)
+    guideline_id = 13
+    
+    async def stream(self) -> AsyncIterator:
         try:
-            roles = iam.list_roles()['Roles']
+            roles = self.inventory.roles()
             
             if not roles:
-                return {'results': results, 'raw': raw, 'guideline_id': 13}
+                return
+            
+            trust_analysis = get_trust_analysis(self.inventory)
             
             for role in roles:
                 role_name = role['RoleName']
-                trust_policy = role['AssumeRolePolicyDocument']
-                
-                raw.append({
-                    'role_name': role_name,
-                    'trust_policy': trust_policy,
-                    'role_data': role
-                })
+                trust_policy_hash = trust_analysis[role_name]['hash']
+                # 내용이 같은 신뢰 정책은 정책 저장소의 대표 문서 하나를 결과들이 공유
+                trust_policy = self.inventory.policies.get(trust_policy_hash)
+                verdict = trust_analysis[role_name]['verdicts']['wildcard']
                 
-                has_wildcard_without_condition = False
-                
-                for statement in trust_policy.get('Statement', []):
-                    principal = statement.get('Principal', {})
-                    condition = statement.get('Condition')
-                    
-                    # Principal이 "*"이고 Condition이 없는 경우
-                    if principal == "*" and not condition:
-                        has_wildcard_without_condition = True
-                        break
-                    # Principal이 dict이고 AWS가 "*"인 경우
-                    elif isinstance(principal, dict) and principal.get('AWS') == "*" and not condition:
-                        has_wildcard_without_condition = True
-                        break
+                if not self.summary_only:
+                    # 역할 객체는 세 신뢰 정책 체크가 공유하므로 복사하지 않고 참조만 저장
+                    yield self.raw_record({
+                        'role_name': role_name,
+                        'trust_policy_hash': trust_policy_hash,
+                        'role_data': role
+                    })
                 
-                if has_wildcard_without_condition:
-                    results.append(self.get_result(
+                if verdict['error']:
+                    yield self.get_result('ERROR', role_name, verdict['error'])
+                elif verdict['has_issue']:
+                    yield self.get_result(
                         'FAIL', role_name,
-                        f"역할 {role_name}의 신뢰 정책에 Principal이 '*'로 설정되어 있고 Condition이 없습니다. Trust Policy의 Principal: *를 제거하고, 사용할 계정/역할/서비스의 ARN만 명시해야 합니다.",
+                        TRUST_WILDCARD_FAIL,
                         {
                             'role_name': role_name,
                             'trust_policy': trust_policy,
+                            'trust_policy_hash': trust_policy_hash,
                             'has_wildcard_principal': True,
                             'has_condition': False
-                        }
-                    ))
+                        },
+                        params=(role_name,)
+                    )
                 else:
-                    results.append(self.get_result(
+                    yield self.get_result(
                         'PASS', role_name,
-                        f"역할 {role_name}의 신뢰 정책이 적절히 구성되어 있습니다.",
+                        TRUST_WILDCARD_PASS,
                         {
                             'role_name': role_name,
                             'trust_policy': trust_policy,
+                            'trust_policy_hash': trust_policy_hash,
                             'has_wildcard_principal': False
-                        }
-                    ))
+                        },
+                        params=(role_name,)
+                    )
         except Exception as e:
-            results.append(self.get_result('오류', 'N/A', str(e)))
-        
-        return {'results': results, 'raw': raw, 'guideline_id': 13}
+            yield self.get_result('오류', 'N/A', str(e))
+
+def analyze_passrole_policy(policy_document: Dict) -> Dict:
+    """정책 문서에서 iam:PassRole 허용 여부와 Resource 범위를 추출"""
+    info = {'has_passrole': False, 'resources': [], 'has_wildcard': False}
+    
+    for statement in policy_document.get('Statement', []):
+        if isinstance(statement, dict):
+            actions = statement.get('Action', [])
+            resources = statement.get('Resource', [])
+            
+            # Action을 리스트로 변환
+            if isinstance(actions, str):
+                actions = [actions]
+            
+            # Resource를 리스트로 변환
+            if isinstance(resources, str):
+                resources = [resources]
+            
+            # iam:PassRole 액션이 있는지 확인
+            has_passrole = any(
+                action == 'iam:PassRole' or action == 'iam:*' or action == '*'
+                for action in actions
+            )
+            
+            if has_passrole:
+                info['has_passrole'] = True
+                info['resources'].extend(resources)
+                # Resource가 "*" 또는 광범위한 패턴인지 확인
+                for resource in resources:
+                    if (resource == "*" or 
+                        resource == "arn:aws:iam::*:role/*" or
+                        resource.endswith(":role/*")):
+                        info['has_wildcard'] = True
+    
+    return info
 
 class IAMPassRoleWildcardResourceCheck(BaseCheck):
+    requires = ('iam.users_with_policies', 'iam.roles_with_policies')
+    cost_hint = 10
+    
     async def check(self) -> List[Dict]:
-        iam = self.session.client('iam')
         results = []
         raw = []
         
         try:
             entities = []
-            all_users = []
-            all_roles = []
+            users = self.dataset('iam.users_with_policies')
+            roles = self.dataset('iam.roles_with_policies')
+            all_users = [user['name'] for user in users]
+            all_roles = [role['name'] for role in roles]
             
-            # 사용자 정책 수집
-            users = iam.list_users()['Users']
-            for user in users:
-                all_users.append(user['UserName'])
-                user_name = user['UserName']
-                # 인라인 정책
-                inline_policies = iam.list_user_policies(UserName=user_name)['PolicyNames']
-                for policy_name in inline_policies:
-                    policy_doc = iam.get_user_policy(UserName=user_name, PolicyName=policy_name)
-                    entities.append({
-                        'type': 'user',
-                        'name': user_name,
-                        'policy_name': policy_name,
-                        'policy_document': policy_doc['PolicyDocument']
-                    })
-                
-                # 연결된 관리형 정책
-                attached_policies = iam.list_attached_user_policies(UserName=user_name)['AttachedPolicies']
-                for policy in attached_policies:
-                    policy_arn = policy['PolicyArn']
-                    policy_version = iam.get_policy(PolicyArn=policy_arn)['Policy']['DefaultVersionId']
-                    policy_doc = iam.get_policy_version(PolicyArn=policy_arn, VersionId=policy_version)
-                    entities.append({
-                        'type': 'user',
-                        'name': user_name,
-                        'policy_name': policy['PolicyName'],
-                        'policy_document': policy_doc['PolicyVersion']['Document']
-                    })
-            
-            # 역할 정책 수집
-            roles = iam.list_roles()['Roles']
-            for role in roles:
-                all_roles.append(role['RoleName'])
-                role_name = role['RoleName']
-                # 인라인 정책
-                inline_policies = iam.list_role_policies(RoleName=role_name)['PolicyNames']
-                for policy_name in inline_policies:
-                    policy_doc = iam.get_role_policy(RoleName=role_name, PolicyName=policy_name)
+            # 사용자/역할 정책 수집 (인라인 정책 + 연결된 관리형 정책, 관리형 정책 문서는 ARN당 한 번 조회)
+            for principal in list(users) + list(roles):
+                for policy in principal['inline_policies']:
                     entities.append({
-                        'type': 'role',
-                        'name': role_name,
-                        'policy_name': policy_name,
-                        'policy_document': policy_doc['PolicyDocument']
+                        'type': principal['type'],
+                        'name': principal['name'],
+                        'policy_name': policy['name'],
+                        'policy_document': policy['document']
                     })
-                
-                # 연결된 관리형 정책
-                attached_policies = iam.list_attached_role_policies(RoleName=role_name)['AttachedPolicies']
-                for policy in attached_policies:
-                    policy_arn = policy['PolicyArn']
-                    policy_version = iam.get_policy(PolicyArn=policy_arn)['Policy']['DefaultVersionId']
-                    policy_doc = iam.get_policy_version(PolicyArn=policy_arn, VersionId=policy_version)
+                for policy in principal['attached_policies']:
                     entities.append({
-                        'type': 'role',
-                        'name': role_name,
-                        'policy_name': policy['PolicyName'],
-                        'policy_document': policy_doc['PolicyVersion']['Document']
+                        'type': principal['type'],
+                        'name': principal['name'],
+                        'policy_name': policy['name'],
+                        'policy_document': self.inventory.policy_document(policy['arn'])
                     })
             
             # 엔티티별로 PassRole 권한 확인
@@ -164,52 +166,28 @@ class IAMPassRoleWildcardResourceCheck(BaseCheck):
                 entity_type = entity['type']
                 entity_name = entity['name']
                 policy_name = entity['policy_name']
-                policy_document = entity['policy_document']
+                
+                # 같은 정책 문서는 해시 기준으로 한 번만 분석하고 raw에는 해시만 기록
+                policy_hash, passrole_info = self.inventory.policies.analyze(
+                    'passrole', entity['policy_document'], analyze_passrole_policy
+                )
                 
                 raw.append({
                     'entity_type': entity_type,
                     'entity_name': entity_name,
                     'policy_name': policy_name,
-                    'policy_document': policy_document
+                    'policy_hash': policy_hash
                 })
                 
                 entity_key = f"{entity_type}:{entity_name}"
                 if entity_key not in entity_passrole_map:
                     entity_passrole_map[entity_key] = {'has_passrole': False, 'resources': [], 'has_wildcard': False}
                 
-                has_wildcard_passrole = False
-                passrole_resources = []
-                
-                for statement in policy_document.get('Statement', []):
-                    if isinstance(statement, dict):
-                        actions = statement.get('Action', [])
-                        resources = statement.get('Resource', [])
-                        
-                        # Action을 리스트로 변환
-                        if isinstance(actions, str):
-                            actions = [actions]
-                        
-                        # Resource를 리스트로 변환
-                        if isinstance(resources, str):
-                            resources = [resources]
-                        
-                        # iam:PassRole 액션이 있는지 확인
-                        has_passrole = any(
-                            action == 'iam:PassRole' or action == 'iam:*' or action == '*'
-                            for action in actions
-                        )
-                        
-                        if has_passrole:
-                            entity_passrole_map[entity_key]['has_passrole'] = True
-                            passrole_resources.extend(resources)
-                            entity_passrole_map[entity_key]['resources'].extend(resources)
-                            # Resource가 "*" 또는 광범위한 패턴인지 확인
-                            for resource in resources:
-                                if (resource == "*" or 
-                                    resource == "arn:aws:iam::*:role/*" or
-                                    resource.endswith(":role/*")):
-                                    has_wildcard_passrole = True
-                                    entity_passrole_map[entity_key]['has_wildcard'] = True
+                if passrole_info['has_passrole']:
+                    entity_passrole_map[entity_key]['has_passrole'] = True
+                    entity_passrole_map[entity_key]['resources'].extend(passrole_info['resources'])
+                    if passrole_info['has_wildcard']:
+                        entity_passrole_map[entity_key]['has_wildcard'] = True
             
             # 각 엔티티별로 결과 생성
             for entity_key, passrole_info in entity_passrole_map.items():
@@ -287,179 +265,145 @@ class IAMPassRoleWildcardResourceCheck(BaseCheck):
         
         return {'results': results, 'raw': raw, 'guideline_id': 14}
     
-class IAMIdPAssumeRoleCheck(BaseCheck):
-    async def check(self) -> List[Dict]:
-        iam = self.session.client('iam')
-        results = []
-        raw = []
-        
+class IAMIdPAssumeRoleCheck(StreamingCheck):
+    requires = ('iam.roles',)
+    guideline_id = 15
+    
+    async def stream(self) -> AsyncIterator:
         try:
-            roles = iam.list_roles()['Roles']
+            roles = self.inventory.roles()
             
             if not roles:
-                return {'results': results, 'raw': raw, 'guideline_id': 15}
+                return
+            
+            trust_analysis = get_trust_analysis(self.inventory)
             
             for role in roles:
                 role_name = role['RoleName']
-                trust_policy = role['AssumeRolePolicyDocument']
+                trust_policy_hash = trust_analysis[role_name]['hash']
+                # 내용이 같은 신뢰 정책은 정책 저장소의 대표 문서 하나를 결과들이 공유
+                trust_policy = self.inventory.policies.get(trust_policy_hash)
+                verdict = trust_analysis[role_name]['verdicts']['idp']
                 
-                raw.append({
-                    'role_name': role_name,
-                    'trust_policy': trust_policy,
-                    'role_data': role
-                })
+                if not self.summary_only:
+                    yield self.raw_record({
+                        'role_name': role_name,
+                        'trust_policy_hash': trust_policy_hash,
+                        'role_data': role
+                    })
                 
-                has_idp_issue = False
-                
-                for statement in trust_policy.get('Statement', []):
-                    principal = statement.get('Principal', {})
-                    condition = statement.get('Condition', {})
-                    
-                    # Federated Principal이 있는지 확인 (IdP 연동)
-                    if isinstance(principal, dict) and 'Federated' in principal:
-                        federated_principal = principal['Federated']
-                        
-                        # Principal이 특정 IdP ARN이 아닌 경우 (와일드카드나 광범위한 설정)
-                        if (federated_principal == "*" or 
-                            not federated_principal.startswith('arn:aws:iam::') or
-                            ':saml-provider/' not in federated_principal and ':oidc-provider/' not in federated_principal):
-                            has_idp_issue = True
-                        
-                        # Condition이 IdP 속성으로 제한되지 않은 경우
-                        has_idp_condition = any(
-                            key.startswith(('saml:', 'oidc:', 'token.actions.githubusercontent.com:'))
-                            for condition_block in condition.values()
-                            for key in (condition_block.keys() if isinstance(condition_block, dict) else [])
-                        ) if condition else False
-                        
-                        if not has_idp_condition:
-                            has_idp_issue = True
+                if verdict['error']:
+                    yield self.get_result('ERROR', role_name, verdict['error'])
+                    continue
                 
                 # IdP 연동이 있는 역할만 결과에 포함
-                if any('Federated' in statement.get('Principal', {}) 
-                       for statement in trust_policy.get('Statement', [])
-                       if isinstance(statement.get('Principal', {}), dict)):
+                if verdict['applicable']:
                     
-                    if has_idp_issue:
-                        results.append(self.get_result(
+                    if verdict['has_issue']:
+                        yield self.get_result(
                             'FAIL', role_name,
-                            f"역할 {role_name}의 IdP 연동 설정에서 Principal이 특정 IdP ARN으로 제한되지 않거나 Condition이 IdP 속성으로 제한되지 않았습니다.",
+                            TRUST_IDP_FAIL,
                             {
                                 'role_name': role_name,
                                 'trust_policy': trust_policy,
+                                'trust_policy_hash': trust_policy_hash,
                                 'has_specific_idp_principal': False,
                                 'has_idp_condition': False
-                            }
-                        ))
+                            },
+                            params=(role_name,)
+                        )
                     else:
-                        results.append(self.get_result(
+                        yield self.get_result(
                             'PASS', role_name,
-                            f"역할 {role_name}의 IdP 연동 설정이 적절히 구성되어 있습니다.",
+                            TRUST_IDP_PASS,
                             {
                                 'role_name': role_name,
                                 'trust_policy': trust_policy,
+                                'trust_policy_hash': trust_policy_hash,
                                 'has_specific_idp_principal': True,
                                 'has_idp_condition': True
-                            }
-                        ))
+                            },
+                            params=(role_name,)
+                        )
                         
         except Exception as e:
-            results.append(self.get_result('ERROR', 'N/A', str(e)))
-        
-        return {'results': results, 'raw': raw, 'guideline_id': 15}
+            yield self.get_result('ERROR', 'N/A', str(e))
 
-class IAMCrossAccountAssumeRoleCheck(BaseCheck):
-    async def check(self) -> List[Dict]:
-        iam = self.session.client('iam')
-        results = []
-        raw = []
-        
+class IAMCrossAccountAssumeRoleCheck(StreamingCheck):
+    requires = ('iam.roles',)
+    guideline_id = 16
+    
+    async def stream(self) -> AsyncIterator:
         try:
-            roles = iam.list_roles()['Roles']
+            roles = self.inventory.roles()
             
             if not roles:
-                return {'results': results, 'raw': raw, 'guideline_id': 16}
+                return
+            
+            trust_analysis = get_trust_analysis(self.inventory)
             
             for role in roles:
                 role_name = role['RoleName']
-                trust_policy = role['AssumeRolePolicyDocument']
+                trust_policy_hash = trust_analysis[role_name]['hash']
+                # 내용이 같은 신뢰 정책은 정책 저장소의 대표 문서 하나를 결과들이 공유
+                trust_policy = self.inventory.policies.get(trust_policy_hash)
+                verdict = trust_analysis[role_name]['verdicts']['cross_account']
                 
-                raw.append({
-                    'role_name': role_name,
-                    'trust_policy': trust_policy,
-                    'role_data': role
-                })
+                if not self.summary_only:
+                    yield self.raw_record({
+                        'role_name': role_name,
+                        'trust_policy_hash': trust_policy_hash,
+                        'role_data': role
+                    })
                 
-                has_cross_account_issue = False
-                
-                for statement in trust_policy.get('Statement', []):
-                    principal = statement.get('Principal', {})
-                    condition = statement.get('Condition', {})
-                    
-                    # AWS Principal이 있는지 확인 (Cross-Account)
-                    if isinstance(principal, dict) and 'AWS' in principal:
-                        aws_principal = principal['AWS']
-                        
-                        # Principal이 리스트인 경우 문자열로 변환
-                        if isinstance(aws_principal, list):
-                            aws_principal = aws_principal[0] if aws_principal else ""
-                        
-                        # Principal이 특정 ARN이 아닌 경우 (와일드카드나 광범위한 설정)
-                        if (aws_principal == "*" or 
-                            aws_principal.startswith('arn:aws:iam::*:') or
-                            not aws_principal.startswith('arn:aws:iam::')):
-                            has_cross_account_issue = True
-                        
-                        # Condition에 sts:ExternalId가 없는 경우
-                        has_external_id = any(
-                            'sts:ExternalId' in condition_block
-                            for condition_block in condition.values()
-                            if isinstance(condition_block, dict)
-                        ) if condition else False
-                        
-                        if not has_external_id:
-                            has_cross_account_issue = True
+                if verdict['error']:
+                    yield self.get_result('ERROR', role_name, verdict['error'])
+                    continue
                 
                 # Cross-Account 역할만 결과에 포함 (AWS Principal이 있는 경우)
-                if any(isinstance(statement.get('Principal', {}), dict) and 'AWS' in statement.get('Principal', {})
-                       for statement in trust_policy.get('Statement', [])):
+                if verdict['applicable']:
                     
-                    if has_cross_account_issue:
-                        results.append(self.get_result(
+                    if verdict['has_issue']:
+                        yield self.get_result(
                             'FAIL', role_name,
-                            f"역할 {role_name}의 Cross-Account 설정에서 Principal이 특정 ARN으로 제한되지 않거나 sts:ExternalId 조건이 없습니다.",
+                            TRUST_CROSS_ACCOUNT_FAIL,
                             {
                                 'role_name': role_name,
                                 'trust_policy': trust_policy,
+                                'trust_policy_hash': trust_policy_hash,
                                 'has_specific_principal': False,
                                 'has_external_id_condition': False
-                            }
-                        ))
+                            },
+                            params=(role_name,)
+                        )
                     else:
-                        results.append(self.get_result(
+                        yield self.get_result(
                             'PASS', role_name,
-                            f"역할 {role_name}의 Cross-Account 설정이 적절히 구성되어 있습니다.",
+                            TRUST_CROSS_ACCOUNT_PASS,
                             {
                                 'role_name': role_name,
                                 'trust_policy': trust_policy,
+                                'trust_policy_hash': trust_policy_hash,
                                 'has_specific_principal': True,
                                 'has_external_id_condition': True
-                            }
-                        ))
+                            },
+                            params=(role_name,)
+                        )
                         
         except Exception as e:
-            results.append(self.get_result('ERROR', 'N/A', str(e)))
-        
-        return {'results': results, 'raw': raw, 'guideline_id': 16}
+            yield self.get_result('ERROR', 'N/A', str(e))
 
 class IAMAccessKeyAgeCheck(BaseCheck):
+    requires = ('iam.users',)
+    cost_hint = 5
+    
     async def check(self) -> List[Dict]:
-        iam = self.session.client('iam')
+        iam = self.inventory.client('iam')
         results = []
         raw = []
         
         try:
-            users = iam.list_users()['Users']
+            users = self.dataset('iam.users')
             
             for user in users:
                 username = user['UserName']
@@ -541,8 +485,11 @@ class IAMRootAccessKeyCheck(BaseCheck):
         return {'results': results, 'raw': raw, 'guideline_id': 15}
 
 class IAMMFACheck(BaseCheck):
+    requires = ('iam.users',)
+    cost_hint = 5
+    
     async def check(self) -> List[Dict]:
-        iam = self.session.client('iam')
+        iam = self.inventory.client('iam')
         results = []
         raw = []
         
@@ -552,8 +499,7 @@ class IAMMFACheck(BaseCheck):
             root_mfa_enabled = summary.get('AccountMFAEnabled', 0)
             
             # 모든 IAM 사용자 조회
-            users_response = iam.list_users()
-            users = users_response.get('Users', [])
+            users = self.dataset('iam.users')
             
             users_without_mfa = []
             users_with_mfa = []
@@ -0,0 +1,122 @@
+from typing import Dict, List
+from app.core.inventory import AuditInventory
+
+# 신뢰 정책 기반 체크 3종(와일드카드 / IdP / Cross-Account)의 판정을 한 번에 계산
+
+def _statements(trust_policy: Dict) -> List[Dict]:
+    statements = trust_policy.get('Statement', [])
+    if isinstance(statements, dict):
+        return [statements]
+    return statements
+
+def _wildcard_rule(statement: Dict, verdict: Dict) -> None:
+    principal = statement.get('Principal', {})
+    condition = statement.get('Condition')
+
+    # Principal이 "*"이거나 AWS가 "*"이고 Condition이 없는 경우
+    if principal == "*" and not condition:
+        verdict['has_issue'] = True
+    elif isinstance(principal, dict) and principal.get('AWS') == "*" and not condition:
+        verdict['has_issue'] = True
+
+def _idp_rule(statement: Dict, verdict: Dict) -> None:
+    principal = statement.get('Principal', {})
+    condition = statement.get('Condition', {})
+
+    # Federated Principal이 있는지 확인 (IdP 연동)
+    if not (isinstance(principal, dict) and 'Federated' in principal):
+        return
+
+    verdict['applicable'] = True
+    federated_principal = principal['Federated']
+
+    # Principal이 특정 IdP ARN이 아닌 경우 (와일드카드나 광범위한 설정)
+    if (federated_principal == "*" or
+        not federated_principal.startswith('arn:aws:iam::') or
+        ':saml-provider/' not in federated_principal and ':oidc-provider/' not in federated_principal):
+        verdict['has_issue'] = True
+
+    # Condition이 IdP 속성으로 제한되지 않은 경우
+    has_idp_condition = any(
+        key.startswith(('saml:', 'oidc:', 'token.actions.githubusercontent.com:'))
+        for condition_block in condition.values()
+        for key in (condition_block.keys() if isinstance(condition_block, dict) else [])
+    ) if condition else False
+
+    if not has_idp_condition:
+        verdict['has_issue'] = True
+
+def _cross_account_rule(statement: Dict, verdict: Dict) -> None:
+    principal = statement.get('Principal', {})
+    condition = statement.get('Condition', {})
+
+    # AWS Principal이 있는지 확인 (Cross-Account)
+    if not (isinstance(principal, dict) and 'AWS' in principal):
+        return
+
+    verdict['applicable'] = True
+    aws_principal = principal['AWS']
+
+    # Principal이 리스트인 경우 문자열로 변환
+    if isinstance(aws_principal, list):
+        aws_principal = aws_principal[0] if aws_principal else ""
+
+    # Principal이 특정 ARN이 아닌 경우 (와일드카드나 광범위한 설정)
+    if (aws_principal == "*" or
+        aws_principal.startswith('arn:aws:iam::*:') or
+        not aws_principal.startswith('arn:aws:iam::')):
+        verdict['has_issue'] = True
+
+    # Condition에 sts:ExternalId가 없는 경우
+    has_external_id = any(
+        'sts:ExternalId' in condition_block
+        for condition_block in condition.values()
+        if isinstance(condition_block, dict)
+    ) if condition else False
+
+    if not has_external_id:
+        verdict['has_issue'] = True
+
+TRUST_POLICY_RULES = {
+    'wildcard': _wildcard_rule,
+    'idp': _idp_rule,
+    'cross_account': _cross_account_rule,
+}
+
+def analyze_trust_policy(trust_policy: Dict) -> Dict[str, Dict]:
+    """Statement를 한 번만 순회하면서 세 체크의 판정을 함께 계산"""
+    verdicts = {
+        name: {'applicable': name == 'wildcard', 'has_issue': False, 'error': None}
+        for name in TRUST_POLICY_RULES
+    }
+
+    for statement in _statements(trust_policy):
+        for name, rule in TRUST_POLICY_RULES.items():
+            verdict = verdicts[name]
+            if verdict['error']:
+                continue
+            try:
+                rule(statement, verdict)
+            except Exception as e:
+                verdict['error'] = str(e)
+
+    return verdicts
+
+def _error_verdicts(error: str) -> Dict[str, Dict]:
+    # 문서 분석 자체가 실패한 경우 세 체크 모두 해당 역할을 오류로 보고
+    return {name: {'applicable': True, 'has_issue': False, 'error': error} for name in TRUST_POLICY_RULES}
+
+def get_trust_analysis(inventory: AuditInventory) -> Dict[str, Dict]:
+    """역할 이름 → {'hash', 'verdicts'}. 점검 1회당 한 번만 계산되어 세 체크가 공유"""
+    def analyze():
+        roles = inventory.roles()
+        # 동일한 신뢰 정책 문서는 해시 기준으로 한 번만 분석 (고유 문서를 모아 일괄 분석)
+        analyzed = inventory.policies.analyze_many(
+            'trust_policy', [role['AssumeRolePolicyDocument'] for role in roles], analyze_trust_policy
+        )
+        return {
+            role['RoleName']: {'hash': doc_hash, 'verdicts': verdicts if error is None else _error_verdicts(error)}
+            for role, (doc_hash, verdicts, error) in zip(roles, analyzed)
+        }
+
+    return inventory.get('iam.trust_analysis', analyze)
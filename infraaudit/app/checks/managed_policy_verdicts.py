@@ -0,0 +1,157 @@
+import json
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+# AWS 관리형 정책은 계정과 무관하게 문서가 동일하므로 (ARN, 버전)별 판정을 재사용
+VERDICT_TABLE_PATH = Path(__file__).resolve().parent.parent / 'data' / 'aws_managed_policy_verdicts.json'
+
+_table: Optional[Dict] = None
+_runtime_verdicts: Dict[tuple, Dict] = {}
+_lock = threading.Lock()
+
+def is_aws_managed(policy_arn: str) -> bool:
+    return ':iam::aws:policy/' in policy_arn
+
+def _load_table() -> Dict:
+    global _table
+    if _table is None:
+        try:
+            with open(VERDICT_TABLE_PATH, encoding='utf-8') as f:
+                _table = json.load(f)
+        except (OSError, ValueError):
+            _table = {'table_version': None, 'policies': {}}
+    return _table
+
+def table_version() -> Optional[str]:
+    return _load_table().get('table_version')
+
+def lookup_verdict(check_name: str, policy_arn: str, version_id: str) -> Optional[Dict]:
+    """번들 테이블 → 프로세스 내 캐시 순으로 판정 조회. 없으면 None"""
+    verdict = _load_table()['policies'].get(policy_arn, {}).get(version_id, {}).get(check_name)
+    if verdict is not None:
+        return dict(verdict, source='bundled')
+
+    with _lock:
+        verdict = _runtime_verdicts.get((check_name, policy_arn, version_id))
+    if verdict is not None:
+        return dict(verdict, source='cached')
+    return None
+
+def remember_verdict(check_name: str, policy_arn: str, version_id: str, verdict: Dict) -> None:
+    # 테이블에 없는 버전은 한 번 평가한 뒤 프로세스가 살아있는 동안 재사용
+    with _lock:
+        _runtime_verdicts[(check_name, policy_arn, version_id)] = verdict
+
+# 계정에 흔히 연결되는 AWS 관리형 정책 (전체 목록을 조회할 수 없을 때 --common으로 이 정책만 갱신)
+COMMON_POLICY_ARNS = (
+    'arn:aws:iam::aws:policy/AdministratorAccess',
+    'arn:aws:iam::aws:policy/PowerUserAccess',
+    'arn:aws:iam::aws:policy/ReadOnlyAccess',
+    'arn:aws:iam::aws:policy/SecurityAudit',
+    'arn:aws:iam::aws:policy/job-function/ViewOnlyAccess',
+    'arn:aws:iam::aws:policy/IAMFullAccess',
+    'arn:aws:iam::aws:policy/AmazonSSMFullAccess',
+    'arn:aws:iam::aws:policy/AmazonSSMReadOnlyAccess',
+    'arn:aws:iam::aws:policy/AmazonSSMManagedInstanceCore',
+    'arn:aws:iam::aws:policy/service-role/AmazonEC2RoleforSSM',
+    'arn:aws:iam::aws:policy/service-role/AmazonSSMAutomationRole',
+    'arn:aws:iam::aws:policy/AmazonEC2FullAccess',
+    'arn:aws:iam::aws:policy/AmazonEC2ReadOnlyAccess',
+    'arn:aws:iam::aws:policy/AmazonS3FullAccess',
+    'arn:aws:iam::aws:policy/AmazonS3ReadOnlyAccess',
+    'arn:aws:iam::aws:policy/CloudWatchAgentServerPolicy',
+    'arn:aws:iam::aws:policy/CloudWatchFullAccess',
+    'arn:aws:iam::aws:policy/AmazonEKSClusterPolicy',
+    'arn:aws:iam::aws:policy/AmazonEKSWorkerNodePolicy',
+    'arn:aws:iam::aws:policy/service-role/AWSGlueServiceRole',
+    'arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole',
+)
+
+def _managed_policies(iam, policy_arns: Optional[Iterable[str]]) -> Iterator[Dict]:
+    if policy_arns is None:
+        paginator = iam.get_paginator('list_policies')
+        for page in paginator.paginate(Scope='AWS'):
+            yield from page.get('Policies', [])
+        return
+
+    for policy_arn in policy_arns:
+        try:
+            yield iam.get_policy(PolicyArn=policy_arn)['Policy']
+        except iam.exceptions.NoSuchEntityException:
+            # 폐기된 정책은 건너뜀
+            continue
+
+def fetch_policy_documents(session, policy_arns: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, str, Dict]]:
+    """AWS에서 관리형 정책의 (ARN, 기본 버전, 문서)를 조회. policy_arns가 없으면 전체"""
+    iam = session.client('iam')
+    for policy in _managed_policies(iam, policy_arns):
+        version_id = policy['DefaultVersionId']
+        document = iam.get_policy_version(
+            PolicyArn=policy['Arn'],
+            VersionId=version_id
+        )['PolicyVersion']['Document']
+        yield policy['Arn'], version_id, document
+
+def catalog_policy_documents(catalog: Dict[str, Dict],
+                             policy_arns: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, str, Dict]]:
+    """관리형 정책 카탈로그(정책 이름 → {'Path', 'DefaultVersionId', 'Document'})에서 (ARN, 기본 버전, 문서)를 추출
+
+    AWS 자격 증명 없이 테이블을 만들 때 사용 (ListPolicies + GetPolicyVersion 결과를 이름별로 모은 형식)
+    """
+    wanted = set(policy_arns) if policy_arns is not None else None
+    for name, policy in sorted(catalog.items()):
+        policy_arn = f"arn:aws:iam::aws:policy{policy.get('Path', '/')}{name}"
+        if wanted is None or policy_arn in wanted:
+            yield policy_arn, policy['DefaultVersionId'], policy['Document']
+
+def evaluate_policy_documents(documents: Iterable[Tuple[str, str, Dict]],
+                              evaluators: Dict[str, Callable[[Dict], Dict]], table_version: str,
+                              base: Optional[Dict] = None) -> Dict:
+    """(ARN, 버전, 문서) 목록을 평가해 판정 테이블 생성. base를 주면 기존 테이블의 판정을 유지한 채 덧붙인다"""
+    policies = {arn: dict(versions) for arn, versions in (base or {}).get('policies', {}).items()}
+    for policy_arn, version_id, document in documents:
+        policies.setdefault(policy_arn, {})[version_id] = {
+            check_name: evaluate(document)
+            for check_name, evaluate in evaluators.items()
+        }
+    return {'table_version': table_version, 'policies': policies}
+
+def build_verdict_table(session, evaluators: Dict[str, Callable[[Dict], Dict]], table_version: str,
+                        policy_arns: Optional[Iterable[str]] = None, base: Optional[Dict] = None) -> Dict:
+    """AWS 관리형 정책의 기본 버전을 평가해 번들 테이블을 생성 (패키지 갱신 시 수동 실행)
+
+    policy_arns가 없으면 관리형 정책 전체를, 있으면 해당 정책만 평가한다. base를 주면 기존 테이블의 판정을 유지한 채 덧붙인다.
+    """
+    return evaluate_policy_documents(fetch_policy_documents(session, policy_arns), evaluators, table_version, base)
+
+if __name__ == '__main__':
+    import argparse
+    from datetime import date
+    from app.checks.ssm_check import IAMSSMCommandPolicyCheck, evaluate_ssm_send_command
+
+    parser = argparse.ArgumentParser(description='AWS 관리형 정책 판정 테이블 생성')
+    parser.add_argument('table_version', nargs='?', default=date.today().isoformat())
+    parser.add_argument('--common', action='store_true',
+                        help='흔히 연결되는 관리형 정책(COMMON_POLICY_ARNS)만 평가해 기존 테이블에 덧붙임')
+    parser.add_argument('--policy-arn', action='append', dest='policy_arns',
+                        help='지정한 관리형 정책만 평가해 기존 테이블에 덧붙임 (여러 번 지정 가능)')
+    parser.add_argument('--catalog',
+                        help='AWS 대신 관리형 정책 카탈로그 JSON 파일(정책 이름 → Path/DefaultVersionId/Document)에서 문서를 읽음')
+    args = parser.parse_args()
+
+    policy_arns = args.policy_arns or (list(COMMON_POLICY_ARNS) if args.common else None)
+    if args.catalog:
+        with open(args.catalog, encoding='utf-8') as f:
+            documents = catalog_policy_documents(json.load(f), policy_arns)
+    else:
+        import boto3
+        documents = fetch_policy_documents(boto3.Session(), policy_arns)
+    table = evaluate_policy_documents(
+        documents,
+        {IAMSSMCommandPolicyCheck.__name__: evaluate_ssm_send_command},
+        args.table_version,
+        base=_load_table() if policy_arns is not None else None
+    )
+    with open(VERDICT_TABLE_PATH, 'w', encoding='utf-8') as f:
+        json.dump(table, f, ensure_ascii=False, indent=2, sort_keys=True)
@@ -149,7 +149,10 @@ class OpenSearchVPCAccessCheck(BaseCheck):
                             {
                                 'domain_name': domain_name,
                                 'vpc_id': vpc_id,
-                                'subnet_ids': vpc_options.get('SubnetIds', [])
+                                'subnet_ids': vpc_options.get('SubnetIds', []),
+                                'internet_exposure': self.network_exposure(
+                                    vpc_options.get('SecurityGroupIds', []), 443, f"ES {domain_name}"
+                                )
                             }
                         ))
                     else:
@@ -3,9 +3,10 @@ from datetime import datetime
 from typing import List, Dict
 
 class RDSPublicAccessibilityCheck(BaseCheck):
+    requires = ('ec2.security_group_index', 'ec2.public_subnets')
+    
     async def check(self) -> List[Dict]:
         rds = self.session.client('rds')
-        ec2 = self.session.client('ec2')
         results = []
         raw = []
         
@@ -47,48 +48,17 @@ class RDSPublicAccessibilityCheck(BaseCheck):
                 if publicly_accessible:
                     has_public_risk = True
                     
-                    # DB 서브넷 그룹의 서브넷들이 모두 퍼블릭인지 확인
+                    # DB 서브넷 그룹의 서브넷들이 모두 퍼블릭인지 확인 (점검 단위로 일괄 조회한 라우트 테이블 사용)
                     if db_subnet_group_name:
                         try:
-                            subnet_group = rds.describe_db_subnet_groups(
-                                DBSubnetGroupName=db_subnet_group_name
-                            )['DBSubnetGroups'][0]
+                            public_subnets = self.inventory.public_subnets()
+                            subnets = db_instance.get('DBSubnetGroup', {}).get('Subnets')
+                            if subnets is None:
+                                subnets = rds.describe_db_subnet_groups(
+                                    DBSubnetGroupName=db_subnet_group_name
+                                )['DBSubnetGroups'][0]['Subnets']
                             
-                            subnets = subnet_group['Subnets']
-                            all_public = True
-                            
-                            for subnet in subnets:
-                                subnet_id = subnet['SubnetIdentifier']
-                                subnet_info = ec2.describe_subnets(SubnetIds=[subnet_id])['Subnets'][0]
-                                
-                                # 퍼블릭 서브넷 여부 확인 (인터넷 게이트웨이로의 라우트 존재)
-                                route_tables = ec2.describe_route_tables(
-                                    Filters=[
-                                        {'Name': 'association.subnet-id', 'Values': [subnet_id]}
-                                    ]
-                                )['RouteTables']
-                                
-                                if not route_tables:
-                                    # 메인 라우트 테이블 확인
-                                    vpc_id = subnet_info['VpcId']
-                                    route_tables = ec2.describe_route_tables(
-                                        Filters=[
-                                            {'Name': 'vpc-id', 'Values': [vpc_id]},
-                                            {'Name': 'association.main', 'Values': ['true']}
-                                        ]
-                                    )['RouteTables']
-                                
-                                is_public = False
-                                for rt in route_tables:
-                                    for route in rt['Routes']:
-                                        if (route.get('DestinationCidrBlock') == '0.0.0.0/0' and 
-                                            'GatewayId' in route and route['GatewayId'].startswith('igw-')):
-                                            is_public = True
-                                            break
-                                
-                                if not is_public:
-                                    all_public = False
-                                    break
+                            all_public = all(subnet['SubnetIdentifier'] in public_subnets for subnet in subnets)
                             
                             risk_details['all_subnets_public'] = all_public
                             if all_public:
@@ -96,29 +66,20 @@ class RDSPublicAccessibilityCheck(BaseCheck):
                         except Exception:
                             pass
                     
-                    # 보안 그룹 인바운드 규칙에서 넓은 CIDR 범위 확인
-                    for sg in vpc_security_groups:
-                        sg_id = sg['VpcSecurityGroupId']
-                        try:
-                            sg_info = ec2.describe_security_groups(GroupIds=[sg_id])['SecurityGroups'][0]
-                            
-                            for rule in sg_info['IpPermissions']:
-                                from_port = rule.get('FromPort')
-                                to_port = rule.get('ToPort')
-                                
-                                # DB 포트가 포함된 규칙인지 확인
-                                if (from_port is None or from_port <= db_port) and (to_port is None or to_port >= db_port):
-                                    for ip_range in rule.get('IpRanges', []):
-                                        cidr = ip_range.get('CidrIp', '')
-                                        # 넓은 CIDR 범위 확인 (0.0.0.0/0, /8, /16 등)
-                                        if (cidr == '0.0.0.0/0' or 
-                                            cidr.endswith('/0') or 
-                                            cidr.endswith('/8') or 
-                                            cidr.endswith('/16')):
-                                            risk_details['wide_cidr_inbound'] = True
-                                            has_public_risk = True
-                        except Exception:
-                            pass
+                    # ENI 단위 인터넷 노출 (퍼블릭 IP + IGW 라우트 + NACL + 보안 그룹) - 부가 정보이므로 조회 실패 시 None
+                    risk_details['internet_exposure'] = self.network_exposure(
+                        [sg['VpcSecurityGroupId'] for sg in vpc_security_groups], db_port, 'RDSNetworkInterface'
+                    )
+                    
+                    # 보안 그룹 인바운드 규칙에서 넓은 CIDR 범위(/16 이하) 확인 - 점검 단위 SG 인덱스 사용
+                    try:
+                        sg_index = self.inventory.security_group_index()
+                        for sg in vpc_security_groups:
+                            if sg_index.exposing(sg['VpcSecurityGroupId'], [db_port], max_prefix_v4=17):
+                                risk_details['wide_cidr_inbound'] = True
+                                has_public_risk = True
+                    except Exception:
+                        pass
                 
                 if has_public_risk:
                     results.append(self.get_result(
@@ -140,6 +101,8 @@ class RDSPublicAccessibilityCheck(BaseCheck):
 
 
 class RDSSnapshotPublicAccessCheck(BaseCheck):
+    cost_hint = 10
+    
     async def check(self) -> List[Dict]:
         rds = self.session.client('rds')
         results = []
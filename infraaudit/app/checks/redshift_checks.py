@@ -20,6 +20,10 @@ class RedshiftEncryptionCheck(BaseCheck):
             for cluster in clusters['Clusters']:
                 cluster_id = cluster.get('ClusterIdentifier')
                 encrypted = cluster.get('Encrypted', False)
+                internet_exposure = self.network_exposure(
+                    [sg['VpcSecurityGroupId'] for sg in cluster.get('VpcSecurityGroups', [])],
+                    (cluster.get('Endpoint') or {}).get('Port', 5439), 'RedshiftNetworkInterface'
+                )
                 
                 raw.append({
                     'cluster_id': cluster_id,
@@ -35,7 +39,9 @@ class RedshiftEncryptionCheck(BaseCheck):
                         {
                             'cluster_id': cluster_id,
                             'encrypted': True,
-                            'kms_key_id': cluster.get('KmsKeyId')
+                            'kms_key_id': cluster.get('KmsKeyId'),
+                            'publicly_accessible': cluster.get('PubliclyAccessible', False),
+                            'internet_exposure': internet_exposure
                         }
                     ))
                 else:
@@ -44,7 +50,9 @@ class RedshiftEncryptionCheck(BaseCheck):
                         f"Redshift 클러스터 {cluster_id}의 암호화가 비활성화되어 있습니다. | 암호화를 활성화하세요.",
                         {
                             'cluster_id': cluster_id,
-                            'encrypted': False
+                            'encrypted': False,
+                            'publicly_accessible': cluster.get('PubliclyAccessible', False),
+                            'internet_exposure': internet_exposure
                         }
                     ))
         
@@ -0,0 +1,50 @@
+import sys
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, Iterator, Optional, Tuple
+
+# details가 없는 결과가 공유하는 빈 상세 (결과마다 빈 dict를 만들지 않음)
+EMPTY_DETAILS = MappingProxyType({})
+
+class CheckResultRecord(Mapping):
+    """체크 결과 1건. 기존 dict 결과와 같은 방식(result['status'], result.get('message'))으로 읽는 __slots__ 레코드
+
+    check_id/status는 intern된 문자열을 공유하고, message는 템플릿과 인자(params)로 보관했다가 읽을 때 만든다.
+    """
+
+    __slots__ = ('check_id', 'status', 'resource_id', 'template', 'params', 'details')
+    FIELDS = ('check_id', 'status', 'resource_id', 'message', 'details')
+    # 덮어쓸 수 있는 필드 (점검 서비스가 check_id를 등록 이름으로 바꿈)
+    WRITABLE = ('check_id', 'status', 'resource_id', 'details')
+
+    def __init__(self, check_id: str, status: str, resource_id: str, template: str,
+                 params: Optional[Tuple] = None, details: Optional[dict] = None):
+        self.check_id = sys.intern(check_id)
+        self.status = sys.intern(status)
+        self.resource_id = resource_id
+        self.template = template
+        self.params = params
+        self.details = details or EMPTY_DETAILS
+
+    @property
+    def message(self) -> str:
+        return self.template.format(*self.params) if self.params else self.template
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.WRITABLE:
+            raise KeyError(key)
+        setattr(self, key, sys.intern(value) if key in ('check_id', 'status') else value)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+
+    def __repr__(self) -> str:
+        return f"CheckResultRecord({dict(self)!r})"
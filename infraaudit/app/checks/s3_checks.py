@@ -2,16 +2,49 @@ import json
 from .base_check import BaseCheck
 from typing import List, Dict
 
+# Principal '*'에 허용되면 취약한 권한
+DANGEROUS_PUBLIC_ACTIONS = {'s3:GetObject', 's3:PutObject', 's3:*'}
+
+def find_public_policy_statements(policy_document: Dict) -> List[Dict]:
+    """버킷 정책에서 Principal '*'에 위험한 권한을 허용하는 Allow 문 (문서만으로 판정하는 순수 함수)"""
+    statements = []
+    for stmt in policy_document.get('Statement', []):
+        if stmt.get('Effect') != 'Allow':
+            continue
+        principal = stmt.get('Principal')
+        
+        # Principal이 "*"인지 확인
+        is_public_principal = (
+            principal == '*' or 
+            (isinstance(principal, dict) and principal.get('AWS') == '*')
+        )
+        if not is_public_principal:
+            continue
+        
+        # Action에 위험한 권한이 포함되어 있는지 확인
+        action = stmt.get('Action')
+        found_dangerous_action = False
+        if isinstance(action, str):
+            found_dangerous_action = action in DANGEROUS_PUBLIC_ACTIONS
+        elif isinstance(action, list):
+            found_dangerous_action = not DANGEROUS_PUBLIC_ACTIONS.isdisjoint(action)
+        
+        if found_dangerous_action:
+            statements.append(stmt)
+    return statements
+
 class S3PublicAccessAndPolicyCheck(BaseCheck):
     """S3 퍼블릭 액세스 차단과 버킷 정책 종합 점검"""
+    requires = ('s3.buckets', 's3.bucket_configs:public_access_block', 's3.bucket_configs:policy')
+    cost_hint = 5
     
     async def check(self) -> Dict:
-        s3 = self.session.client('s3')
+        s3 = self.inventory.client('s3')
         results = []
         raw = []
         
         try:
-            buckets = s3.list_buckets()
+            buckets = self.dataset('s3.buckets')
             
             if not buckets.get('Buckets'):
                 results.append(self.get_result('PASS', 'N/A', "점검할 S3 버킷이 존재하지 않습니다."))
@@ -24,7 +57,7 @@ class S3PublicAccessAndPolicyCheck(BaseCheck):
                 # 점검 기준 1: 퍼블릭 액세스 차단 설정
                 public_access_blocked = False
                 try:
-                    response = s3.get_public_access_block(Bucket=bucket_name)
+                    response = self.inventory.bucket_config(bucket_name, 'public_access_block')
                     config = response['PublicAccessBlockConfiguration']
                     bucket_data['public_access_block'] = config
                     
@@ -46,7 +79,7 @@ class S3PublicAccessAndPolicyCheck(BaseCheck):
                     block_config = None
                     
                     try:
-                        public_access_block = s3.get_public_access_block(Bucket=bucket_name)
+                        public_access_block = self.inventory.bucket_config(bucket_name, 'public_access_block')
                         block_config = public_access_block['PublicAccessBlockConfiguration']
                         
                         # 모든 퍼블릭 액세스 차단 항목이 활성화되어 있는지 확인
@@ -67,34 +100,16 @@ class S3PublicAccessAndPolicyCheck(BaseCheck):
                     vulnerable_statements = []
                     
                     try:
-                        policy_response = s3.get_bucket_policy(Bucket=bucket_name)
+                        policy_response = self.inventory.bucket_config(bucket_name, 'policy')
                         policy_str = policy_response['Policy']
                         policy_dict = json.loads(policy_str)
                         
-                        for stmt in policy_dict.get('Statement', []):
-                            if stmt.get('Effect') == 'Allow':
-                                principal = stmt.get('Principal')
-                                
-                                # Principal이 "*"인지 확인
-                                is_public_principal = (
-                                    principal == '*' or 
-                                    (isinstance(principal, dict) and principal.get('AWS') == '*')
-                                )
-                                
-                                if is_public_principal:
-                                    action = stmt.get('Action')
-                                    dangerous_actions = {'s3:GetObject', 's3:PutObject', 's3:*'}
-                                    
-                                    # Action에 위험한 권한이 포함되어 있는지 확인
-                                    found_dangerous_action = False
-                                    if isinstance(action, str):
-                                        found_dangerous_action = action in dangerous_actions
-                                    elif isinstance(action, list):
-                                        found_dangerous_action = not dangerous_actions.isdisjoint(action)
-                                    
-                                    if found_dangerous_action:
-                                        has_public_policy = True
-                                        vulnerable_statements.append(stmt)
+                        # 같은 내용의 정책은 한 번만 분석 (같은 계정의 이전 점검에서 분석한 정책은 결과 재사용)
+                        _, public_statements = self.inventory.policies.analyze(
+                            's3_public_policy', policy_dict, find_public_policy_statements
+                        )
+                        vulnerable_statements = list(public_statements)
+                        has_public_policy = bool(vulnerable_statements)
                     
                     except s3.exceptions.ClientError as e:
                         if e.response['Error']['Code'] == 'NoSuchBucketPolicy':
@@ -193,9 +208,11 @@ class S3PublicAccessAndPolicyCheck(BaseCheck):
 
 class S3ACLCheck(BaseCheck):
     """S3 버킷 ACL에 의한 외부 접근 허용 및 정보유출 위험 점검"""
+    requires = ('s3.buckets', 's3.bucket_configs:acl')
+    cost_hint = 5
 
     async def check(self) -> Dict:
-        s3 = self.session.client('s3')
+        s3 = self.inventory.client('s3')
         results = []
         raw = []
         
@@ -209,7 +226,7 @@ class S3ACLCheck(BaseCheck):
         DANGEROUS_PERMISSIONS = ['WRITE', 'WRITE_ACP', 'FULL_CONTROL']
 
         try:
-            buckets_response = s3.list_buckets()
+            buckets_response = self.dataset('s3.buckets')
             
             if not buckets_response.get('Buckets'):
                 results.append(self.get_result('PASS', 'N/A', "점검할 S3 버킷이 존재하지 않습니다."))
@@ -222,7 +239,7 @@ class S3ACLCheck(BaseCheck):
                 
                 try:
                     # ACL 조회
-                    acl_response = s3.get_bucket_acl(Bucket=bucket_name)
+                    acl_response = self.inventory.bucket_config(bucket_name, 'acl')
                     acl_data = acl_response['Grants']
                     
                     raw.append({
@@ -351,9 +368,11 @@ class S3ACLCheck(BaseCheck):
 
 class S3ReplicationRuleCheck(BaseCheck):
     """S3 복제 규칙 대상 버킷 점검"""
+    requires = ('s3.buckets', 's3.bucket_configs:replication')
+    cost_hint = 5
     
     async def check(self) -> Dict:
-        s3 = self.session.client('s3')
+        s3 = self.inventory.client('s3')
         results = []
         raw = []
         
@@ -362,7 +381,7 @@ class S3ReplicationRuleCheck(BaseCheck):
         ALLOWED_TARGET_PATTERNS = []
         
         try:
-            buckets = s3.list_buckets()
+            buckets = self.dataset('s3.buckets')
             
             if not buckets.get('Buckets'):
                 results.append(self.get_result('PASS', 'N/A', "점검할 S3 버킷이 존재하지 않습니다."))
@@ -372,7 +391,7 @@ class S3ReplicationRuleCheck(BaseCheck):
                 bucket_name = bucket['Name']
                 
                 try:
-                    response = s3.get_bucket_replication(Bucket=bucket_name)
+                    response = self.inventory.bucket_config(bucket_name, 'replication')
                     replication_config = response['ReplicationConfiguration']
                     
                     bucket_data = {
@@ -8,6 +8,8 @@ class SESOverlyPermissiveCheck(BaseCheck):
     - 점검 기준: IAM 정책에 ses:SendEmail, ses:PutAccountDetails 등 고위험 SES 액션이
                  Resource:"*"로 광범위하게 허용되어 있으면 취약
     """
+    requires = ('iam.users_with_policies', 'iam.roles_with_policies')
+    cost_hint = 5
 
     def _analyze_ses_statements(self, policy_document: Dict) -> tuple:
         """정책 문서에서 SES 관련 문장을 분석하여 취약한 것과 안전한 것을 구분합니다."""
@@ -52,114 +54,59 @@ class SESOverlyPermissiveCheck(BaseCheck):
         return vulnerable_statements, safe_statements
 
     async def check(self) -> Dict:
-        iam = self.session.client('iam')
         results = []
         raw = []
 
         try:
-            user_paginator = iam.get_paginator('list_users')
-            for page in user_paginator.paginate():
-                for user in page['Users']:
-                    user_name = user['UserName']
-                    user_arn = user['Arn']
+            labels = {'user': '사용자', 'role': '역할'}
+            principals = list(self.dataset('iam.users_with_policies')) + list(self.dataset('iam.roles_with_policies'))
+            
+            for principal in principals:
+                label = labels[principal['type']]
+                principal_name = principal['name']
+                principal_arn = principal['arn']
+                
+                for policy in principal['inline_policies']:
+                    policy_name = policy['name']
+                    policy_doc = policy['document']
+                    raw.append({"principal_arn": principal_arn, "policy_name": policy_name, "policy_type": "inline", "document": policy_doc})
                     
-                    inline_policies = iam.list_user_policies(UserName=user_name).get('PolicyNames', [])
-                    for policy_name in inline_policies:
-                        response = iam.get_user_policy(UserName=user_name, PolicyName=policy_name)
-                        policy_doc = response['PolicyDocument']
-                        raw.append({"principal_arn": user_arn, "policy_name": policy_name, "policy_type": "inline", "document": policy_doc})
-                        
-                        vuln_stmts, safe_stmts = self._analyze_ses_statements(policy_doc)
-                        if vuln_stmts:
-                            results.append(self.get_result(
-                                'FAIL', user_name,
-                                f"사용자 [{user_name}]의 인라인 정책 [{policy_name}]에 과도한 SES 권한이 있습니다. SES를 위한 IAM 역할 정책 속 Resource를 구체적인 ARN, 도메인, 아이덴티티로 제한하세요.",
-                                {"principal_arn": user_arn, "policy_name": policy_name, "vulnerable_statements": vuln_stmts}
-                            ))
-                        elif safe_stmts:
-                            results.append(self.get_result(
-                                'PASS', user_name,
-                                f"사용자 [{user_name}]의 인라인 정책 [{policy_name}]에서 SES 권한이 구체적인 ARN으로 제한되어 있습니다.",
-                                {"principal_arn": user_arn, "policy_name": policy_name, "safe_statements": safe_stmts}
-                            ))
-
-                    attached_policies = iam.list_attached_user_policies(UserName=user_name).get('AttachedPolicies', [])
-                    for policy in attached_policies:
-                        policy_arn = policy['PolicyArn']
-                        if "awsmanaged" in policy_arn.lower(): 
-                            continue 
-                        
-                        policy_details = iam.get_policy(PolicyArn=policy_arn)
-                        version_id = policy_details['Policy']['DefaultVersionId']
-                        policy_version = iam.get_policy_version(PolicyArn=policy_arn, VersionId=version_id)
-                        policy_doc = policy_version['PolicyVersion']['Document']
-                        raw.append({"principal_arn": user_arn, "policy_arn": policy_arn, "policy_type": "attached", "document": policy_doc})
-
-                        vuln_stmts, safe_stmts = self._analyze_ses_statements(policy_doc)
-                        if vuln_stmts:
-                            results.append(self.get_result(
-                                'FAIL', user_name,
-                                f"사용자 [{user_name}]에 연결된 정책 [{policy_arn}]에 과도한 SES 권한이 있습니다. SES를 위한 IAM 역할 정책 속 Resource를 구체적인 ARN, 도메인, 아이덴티티로 제한해야 합니다.",
-                                {"principal_arn": user_arn, "policy_arn": policy_arn, "vulnerable_statements": vuln_stmts}
-                            ))
-                        elif safe_stmts:
-                            results.append(self.get_result(
-                                'PASS', user_name,
-                                f"사용자 [{user_name}]에 연결된 정책 [{policy_arn}]에서 SES 권한이 구체적인 ARN으로 제한되어 있습니다.",
-                                {"principal_arn": user_arn, "policy_arn": policy_arn, "safe_statements": safe_stmts}
-                            ))
-
-            role_paginator = iam.get_paginator('list_roles')
-            for page in role_paginator.paginate():
-                for role in page['Roles']:
-                    role_name = role['RoleName']
-                    role_arn = role['Arn']
+                    vuln_stmts, safe_stmts = self._analyze_ses_statements(policy_doc)
+                    if vuln_stmts:
+                        results.append(self.get_result(
+                            'FAIL', principal_name,
+                            f"{label} [{principal_name}]의 인라인 정책 [{policy_name}]에 과도한 SES 권한이 있습니다. SES를 위한 IAM 역할 정책 속 Resource를 구체적인 ARN, 도메인, 아이덴티티로 제한하세요.",
+                            {"principal_arn": principal_arn, "policy_name": policy_name, "vulnerable_statements": vuln_stmts}
+                        ))
+                    elif safe_stmts:
+                        results.append(self.get_result(
+                            'PASS', principal_name,
+                            f"{label} [{principal_name}]의 인라인 정책 [{policy_name}]에서 SES 권한이 구체적인 ARN으로 제한되어 있습니다.",
+                            {"principal_arn": principal_arn, "policy_name": policy_name, "safe_statements": safe_stmts}
+                        ))
+                
+                for policy in principal['attached_policies']:
+                    policy_arn = policy['arn']
+                    if "awsmanaged" in policy_arn.lower():
+                        continue
                     
-                    inline_policies = iam.list_role_policies(RoleName=role_name).get('PolicyNames', [])
-                    for policy_name in inline_policies:
-                        response = iam.get_role_policy(RoleName=role_name, PolicyName=policy_name)
-                        policy_doc = response['PolicyDocument']
-                        raw.append({"principal_arn": role_arn, "policy_name": policy_name, "policy_type": "inline", "document": policy_doc})
-
-                        vuln_stmts, safe_stmts = self._analyze_ses_statements(policy_doc)
-                        if vuln_stmts:
-                            results.append(self.get_result(
-                                'FAIL', role_name,
-                                f"역할 [{role_name}]의 인라인 정책 [{policy_name}]에 과도한 SES 권한이 있습니다. SES를 위한 IAM 역할 정책 속 Resource를 구체적인 ARN, 도메인, 아이덴티티로 제한하세요.",
-                                {"principal_arn": role_arn, "policy_name": policy_name, "vulnerable_statements": vuln_stmts}
-                            ))
-                        elif safe_stmts:
-                            results.append(self.get_result(
-                                'PASS', role_name,
-                                f"역할 [{role_name}]의 인라인 정책 [{policy_name}]에서 SES 권한이 구체적인 ARN으로 제한되어 있습니다.",
-                                {"principal_arn": role_arn, "policy_name": policy_name, "safe_statements": safe_stmts}
-                            ))
+                    # 같은 관리형 정책 문서는 ARN당 한 번만 조회
+                    policy_doc = self.inventory.policy_document(policy_arn)
+                    raw.append({"principal_arn": principal_arn, "policy_arn": policy_arn, "policy_type": "attached", "document": policy_doc})
                     
-                    attached_policies = iam.list_attached_role_policies(RoleName=role_name).get('AttachedPolicies', [])
-                    for policy in attached_policies:
-                        policy_arn = policy['PolicyArn']
-                        if "awsmanaged" in policy_arn.lower(): 
-                            continue
-
-                        policy_details = iam.get_policy(PolicyArn=policy_arn)
-                        version_id = policy_details['Policy']['DefaultVersionId']
-                        policy_version = iam.get_policy_version(PolicyArn=policy_arn, VersionId=version_id)
-                        policy_doc = policy_version['PolicyVersion']['Document']
-                        raw.append({"principal_arn": role_arn, "policy_arn": policy_arn, "policy_type": "attached", "document": policy_doc})
-
-                        vuln_stmts, safe_stmts = self._analyze_ses_statements(policy_doc)
-                        if vuln_stmts:
-                            results.append(self.get_result(
-                                'FAIL', role_name,
-                                f"역할 [{role_name}]에 연결된 정책 [{policy_arn}]에 과도한 SES 권한이 있습니다. SES를 위한 IAM 역할 정책 속 Resource를 구체적인 ARN, 도메인, 아이덴티티로 제한하세요.",
-                                {"principal_arn": role_arn, "policy_arn": policy_arn, "vulnerable_statements": vuln_stmts}
-                            ))
-                        elif safe_stmts:
-                            results.append(self.get_result(
-                                'PASS', role_name,
-                                f"역할 [{role_name}]에 연결된 정책 [{policy_arn}]에서 SES 권한이 구체적인 ARN으로 제한되어 있습니다.",
-                                {"principal_arn": role_arn, "policy_arn": policy_arn, "safe_statements": safe_stmts}
-                            ))
+                    vuln_stmts, safe_stmts = self._analyze_ses_statements(policy_doc)
+                    if vuln_stmts:
+                        results.append(self.get_result(
+                            'FAIL', principal_name,
+                            f"{label} [{principal_name}]에 연결된 정책 [{policy_arn}]에 과도한 SES 권한이 있습니다. SES를 위한 IAM 역할 정책 속 Resource를 구체적인 ARN, 도메인, 아이덴티티로 제한하세요.",
+                            {"principal_arn": principal_arn, "policy_arn": policy_arn, "vulnerable_statements": vuln_stmts}
+                        ))
+                    elif safe_stmts:
+                        results.append(self.get_result(
+                            'PASS', principal_name,
+                            f"{label} [{principal_name}]에 연결된 정책 [{policy_arn}]에서 SES 권한이 구체적인 ARN으로 제한되어 있습니다.",
+                            {"principal_arn": principal_arn, "policy_arn": policy_arn, "safe_statements": safe_stmts}
+                        ))
 
             if not results:
                 results.append(self.get_result(
@@ -4,9 +4,10 @@ from typing import List, Dict
 import json
 
 class SQSAccessPolicyCheck(BaseCheck):
+    requires = ('iam.users',)
+    
     async def check(self) -> List[Dict]:
         sqs = self.session.client('sqs')
-        iam = self.session.client('iam')
         results = []
         raw = []
         
@@ -14,8 +15,7 @@ class SQSAccessPolicyCheck(BaseCheck):
             # 현재 계정의 활성 사용자 목록 조회
             active_users = set()
             try:
-                users = iam.list_users()
-                for user in users['Users']:
+                for user in self.dataset('iam.users'):
                     active_users.add(user['Arn'])
             except Exception:
                 pass
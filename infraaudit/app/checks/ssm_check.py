@@ -1,119 +1,178 @@
 from .base_check import BaseCheck
+from .managed_policy_verdicts import is_aws_managed, lookup_verdict, remember_verdict
 from datetime import datetime
 from typing import List, Dict
 
+def evaluate_ssm_send_command(policy_document: Dict) -> Dict:
+    """정책 문서의 ssm:SendCommand 허용 범위 판정 (AWS 호출 없는 순수 함수)"""
+    vulnerable = False
+    issues = []
+    # 문장이 하나뿐인 정책은 Statement가 리스트가 아닌 객체일 수 있음
+    statements = policy_document.get('Statement', [])
+    if isinstance(statements, dict):
+        statements = [statements]
+    
+    for statement in statements:
+        effect = statement.get('Effect', '')
+        actions = statement.get('Action', [])
+        principal = statement.get('Principal', {})
+        resource = statement.get('Resource', [])
+        condition = statement.get('Condition', {})
+        
+        if effect == 'Allow':
+            if isinstance(actions, str):
+                actions = [actions]
+            
+            # ssm:SendCommand 권한 확인
+            has_send_command = any('ssm:SendCommand' in action or action == '*' for action in actions)
+            
+            if has_send_command:
+                # Principal이 "*"인지 확인
+                if principal == "*" or (isinstance(principal, dict) and principal.get('AWS') == "*"):
+                    vulnerable = True
+                    issues.append("ssm:SendCommand가 Principal '*'로 허용됨")
+                
+                # Resource가 "*"인지 확인
+                if isinstance(resource, str):
+                    resource = [resource]
+                if "*" in resource:
+                    vulnerable = True
+                    issues.append("ssm:SendCommand가 Resource '*'로 허용됨")
+                
+                # 위험한 문서 실행 가능 여부 및 조건 확인
+                if not condition:
+                    vulnerable = True
+                    issues.append("ssm:SendCommand에 대상 인스턴스 제한 조건이 없음")
+                else:
+                    # 태그나 리소스 ARN 조건이 있는지 확인
+                    has_restriction = any(
+                        key in condition for key in [
+                            'StringEquals', 'StringLike', 'ForAllValues:StringEquals',
+                            'aws:RequestedRegion', 'ec2:ResourceTag'
+                        ]
+                    )
+                    if not has_restriction:
+                        vulnerable = True
+                        issues.append("ssm:SendCommand에 적절한 제한 조건이 없음")
+    
+    # ssm:SendCommand가 있는 정책만 양호로 표시
+    has_ssm_command = any(
+        any('ssm:SendCommand' in action for action in (stmt.get('Action', []) if isinstance(stmt.get('Action', []), list) else [stmt.get('Action', '')]))
+        for stmt in statements
+        if stmt.get('Effect') == 'Allow'
+    )
+    
+    return {'vulnerable': vulnerable, 'issues': issues, 'has_ssm_command': has_ssm_command}
+
 class IAMSSMCommandPolicyCheck(BaseCheck):
+    cost_hint = 10
+    
+    # 기본적으로 사용자/그룹/역할에 연결된 정책만 점검
+    only_attached = True
+    
     async def check(self) -> List[Dict]:
-        iam = self.session.client('iam')
+        iam = self.inventory.client('iam')
+        check_name = self.__class__.__name__
         results = []
         raw = []
         
         try:
-            policies = iam.list_policies(Scope='All', MaxItems=1000)
+            policies = []
+            paginator = iam.get_paginator('list_policies')
+            for page in paginator.paginate(Scope='All', OnlyAttached=self.only_attached):
+                policies.extend(page.get('Policies', []))
             
-            if not policies['Policies']:
+            if not policies:
                 results.append(self.get_result(
                     '양호', 'N/A',
                     "IAM 정책이 존재하지 않습니다."
                 ))
                 return {'results': results, 'raw': raw, 'guideline_id': 35}
             
-            dangerous_documents = ['AWS-RunShellScript', 'AWS-RunPowerShellScript']
-            
-            for policy in policies['Policies']:
+            # 1단계: 판정 테이블 조회 / 판정이 없는 정책의 문서 수집
+            entries = []
+            for policy in policies:
                 policy_name = policy['PolicyName']
                 policy_arn = policy['Arn']
+                version_id = policy['DefaultVersionId']
+                entry = {'policy': policy, 'aws_managed': is_aws_managed(policy_arn), 'verdict': None,
+                         'policy_document': None, 'policy_hash': None, 'error': None}
+                entries.append(entry)
                 
                 try:
-                    policy_version = iam.get_policy_version(
-                        PolicyArn=policy_arn,
-                        VersionId=policy['DefaultVersionId']
-                    )
+                    # AWS 관리형 정책은 번들 판정 테이블을 우선 사용하고, 고객 관리형 정책만 문서를 조회
+                    if entry['aws_managed']:
+                        entry['verdict'] = lookup_verdict(check_name, policy_arn, version_id)
                     
-                    policy_document = policy_version['PolicyVersion']['Document']
-                    
-                    raw.append({
-                        'policy_name': policy_name,
-                        'policy_arn': policy_arn,
-                        'policy_document': policy_document
-                    })
-                    
-                    vulnerable = False
-                    issues = []
-                    
-                    for statement in policy_document.get('Statement', []):
-                        effect = statement.get('Effect', '')
-                        actions = statement.get('Action', [])
-                        principal = statement.get('Principal', {})
-                        resource = statement.get('Resource', [])
-                        condition = statement.get('Condition', {})
-                        
-                        if effect == 'Allow':
-                            if isinstance(actions, str):
-                                actions = [actions]
-                            
-                            # ssm:SendCommand 권한 확인
-                            has_send_command = any('ssm:SendCommand' in action or action == '*' for action in actions)
-                            
-                            if has_send_command:
-                                # Principal이 "*"인지 확인
-                                if principal == "*" or (isinstance(principal, dict) and principal.get('AWS') == "*"):
-                                    vulnerable = True
-                                    issues.append("ssm:SendCommand가 Principal '*'로 허용됨")
-                                
-                                # Resource가 "*"인지 확인
-                                if isinstance(resource, str):
-                                    resource = [resource]
-                                if "*" in resource:
-                                    vulnerable = True
-                                    issues.append("ssm:SendCommand가 Resource '*'로 허용됨")
-                                
-                                # 위험한 문서 실행 가능 여부 및 조건 확인
-                                if not condition:
-                                    vulnerable = True
-                                    issues.append("ssm:SendCommand에 대상 인스턴스 제한 조건이 없음")
-                                else:
-                                    # 태그나 리소스 ARN 조건이 있는지 확인
-                                    has_restriction = any(
-                                        key in condition for key in [
-                                            'StringEquals', 'StringLike', 'ForAllValues:StringEquals',
-                                            'aws:RequestedRegion', 'ec2:ResourceTag'
-                                        ]
-                                    )
-                                    if not has_restriction:
-                                        vulnerable = True
-                                        issues.append("ssm:SendCommand에 적절한 제한 조건이 없음")
-                    
-                    if vulnerable:
-                        results.append(self.get_result(
-                            'FAIL', policy_name,
-                            f"정책 {policy_name}에서 ssm:SendCommand 권한이 과도하게 허용되어 있습니다: {', '.join(issues)}",
-                            {
-                                'policy_name': policy_name,
-                                'policy_document': policy_document,
-                                'issues': issues
-                            }
-                        ))
-                    else:
-                        # ssm:SendCommand가 있는 정책만 양호로 표시
-                        has_ssm_command = any(
-                            any('ssm:SendCommand' in action for action in (stmt.get('Action', []) if isinstance(stmt.get('Action', []), list) else [stmt.get('Action', '')]))
-                            for stmt in policy_document.get('Statement', [])
-                            if stmt.get('Effect') == 'Allow'
+                    if entry['verdict'] is None:
+                        policy_version = iam.get_policy_version(
+                            PolicyArn=policy_arn,
+                            VersionId=version_id
                         )
-                        
-                        if has_ssm_command:
-                            results.append(self.get_result(
-                                'PASS', policy_name,
-                                f"정책 {policy_name}의 ssm:SendCommand 권한이 적절히 제한되어 있습니다.",
-                                {
-                                    'policy_name': policy_name,
-                                    'policy_document': policy_document
-                                }
-                            ))
-                        
+                        entry['policy_document'] = policy_version['PolicyVersion']['Document']
                 except Exception as e:
-                    results.append(self.get_result('ERROR', policy_name, f"정책 {policy_name} 확인 중 오류: {str(e)}"))
+                    entry['error'] = str(e)
+            
+            # 2단계: 수집한 문서를 한 번에 분석 (고유 문서만, 설정 시 프로세스 풀 사용)
+            to_analyze = [entry for entry in entries if entry['policy_document'] is not None]
+            analyzed = self.inventory.policies.analyze_many(
+                'ssm_send_command', [entry['policy_document'] for entry in to_analyze], evaluate_ssm_send_command
+            )
+            for entry, (policy_hash, verdict, error) in zip(to_analyze, analyzed):
+                entry['policy_hash'] = policy_hash
+                if error is not None:
+                    entry['error'] = error
+                    continue
+                policy = entry['policy']
+                if entry['aws_managed']:
+                    remember_verdict(check_name, policy['Arn'], policy['DefaultVersionId'], verdict)
+                entry['verdict'] = dict(verdict, source='evaluated')
+            
+            # 3단계: 결과 생성
+            for entry in entries:
+                policy_name = entry['policy']['PolicyName']
+                policy_arn = entry['policy']['Arn']
+                version_id = entry['policy']['DefaultVersionId']
+                policy_document = entry['policy_document']
+                policy_hash = entry['policy_hash']
+                verdict = entry['verdict']
+                
+                if entry['error'] is not None:
+                    results.append(self.get_result('ERROR', policy_name, f"정책 {policy_name} 확인 중 오류: {entry['error']}"))
+                    continue
+                
+                raw_entry = {
+                    'policy_name': policy_name,
+                    'policy_arn': policy_arn,
+                    'policy_version': version_id,
+                    'verdict_source': verdict['source']
+                }
+                if policy_hash is not None:
+                    # 문서 본문은 점검 단위 정책 저장소에 한 번만 보관하고 해시로 참조
+                    raw_entry['policy_hash'] = policy_hash
+                raw.append(raw_entry)
+                
+                details = {
+                    'policy_name': policy_name,
+                    'policy_arn': policy_arn,
+                    'verdict_source': verdict['source']
+                }
+                if policy_document is not None:
+                    details['policy_document'] = policy_document
+                    details['policy_hash'] = policy_hash
+                
+                if verdict['vulnerable']:
+                    results.append(self.get_result(
+                        'FAIL', policy_name,
+                        f"정책 {policy_name}에서 ssm:SendCommand 권한이 과도하게 허용되어 있습니다: {', '.join(verdict['issues'])}",
+                        dict(details, issues=verdict['issues'])
+                    ))
+                elif verdict['has_ssm_command']:
+                    results.append(self.get_result(
+                        'PASS', policy_name,
+                        f"정책 {policy_name}의 ssm:SendCommand 권한이 적절히 제한되어 있습니다.",
+                        details
+                    ))
                     
         except Exception as e:
             results.append(self.get_result('ERROR', 'N/A', str(e)))
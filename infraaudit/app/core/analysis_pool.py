@@ -0,0 +1,74 @@
+import atexit
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 순수 분석 함수(문서 → 판정)를 별도 프로세스에서 실행하는 선택적 단계
+# AUDIT_ANALYSIS_PROCESSES가 0(기본값)이면 사용하지 않고 현재 프로세스에서 분석한다.
+ANALYSIS_PROCESSES = int(os.environ.get('AUDIT_ANALYSIS_PROCESSES', '0'))
+# 이보다 적은 문서는 프로세스 간 전송 비용이 더 크므로 현재 프로세스에서 분석
+ANALYSIS_MIN_DOCUMENTS = int(os.environ.get('AUDIT_ANALYSIS_MIN_DOCUMENTS', '500'))
+ANALYSIS_CHUNK_SIZE = int(os.environ.get('AUDIT_ANALYSIS_CHUNK_SIZE', '200'))
+# 점검 스레드와 이벤트 루프가 도는 프로세스를 fork하면 다른 스레드가 잡고 있던 잠금까지 복제되므로 fork를 쓰지 않음
+ANALYSIS_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    global _executor
+    if ANALYSIS_PROCESSES <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=ANALYSIS_PROCESSES,
+                mp_context=multiprocessing.get_context(ANALYSIS_START_METHOD)
+            )
+            atexit.register(_executor.shutdown, wait=False, cancel_futures=True)
+        return _executor
+
+def _reset_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+def _evaluate(analyzer: Callable[[Dict], Any], documents: List[Dict]) -> List[Tuple[Any, Optional[str]]]:
+    results = []
+    for document in documents:
+        try:
+            results.append((analyzer(document), None))
+        except Exception as e:
+            # 문서 하나의 오류가 같은 묶음의 다른 문서 분석을 막지 않도록 문서별로 기록
+            results.append((None, str(e)))
+    return results
+
+def _evaluate_chunk(analyzer: Callable[[Dict], Any], documents: List[str]) -> List[Tuple[Any, Optional[str]]]:
+    # 워커 프로세스: 정규화된 JSON 문자열을 받아 분석 (analyzer는 모듈 최상위 함수여야 pickle 가능)
+    return _evaluate(analyzer, [json.loads(document) for document in documents])
+
+def evaluate_documents(analyzer: Callable[[Dict], Any], documents: List[Dict],
+                       serialize: Callable[[Dict], str]) -> List[Tuple[Any, Optional[str]]]:
+    """문서 목록을 analyzer로 분석해 (결과, 오류) 목록을 반환
+
+    문서가 ANALYSIS_MIN_DOCUMENTS 이상이고 프로세스 풀이 설정된 경우에만 serialize로 직렬화해 워커로 분산한다.
+    """
+    executor = _get_executor()
+    if executor is None or len(documents) < ANALYSIS_MIN_DOCUMENTS:
+        return _evaluate(analyzer, documents)
+
+    serialized = [serialize(document) for document in documents]
+    chunks = [serialized[i:i + ANALYSIS_CHUNK_SIZE] for i in range(0, len(serialized), ANALYSIS_CHUNK_SIZE)]
+    try:
+        futures = [executor.submit(_evaluate_chunk, analyzer, chunk) for chunk in chunks]
+        return [result for future in futures for result in future.result()]
+    except BrokenProcessPool:
+        # 워커가 비정상 종료되면 풀을 버리고 현재 프로세스에서 다시 분석
+        _reset_executor()
+        return _evaluate(analyzer, documents)
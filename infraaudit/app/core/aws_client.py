@@ -1,6 +1,8 @@
+import threading
 import boto3
 from botocore.exceptions import ClientError
-from typing import Dict
+from typing import Dict, Optional
+from app.core.call_tracker import ApiCallTracker, current_check
 
 class AWSClientManager:
     def __init__(self):
@@ -36,3 +38,49 @@ class AWSClientManager:
             aws_secret_access_key=credentials['aws_secret_access_key'],
             aws_session_token=credentials['aws_session_token']
         )
+
+class AuditInterrupted(Exception):
+    """시간 초과/취소된 체크(또는 점검 전체)에서 새 AWS API 호출을 막을 때 발생"""
+
+class AuditSession:
+    """점검 1회 동안 여러 체크 스레드가 공유하는 세션
+
+    boto3.Session은 스레드 안전하지 않으므로 client()를 잠금으로 감싸고 서비스별 클라이언트를 재사용한다.
+    생성되는 모든 클라이언트의 API 호출은 call_tracker에 집계되며, 호출 예산을 넘는 호출은 CallBudgetExceeded로 실패한다.
+    """
+
+    def __init__(self, session: boto3.Session, max_calls: Optional[int] = None,
+                 service_limits: Optional[Dict[str, int]] = None):
+        self._session = session
+        self._clients = {}
+        self._lock = threading.Lock()
+        self.call_tracker = ApiCallTracker(max_calls, service_limits)
+        # 중단 사유: 체크 이름 → 사유 (None 키는 점검 전체)
+        self._interrupted: Dict[Optional[str], str] = {}
+        # 클라이언트 생성 전에 등록해야 이후 생성되는 클라이언트에 핸들러가 복사됨
+        # 중단 확인을 먼저 등록해 막힌 호출은 집계되지 않도록 함
+        # before-send는 재시도를 포함한 HTTP 요청마다 호출되므로 스로틀링 재시도 중인 호출도 중단됨
+        events = getattr(session, 'events', None)
+        if events is not None:
+            events.register('before-call', self._guard)
+            events.register('before-call', self.call_tracker.on_before_call)
+            events.register('before-send', self._guard)
+
+    def interrupt(self, reason: str, check_name: Optional[str] = None) -> None:
+        """이후 해당 체크(없으면 모든 스레드)의 AWS API 호출이 AuditInterrupted로 실패하도록 설정"""
+        self._interrupted.setdefault(check_name, reason)
+
+    def _guard(self, **kwargs) -> None:
+        reason = self._interrupted.get(None) or self._interrupted.get(current_check.get())
+        if reason:
+            raise AuditInterrupted(reason)
+
+    def client(self, service_name: str, **kwargs):
+        key = (service_name, tuple(sorted(kwargs.items())))
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = self._session.client(service_name, **kwargs)
+            return self._clients[key]
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
@@ -0,0 +1,95 @@
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+# 현재 실행 중인 체크 이름 (체크 스레드에서 설정, 선조회 스레드에서는 None)
+current_check: ContextVar[Optional[str]] = ContextVar('current_check', default=None)
+
+# 체크 밖(인벤토리 선조회 등)에서 발생한 호출을 집계하는 이름
+INVENTORY_SCOPE = 'inventory'
+
+class CallBudgetExceeded(Exception):
+    """점검의 AWS API 호출 예산(전체 또는 서비스별)을 넘는 호출을 막을 때 발생"""
+
+def operation_key(model=None, event_name: Optional[str] = None) -> Tuple[str, str]:
+    """before-call 이벤트의 (서비스, 작업) 이름. model이 없으면 이벤트 이름(before-call.<서비스>.<작업>)에서 추출"""
+    if model is not None:
+        return model.service_model.service_name, model.name
+    parts = (event_name or '').split('.')
+    if len(parts) >= 3:
+        return parts[1], parts[2]
+    return 'unknown', 'unknown'
+
+class ApiCallTracker:
+    """botocore before-call 이벤트로 점검 중 발생한 AWS API 호출 수를 체크별, 서비스/작업별로 집계
+
+    max_calls(점검 전체)나 service_limits(서비스별)를 주면 예산을 넘는 호출은 집계하지 않고 CallBudgetExceeded로 실패시킨다.
+    """
+
+    def __init__(self, max_calls: Optional[int] = None, service_limits: Optional[Dict[str, int]] = None):
+        self._lock = threading.Lock()
+        self.by_check: Counter = Counter()
+        self.by_operation: Counter = Counter()
+        self.by_service: Counter = Counter()
+        self.max_calls = max_calls
+        self.service_limits = dict(service_limits or {})
+        # 예산 초과로 막은 서비스별 / 체크별 호출 수
+        self.rejected: Counter = Counter()
+        self.rejected_by_check: Counter = Counter()
+
+    def on_before_call(self, model=None, event_name: Optional[str] = None, **kwargs) -> None:
+        service, operation = operation_key(model, event_name)
+        scope = current_check.get() or INVENTORY_SCOPE
+        with self._lock:
+            reason = self._over_budget(service)
+            if reason:
+                self.rejected[service] += 1
+                self.rejected_by_check[scope] += 1
+                raise CallBudgetExceeded(reason)
+            self.by_check[scope] += 1
+            self.by_operation[(service, operation)] += 1
+            self.by_service[service] += 1
+
+    def _over_budget(self, service: str) -> Optional[str]:
+        # self._lock을 잡은 상태에서 호출
+        if self.max_calls is not None and sum(self.by_service.values()) >= self.max_calls:
+            return f"점검의 AWS API 호출 예산({self.max_calls}회)을 모두 사용했습니다."
+        limit = self.service_limits.get(service)
+        if limit is not None and self.by_service[service] >= limit:
+            return f"점검의 {service} API 호출 예산({limit}회)을 모두 사용했습니다."
+        return None
+
+    @property
+    def exhausted(self) -> bool:
+        """점검 전체 호출 예산을 모두 사용했는지 여부 (서비스별 예산은 해당 서비스 호출만 막음)"""
+        with self._lock:
+            return self.max_calls is not None and sum(self.by_service.values()) >= self.max_calls
+
+    def calls_for(self, check_name: str) -> int:
+        with self._lock:
+            return self.by_check[check_name]
+
+    def rejected_for(self, check_name: str) -> int:
+        with self._lock:
+            return self.rejected_by_check[check_name]
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.by_check)
+
+    def report(self) -> Dict:
+        """서비스/작업별 호출 수와 예산 사용 현황 (점검 summary의 api_calls)"""
+        with self._lock:
+            by_service = {}
+            for (service, operation), count in sorted(self.by_operation.items()):
+                by_service.setdefault(service, {})[operation] = count
+            report = {'total': sum(self.by_service.values()), 'by_service': by_service}
+            if self.max_calls is not None or self.service_limits:
+                report['budget'] = {
+                    'max_calls': self.max_calls,
+                    'service_limits': self.service_limits,
+                    'exceeded': bool(self.rejected),
+                    'rejected_calls': dict(self.rejected)
+                }
+            return report
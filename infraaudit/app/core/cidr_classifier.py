@@ -0,0 +1,125 @@
+import ipaddress
+import socket
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+# RFC1918 / ULA 등 인터넷에서 직접 도달할 수 없는 대역
+PRIVATE_RANGES = (
+    '10.0.0.0/8', '172.16.0.0/12', '192.168.0.0/16', '127.0.0.0/8', '169.254.0.0/16',
+    'fc00::/7', 'fe80::/10', '::1/128',
+)
+
+def _split(cidr: str):
+    if not isinstance(cidr, str):
+        return None, None
+    address, _, prefix = cidr.partition('/')
+    return address, prefix
+
+class CidrBatch:
+    """CIDR 문자열 목록을 한 번에 파싱해 prefix 길이/대역 포함 여부를 일괄 계산
+
+    IPv4는 uint32 (network, prefix) 배열, IPv6는 uint64 두 개(상위/하위)로 저장한다.
+    보안 그룹 색인을 만들 때 한 번 분류하고, 이후 포트/prefix 조회는 항목에 기록된 값으로 한다.
+    """
+
+    def __init__(self, cidrs: Iterable[str]):
+        self.cidrs: List[str] = list(cidrs)
+        self.size = len(self.cidrs)
+        self._parse_arrays()
+
+    def _parse_arrays(self):
+        v4_index, v4_packed, v4_prefix = [], [], []
+        v6_index, v6_packed, v6_prefix = [], [], []
+
+        for i, cidr in enumerate(self.cidrs):
+            address, prefix = _split(cidr)
+            if address is None:
+                continue
+            family, packed_list, prefix_list, index_list, max_len = (
+                (socket.AF_INET6, v6_packed, v6_prefix, v6_index, 128) if ':' in address
+                else (socket.AF_INET, v4_packed, v4_prefix, v4_index, 32)
+            )
+            try:
+                packed = socket.inet_pton(family, address)
+                length = int(prefix) if prefix else max_len
+            except (OSError, ValueError):
+                continue
+            if not 0 <= length <= max_len:
+                continue
+            index_list.append(i)
+            packed_list.append(packed)
+            prefix_list.append(length)
+
+        self.version = np.zeros(self.size, dtype=np.uint8)
+        self.prefix = np.zeros(self.size, dtype=np.uint8)
+
+        self.v4_index = np.array(v4_index, dtype=np.int64)
+        self.v4_prefix = np.array(v4_prefix, dtype=np.uint8)
+        self.v4_net = np.frombuffer(b''.join(v4_packed), dtype='>u4').astype(np.uint32) & self._v4_mask(self.v4_prefix)
+        self.version[self.v4_index] = 4
+        self.prefix[self.v4_index] = self.v4_prefix
+
+        self.v6_index = np.array(v6_index, dtype=np.int64)
+        self.v6_prefix = np.array(v6_prefix, dtype=np.uint8)
+        v6 = np.frombuffer(b''.join(v6_packed), dtype='>u8').astype(np.uint64).reshape(-1, 2)
+        hi_mask, lo_mask = self._v6_mask(self.v6_prefix)
+        self.v6_hi = v6[:, 0] & hi_mask
+        self.v6_lo = v6[:, 1] & lo_mask
+        self.version[self.v6_index] = 6
+        self.prefix[self.v6_index] = self.v6_prefix
+
+    @staticmethod
+    def _v4_mask(prefix):
+        shift = (32 - prefix.astype(np.int64)).astype(np.uint64)
+        return ((np.uint64(0xFFFFFFFF) << shift) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+    @staticmethod
+    def _u64_mask(shift):
+        # shift가 64이면 마스크는 0 (numpy 시프트는 64 이상에서 정의되지 않음)
+        ones = np.uint64(0xFFFFFFFFFFFFFFFF)
+        return np.where(shift >= 64, np.uint64(0), ones << np.minimum(shift, 63).astype(np.uint64))
+
+    @classmethod
+    def _v6_mask(cls, prefix):
+        prefix = prefix.astype(np.int64)
+        hi_mask = cls._u64_mask(64 - np.minimum(prefix, 64))
+        lo_mask = cls._u64_mask(128 - np.maximum(prefix, 64))
+        return hi_mask, lo_mask
+
+    def _match(self, ranges: Iterable[str]):
+        result = np.zeros(self.size, dtype=bool)
+        for cidr in ranges:
+            network = ipaddress.ip_network(cidr, strict=False)
+            range_prefix = network.prefixlen
+            if network.version == 4:
+                if not len(self.v4_index):
+                    continue
+                common = np.minimum(self.v4_prefix, range_prefix).astype(np.uint8)
+                base = np.uint32(int(network.network_address))
+                hit = (self.v4_net & self._v4_mask(common)) == (base & self._v4_mask(common))
+                hit &= self.v4_prefix >= range_prefix
+                result[self.v4_index[hit]] = True
+            else:
+                if not len(self.v6_index):
+                    continue
+                common = np.minimum(self.v6_prefix, range_prefix).astype(np.uint8)
+                hi_mask, lo_mask = self._v6_mask(common)
+                value = int(network.network_address)
+                base_hi, base_lo = np.uint64(value >> 64), np.uint64(value & 0xFFFFFFFFFFFFFFFF)
+                hit = ((self.v6_hi & hi_mask) == (base_hi & hi_mask)) & ((self.v6_lo & lo_mask) == (base_lo & lo_mask))
+                hit &= self.v6_prefix >= range_prefix
+                result[self.v6_index[hit]] = True
+        return result
+
+    # ----- 공개 API (list 반환) -----
+    def versions(self) -> List[Optional[int]]:
+        """항목별 IP 버전 (파싱 실패 시 None)"""
+        return [int(v) or None for v in self.version.tolist()]
+
+    def prefixes(self) -> List[Optional[int]]:
+        return [p if v else None for p, v in zip(self.prefix.tolist(), self.version.tolist())]
+
+    def within(self, ranges: Iterable[str]) -> List[bool]:
+        """ranges 중 하나에 완전히 포함되는 항목 여부"""
+        return self._match(ranges).tolist()
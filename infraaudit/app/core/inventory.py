@@ -0,0 +1,403 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import boto3
+from botocore.exceptions import ClientError
+from app.core.aws_client import AuditInterrupted
+from app.core.call_tracker import CallBudgetExceeded
+from app.core.network_index import SecurityGroupIndex
+from app.core.policy_store import PolicyDocumentStore
+from app.core.reachability import ReachabilityEngine, public_subnet_ids
+
+# S3 버킷 설정 항목 → 조회 API. 항목별로 전체 버킷을 한 번에 조회
+BUCKET_CONFIG_ASPECTS = {
+    'public_access_block': 'get_public_access_block',
+    'policy': 'get_bucket_policy',
+    'acl': 'get_bucket_acl',
+    'replication': 'get_bucket_replication',
+    'encryption': 'get_bucket_encryption',
+}
+BUCKET_CONFIG_WORKERS = 16
+# GetAccountAuthorizationDetails 권한이 없을 때 사용자/역할별 정책을 동시에 조회하는 스레드 수
+PRINCIPAL_POLICY_WORKERS = 16
+ACCESS_DENIED_CODES = ('AccessDenied', 'AccessDeniedException', 'UnauthorizedOperation')
+# 조회한 체크가 중단(시간 초과/취소)되거나 호출 예산이 없어 실패한 경우. 데이터 자체의 오류가 아니므로 보관하지 않음
+TRANSIENT_ERRORS = (AuditInterrupted, CallBudgetExceeded)
+
+def _read_only(value: Any) -> Any:
+    # 체크 간 공유되는 데이터셋은 최상위를 읽기 전용으로 전달 (항목 내부는 복사하지 않음)
+    if isinstance(value, list):
+        return tuple(value)
+    if isinstance(value, dict):
+        return MappingProxyType(value)
+    return value
+
+def _trim_instance(instance: Dict) -> Dict:
+    """describe_instances 항목에서 체크가 사용하는 필드만 남긴 인스턴스 레코드"""
+    name = next((tag['Value'] for tag in instance.get('Tags', []) if tag.get('Key') == 'Name'), None)
+    return {
+        'InstanceId': instance['InstanceId'],
+        'Name': name,
+        'State': (instance.get('State') or {}).get('Name'),
+        'VpcId': instance.get('VpcId'),
+        'SubnetId': instance.get('SubnetId'),
+        'PublicIpAddress': instance.get('PublicIpAddress'),
+        'MetadataOptions': instance.get('MetadataOptions', {}),
+        'IamInstanceProfile': (instance.get('IamInstanceProfile') or {}).get('Arn'),
+        'SecurityGroups': [sg['GroupId'] for sg in instance.get('SecurityGroups', [])],
+        'NetworkInterfaces': [
+            {
+                'NetworkInterfaceId': eni['NetworkInterfaceId'],
+                'SubnetId': eni.get('SubnetId'),
+                'Groups': [group['GroupId'] for group in eni.get('Groups', [])],
+                'PublicIp': (eni.get('Association') or {}).get('PublicIp')
+            }
+            for eni in instance.get('NetworkInterfaces', [])
+        ]
+    }
+
+class AuditInventory:
+    """한 번의 점검(audit) 동안 여러 체크가 공유하는 AWS 인벤토리 캐시"""
+
+    def __init__(self, session: boto3.Session, previous_analyses: Optional[Dict[Tuple[str, str], Any]] = None):
+        self.session = session
+        self._data: Dict[str, Any] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._lock = threading.Lock()
+        # 정책 문서는 정규화 해시 기준으로 한 번만 보관/분석 (같은 계정의 이전 점검에서 분석한 문서는 결과 재사용)
+        self.policies = PolicyDocumentStore(previous_analyses)
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        # 같은 key는 점검 1회당 한 번만 조회 (key별 잠금이라 다른 데이터 조회는 막지 않음)
+        with self._lock:
+            if key in self._data:
+                return self._data[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            if key in self._data:
+                return self._data[key]
+            if key in self._errors:
+                # 실패한 조회(권한 없음 등)는 같은 점검 안에서 다시 호출하지 않음
+                raise self._errors[key]
+            try:
+                self._data[key] = loader()
+            except TRANSIENT_ERRORS:
+                # 다음 호출자(다른 체크)가 다시 조회하도록 보관하지 않음
+                raise
+            except Exception as e:
+                self._errors[key] = e
+                raise
+            return self._data[key]
+
+    def client(self, service_name: str):
+        return self.get(f'client:{service_name}', lambda: self.session.client(service_name))
+
+    def roles(self) -> List[Dict]:
+        def load():
+            roles = []
+            paginator = self.client('iam').get_paginator('list_roles')
+            for page in paginator.paginate():
+                for role in page.get('Roles', []):
+                    # 템플릿에서 복사된 동일한 신뢰 정책은 하나의 객체를 공유
+                    _, role['AssumeRolePolicyDocument'] = self.policies.intern(role['AssumeRolePolicyDocument'])
+                    roles.append(role)
+            return roles
+
+        return self.get('iam.roles', load)
+
+    def users(self) -> List[Dict]:
+        return self.get('iam.users', lambda: self._paginate('iam', 'list_users', 'Users'))
+
+    def authorization_details(self) -> Dict[str, List[Dict]]:
+        """GetAccountAuthorizationDetails 한 번으로 사용자/그룹/역할의 인라인·연결 정책과 고객 관리형 정책 문서를 조회
+
+        AWS 관리형 정책 전체 목록은 매우 크므로 제외하고, 연결된 AWS 관리형 정책 문서는 policy_document()로 ARN당 한 번 조회한다.
+        iam:GetAccountAuthorizationDetails가 없는 역할(이전 배포 템플릿)이면 같은 형식을 사용자/역할별 API로 만든다.
+        """
+        def load():
+            details = {'UserDetailList': [], 'GroupDetailList': [], 'RoleDetailList': [], 'Policies': []}
+            paginator = self.client('iam').get_paginator('get_account_authorization_details')
+            try:
+                for page in paginator.paginate(Filter=['User', 'Group', 'Role', 'LocalManagedPolicy']):
+                    for key, items in details.items():
+                        items.extend(page.get(key, []))
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') not in ACCESS_DENIED_CODES:
+                    raise
+                return self._authorization_details_by_principal()
+            return details
+
+        return self.get('iam.authorization_details', load)
+
+    def _principal_detail(self, principal_type: str, item: Dict) -> Dict:
+        """사용자/역할 하나의 인라인 정책(문서 포함)과 연결된 관리형 정책 (GetAccountAuthorizationDetails 항목 형식)"""
+        iam = self.client('iam')
+        name_key = f'{principal_type}Name'
+        name = item[name_key]
+        inline = []
+        for policy_name in self._paginate('iam', f'list_{principal_type.lower()}_policies', 'PolicyNames', **{name_key: name}):
+            response = getattr(iam, f'get_{principal_type.lower()}_policy')(**{name_key: name, 'PolicyName': policy_name})
+            inline.append({'PolicyName': policy_name, 'PolicyDocument': response['PolicyDocument']})
+        attached = self._paginate(
+            'iam', f'list_attached_{principal_type.lower()}_policies', 'AttachedPolicies', **{name_key: name}
+        )
+        # 그룹 정보는 사용하는 체크가 없어 조회하지 않음 (ListGroupsForUser는 배포 템플릿 권한에 없음)
+        return dict(item, **{f'{principal_type}PolicyList': inline, 'AttachedManagedPolicies': attached, 'GroupList': []})
+
+    def _local_policy_detail(self, policy: Dict) -> Dict:
+        version = self.client('iam').get_policy_version(
+            PolicyArn=policy['Arn'], VersionId=policy['DefaultVersionId']
+        )['PolicyVersion']
+        return dict(policy, PolicyVersionList=[
+            {'Document': version['Document'], 'VersionId': version['VersionId'], 'IsDefaultVersion': True}
+        ])
+
+    def _authorization_details_by_principal(self) -> Dict[str, List[Dict]]:
+        """ListRoles/ListRolePolicies/GetRolePolicy 등 개별 API로 만든 authorization_details (GroupDetailList는 비움)"""
+        jobs = (
+            [('UserDetailList', self._principal_detail, 'User', user) for user in self.users()]
+            + [('RoleDetailList', self._principal_detail, 'Role', role) for role in self.roles()]
+            + [('Policies', lambda _, policy: self._local_policy_detail(policy), None, policy)
+               for policy in self._paginate('iam', 'list_policies', 'Policies', Scope='Local')]
+        )
+        details = {'UserDetailList': [], 'GroupDetailList': [], 'RoleDetailList': [], 'Policies': []}
+        if not jobs:
+            return details
+        with ThreadPoolExecutor(max_workers=min(PRINCIPAL_POLICY_WORKERS, len(jobs))) as executor:
+            # bucket_configs와 같이 호출한 체크의 context를 넘겨 호출 집계와 중단/예산 검사가 적용되게 함
+            futures = [
+                (key, executor.submit(contextvars.copy_context().run, fetch, principal_type, item))
+                for key, fetch, principal_type, item in jobs
+            ]
+            for key, future in futures:
+                details[key].append(future.result())
+        return details
+
+    def policy_document(self, policy_arn: str) -> Dict:
+        """관리형 정책의 기본 버전 문서 (고객 관리형은 authorization_details에서, AWS 관리형은 ARN당 한 번 조회)"""
+        def load():
+            local = self.local_managed_policies().get(policy_arn)
+            if local is not None:
+                return local['document']
+            iam = self.client('iam')
+            version_id = iam.get_policy(PolicyArn=policy_arn)['Policy']['DefaultVersionId']
+            document = iam.get_policy_version(PolicyArn=policy_arn, VersionId=version_id)['PolicyVersion']['Document']
+            return self.policies.intern(document)[1]
+
+        return self.get(f'iam.policy_document:{policy_arn}', load)
+
+    def local_managed_policies(self) -> Dict[str, Dict]:
+        """고객 관리형 정책 ARN → {'name', 'arn', 'default_version_id', 'document'}"""
+        def load():
+            policies = {}
+            for policy in self.authorization_details()['Policies']:
+                document = next(
+                    (v['Document'] for v in policy.get('PolicyVersionList', []) if v.get('IsDefaultVersion')),
+                    None
+                )
+                policies[policy['Arn']] = {
+                    'name': policy['PolicyName'],
+                    'arn': policy['Arn'],
+                    'default_version_id': policy.get('DefaultVersionId'),
+                    'document': self.policies.intern(document)[1] if document is not None else None
+                }
+            return policies
+
+        return self.get('iam.local_managed_policies', load)
+
+    def _principals_with_policies(self, principal_type: str, detail_key: str, name_key: str,
+                                  inline_key: str) -> List[Dict]:
+        principals = []
+        for item in self.authorization_details()[detail_key]:
+            principals.append({
+                'type': principal_type,
+                'name': item[name_key],
+                'arn': item['Arn'],
+                'inline_policies': [
+                    {'name': policy['PolicyName'], 'document': self.policies.intern(policy['PolicyDocument'])[1]}
+                    for policy in item.get(inline_key, [])
+                ],
+                'attached_policies': [
+                    {'name': policy['PolicyName'], 'arn': policy['PolicyArn']}
+                    for policy in item.get('AttachedManagedPolicies', [])
+                ],
+                'groups': list(item.get('GroupList', []))
+            })
+        return principals
+
+    def users_with_policies(self) -> List[Dict]:
+        """사용자별 인라인 정책(문서 포함)과 연결된 관리형 정책(ARN) 목록"""
+        return self.get(
+            'iam.users_with_policies',
+            lambda: self._principals_with_policies('user', 'UserDetailList', 'UserName', 'UserPolicyList')
+        )
+
+    def roles_with_policies(self) -> List[Dict]:
+        """역할별 인라인 정책(문서 포함)과 연결된 관리형 정책(ARN) 목록"""
+        return self.get(
+            'iam.roles_with_policies',
+            lambda: self._principals_with_policies('role', 'RoleDetailList', 'RoleName', 'RolePolicyList')
+        )
+
+    def buckets(self) -> Dict:
+        """list_buckets 응답 ({'Buckets', 'Owner'})"""
+        return self.get('s3.buckets', lambda: self.client('s3').list_buckets())
+
+    def _fetch_bucket_config(self, bucket_name: str, aspect: str) -> tuple:
+        try:
+            return getattr(self.client('s3'), BUCKET_CONFIG_ASPECTS[aspect])(Bucket=bucket_name), None
+        except Exception as e:
+            # 설정 없음(NoSuchBucketPolicy 등)도 체크가 원래대로 처리하도록 오류를 그대로 보관
+            return None, e
+
+    def bucket_configs(self, aspect: str) -> Dict[str, tuple]:
+        """버킷 이름 → (응답, 오류). 한 설정 항목을 모든 버킷에 대해 동시에 조회"""
+        def load():
+            names = [bucket['Name'] for bucket in self.buckets().get('Buckets', [])]
+            if not names:
+                return {}
+            with ThreadPoolExecutor(max_workers=min(BUCKET_CONFIG_WORKERS, len(names))) as executor:
+                # 조회 스레드에도 호출한 체크의 context를 넘겨 호출 집계와 중단/예산 검사가 그 체크 기준으로 적용되게 함
+                futures = [
+                    executor.submit(contextvars.copy_context().run, self._fetch_bucket_config, name, aspect)
+                    for name in names
+                ]
+                configs = {name: future.result() for name, future in zip(names, futures)}
+            # 중단/예산 초과로 실패한 버킷이 있으면 결과 전체를 보관하지 않음 (버킷별 오류로 남기지 않음)
+            for _, error in configs.values():
+                if isinstance(error, TRANSIENT_ERRORS):
+                    raise error
+            return configs
+
+        return self.get(f's3.bucket_configs:{aspect}', load)
+
+    def bucket_config(self, bucket_name: str, aspect: str) -> Dict:
+        """버킷의 설정 응답. 조회 시 발생한 오류는 그대로 다시 발생시킴"""
+        entry = self.bucket_configs(aspect).get(bucket_name)
+        response, error = entry if entry is not None else self._fetch_bucket_config(bucket_name, aspect)
+        if error is not None:
+            raise error
+        return response
+
+    def dataset(self, name: str) -> Any:
+        """선언형 데이터셋 조회 ('s3.bucket_configs:acl'처럼 ':' 뒤는 인자). 최상위는 읽기 전용 뷰로 반환"""
+        base, _, arg = name.partition(':')
+        if base not in DATASETS:
+            raise KeyError(f"Unknown inventory dataset: {name}")
+        loader = DATASETS[base]
+        return _read_only(loader(self, arg) if arg else loader(self))
+
+    def _paginate(self, service_name: str, operation: str, result_key: str, **kwargs) -> List[Dict]:
+        items = []
+        paginator = self.client(service_name).get_paginator(operation)
+        for page in paginator.paginate(**kwargs):
+            items.extend(page.get(result_key, []))
+        return items
+
+    def security_groups(self) -> List[Dict]:
+        return self.get(
+            'ec2.security_groups',
+            lambda: self._paginate('ec2', 'describe_security_groups', 'SecurityGroups')
+        )
+
+    def subnets(self) -> List[Dict]:
+        return self.get('ec2.subnets', lambda: self._paginate('ec2', 'describe_subnets', 'Subnets'))
+
+    def route_tables(self) -> List[Dict]:
+        return self.get('ec2.route_tables', lambda: self._paginate('ec2', 'describe_route_tables', 'RouteTables'))
+
+    def network_acls(self) -> List[Dict]:
+        return self.get('ec2.network_acls', lambda: self._paginate('ec2', 'describe_network_acls', 'NetworkAcls'))
+
+    def network_interfaces(self) -> List[Dict]:
+        return self.get(
+            'ec2.network_interfaces',
+            lambda: self._paginate('ec2', 'describe_network_interfaces', 'NetworkInterfaces')
+        )
+
+    def instances(self, http_tokens: Optional[str] = None) -> List[Dict]:
+        """EC2 인스턴스 (_trim_instance 형태). http_tokens를 주면 서버 측 필터로 해당 인스턴스만 조회"""
+        def load(filters):
+            instances = []
+            paginator = self.client('ec2').get_paginator('describe_instances')
+            for page in paginator.paginate(Filters=filters):
+                for reservation in page.get('Reservations', []):
+                    instances.extend(_trim_instance(instance) for instance in reservation.get('Instances', []))
+            return instances
+
+        if http_tokens is None:
+            return self.get('ec2.instances', lambda: load([]))
+
+        # 전체 목록을 이미 조회했다면 다시 호출하지 않고 메모리에서 필터링
+        if 'ec2.instances' in self._data:
+            return [
+                instance for instance in self._data['ec2.instances']
+                if instance['MetadataOptions'].get('HttpTokens', 'optional') == http_tokens
+            ]
+        return self.get(
+            f'ec2.instances:http-tokens={http_tokens}',
+            lambda: load([{'Name': 'metadata-options.http-tokens', 'Values': [http_tokens]}])
+        )
+
+    def managed_prefix_lists(self) -> Dict[str, Dict]:
+        def load():
+            prefix_lists = {}
+            paginator = self.client('ec2').get_paginator('describe_managed_prefix_lists')
+            for page in paginator.paginate():
+                for prefix_list in page.get('PrefixLists', []):
+                    prefix_lists[prefix_list['PrefixListId']] = prefix_list
+            return prefix_lists
+
+        return self.get('ec2.managed_prefix_lists', load)
+
+    def prefix_list_entries(self, prefix_list_id: str) -> List[Dict]:
+        return self.get(
+            f'ec2.prefix_list_entries:{prefix_list_id}',
+            lambda: self._paginate('ec2', 'get_managed_prefix_list_entries', 'Entries', PrefixListId=prefix_list_id)
+        )
+
+    def security_group_index(self) -> SecurityGroupIndex:
+        # 인벤토리는 세션 리전 단위이므로 prefix list / SG 참조 해석도 리전당 한 번
+        return self.get(
+            'ec2.security_group_index',
+            lambda: SecurityGroupIndex(self.security_groups(), self.prefix_list_entries)
+        )
+
+    def public_subnets(self) -> Set[str]:
+        # 라우트 테이블만으로 판단하는 퍼블릭 서브넷 (NACL/ENI 조회가 실패해도 사용 가능)
+        return self.get('ec2.public_subnets', lambda: public_subnet_ids(self.subnets(), self.route_tables()))
+    
+    def reachability(self) -> ReachabilityEngine:
+        return self.get(
+            'ec2.reachability',
+            lambda: ReachabilityEngine(
+                self.subnets(), self.route_tables(), self.network_acls(),
+                self.network_interfaces(), self.security_group_index()
+            )
+        )
+
+# BaseCheck.requires에 선언할 수 있는 데이터셋
+DATASETS: Dict[str, Callable[..., Any]] = {
+    'iam.roles': AuditInventory.roles,
+    'iam.users': AuditInventory.users,
+    'iam.authorization_details': AuditInventory.authorization_details,
+    'iam.local_managed_policies': AuditInventory.local_managed_policies,
+    'iam.users_with_policies': AuditInventory.users_with_policies,
+    'iam.roles_with_policies': AuditInventory.roles_with_policies,
+    's3.buckets': AuditInventory.buckets,
+    's3.bucket_configs': AuditInventory.bucket_configs,
+    'ec2.instances': AuditInventory.instances,
+    'ec2.security_groups': AuditInventory.security_groups,
+    'ec2.subnets': AuditInventory.subnets,
+    'ec2.route_tables': AuditInventory.route_tables,
+    'ec2.network_acls': AuditInventory.network_acls,
+    'ec2.network_interfaces': AuditInventory.network_interfaces,
+    'ec2.managed_prefix_lists': AuditInventory.managed_prefix_lists,
+    'ec2.security_group_index': AuditInventory.security_group_index,
+    'ec2.public_subnets': AuditInventory.public_subnets,
+    'ec2.reachability': AuditInventory.reachability,
+}
@@ -0,0 +1,269 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from botocore.exceptions import ClientError
+from app.core.cidr_classifier import CidrBatch, PRIVATE_RANGES
+
+ALL_PORTS = (0, 65535)
+# 포트 범위가 있는 프로토콜 (-1은 전체 트래픽). ICMP 등은 FromPort/ToPort가 type/code라 포트 색인에서 제외
+PORT_PROTOCOLS = ('tcp', 'udp', '6', '17', '-1')
+
+class PortIntervalTree:
+    """포트 범위(from, to)에 대한 정적 interval tree. stab(port)로 해당 포트를 포함하는 항목 조회"""
+
+    def __init__(self, intervals: List[Tuple[int, int, Any]]):
+        self.center = None
+        self.left = None
+        self.right = None
+        self.by_start: List[Tuple[int, int, Any]] = []
+        self.by_end: List[Tuple[int, int, Any]] = []
+
+        # 시작이 끝보다 큰 구간은 어떤 포트도 포함하지 않음
+        intervals = [interval for interval in intervals if interval[0] <= interval[1]]
+        if not intervals:
+            return
+
+        endpoints = sorted(p for start, end, _ in intervals for p in (start, end))
+        self.center = endpoints[len(endpoints) // 2]
+
+        left, right, overlapping = [], [], []
+        for interval in intervals:
+            start, end, _ = interval
+            if end < self.center:
+                left.append(interval)
+            elif start > self.center:
+                right.append(interval)
+            else:
+                overlapping.append(interval)
+
+        self.by_start = sorted(overlapping, key=lambda i: i[0])
+        self.by_end = sorted(overlapping, key=lambda i: i[1], reverse=True)
+        self.left = PortIntervalTree(left) if left else None
+        self.right = PortIntervalTree(right) if right else None
+
+    def stab(self, port: int) -> List[Any]:
+        found = []
+        node = self
+        while node is not None and node.center is not None:
+            if port < node.center:
+                for start, _, item in node.by_start:
+                    if start > port:
+                        break
+                    found.append(item)
+                node = node.left
+            elif port > node.center:
+                for _, end, item in node.by_end:
+                    if end < port:
+                        break
+                    found.append(item)
+                node = node.right
+            else:
+                found.extend(item for _, _, item in node.by_start)
+                break
+        return found
+
+class SecurityGroupIndex:
+    """describe_security_groups 결과로 만든 인바운드 규칙 인덱스 (점검 1회당 한 번 생성)
+
+    규칙의 소스는 CIDR, 관리형 접두사 목록(prefix list), 보안 그룹 참조 세 종류로 정규화된다.
+    prefix list는 resolve_prefix_list(pl_id)로 목록당 한 번만 풀어서 CIDR 항목으로 펼친다.
+    권한 부족 등으로 풀지 못한 prefix list는 빈 목록으로 취급하지 않고 unresolved_prefix_lists()로 보고한다.
+    """
+
+    def __init__(self, security_groups: Iterable[Dict],
+                 resolve_prefix_list: Optional[Callable[[str], List[Dict]]] = None):
+        self.groups: Dict[str, Dict] = {}
+        self.entries: Dict[str, List[Dict]] = {}
+        # 보안 그룹 참조 그래프: group_id → 이 그룹이 허용하는 피어 그룹 / 이 그룹을 허용하는 그룹
+        self.references: Dict[str, List[Dict]] = {}
+        self.referenced_by: Dict[str, List[Dict]] = {}
+        self._trees: Dict[str, PortIntervalTree] = {}
+        self._prefix_lists: Dict[str, List[Dict]] = {}
+        # 풀지 못한 prefix list → 오류 메시지 / 그룹별로 그 prefix list를 참조하는 규칙
+        self._prefix_list_errors: Dict[str, str] = {}
+        self._unresolved: Dict[str, List[Dict]] = {}
+        self._resolve_prefix_list = resolve_prefix_list
+
+        candidates = []
+        for sg in security_groups:
+            self.groups[sg['GroupId']] = sg
+            self.entries[sg['GroupId']] = []
+            self.references[sg['GroupId']] = []
+        for sg in self.groups.values():
+            candidates.extend(self._rule_entries(sg))
+
+        # 전체 CIDR을 한 번에 분류 (규칙마다 ipaddress 객체를 만들지 않음)
+        cidr_entries = [entry for entry in candidates if entry['source_type'] != 'security_group']
+        batch = CidrBatch(entry['cidr'] for entry in cidr_entries)
+        internal = batch.within(PRIVATE_RANGES)
+        for entry, version, prefix_len, is_internal in zip(cidr_entries, batch.versions(), batch.prefixes(), internal):
+            entry['version'] = version
+            entry['prefix_len'] = prefix_len
+            entry['internet_facing'] = not is_internal
+
+        for entry in candidates:
+            if entry['source_type'] != 'security_group' and entry['version'] is None:
+                continue
+            self.entries[entry['group_id']].append(entry)
+
+        for group_id, entries in self.entries.items():
+            self._trees[group_id] = PortIntervalTree([
+                (entry['port_range'][0], entry['port_range'][1], entry)
+                for entry in entries if entry['port_range'] is not None
+            ])
+
+    def prefix_list_entries(self, prefix_list_id: str) -> Optional[List[Dict]]:
+        """prefix list의 CIDR 항목. 조회가 AWS 오류(AccessDenied 등)로 실패하면 None
+
+        중단/호출 예산 초과처럼 AWS 응답이 아닌 오류는 그대로 전파해 색인이 잘못된 결과로 남지 않게 한다.
+        """
+        # 같은 prefix list를 참조하는 규칙이 많아도 조회는 목록당 한 번
+        if prefix_list_id not in self._prefix_lists:
+            entries = []
+            if self._resolve_prefix_list is not None:
+                try:
+                    entries = self._resolve_prefix_list(prefix_list_id)
+                except ClientError as e:
+                    self._prefix_list_errors[prefix_list_id] = str(e)
+                    entries = None
+            self._prefix_lists[prefix_list_id] = entries
+        return self._prefix_lists[prefix_list_id]
+
+    def unresolved_prefix_lists(self, group_id: str, ports: Iterable[int], include_all_ports: bool = True) -> List[Dict]:
+        """group_id의 규칙 중 ports 중 하나에 적용되지만 내용을 확인하지 못한 prefix list 참조"""
+        ports = list(ports)
+        return [
+            {key: reference[key] for key in ('prefix_list_id', 'port', 'error')}
+            for reference in self._unresolved.get(group_id, [])
+            if reference['port_range'] is not None
+            and (include_all_ports or not reference['all_ports'])
+            and any(reference['port_range'][0] <= port <= reference['port_range'][1] for port in ports)
+        ]
+
+    def _rule_entries(self, sg: Dict):
+        group_id = sg['GroupId']
+        owner_id = sg.get('OwnerId')
+        order = 0
+        for rule in sg.get('IpPermissions', []):
+            from_port = rule.get('FromPort')
+            to_port = rule.get('ToPort')
+            protocol = str(rule.get('IpProtocol', '-1')).lower()
+            if protocol not in PORT_PROTOCOLS or (from_port is not None and to_port is not None and from_port > to_port):
+                # ICMP 규칙(FromPort=8, ToPort=-1 등)은 어떤 포트에도 해당하지 않음
+                all_ports = False
+                port_range = None
+            else:
+                # 포트가 없는 규칙(전체 트래픽)은 모든 포트를 포함하는 구간으로 취급
+                all_ports = from_port is None or to_port is None
+                port_range = ALL_PORTS if all_ports else (from_port, to_port)
+
+            sources = [
+                {'source_type': 'cidr', 'cidr': r.get('CidrIp'), 'description': r.get('Description', '')}
+                for r in rule.get('IpRanges', [])
+            ]
+            sources += [
+                {'source_type': 'cidr', 'cidr': r.get('CidrIpv6'), 'description': r.get('Description', '')}
+                for r in rule.get('Ipv6Ranges', [])
+            ]
+            for pl in rule.get('PrefixListIds', []):
+                pl_id = pl.get('PrefixListId')
+                pl_entries = self.prefix_list_entries(pl_id)
+                if pl_entries is None:
+                    self._unresolved.setdefault(group_id, []).append({
+                        'prefix_list_id': pl_id,
+                        'port': f"{from_port}-{to_port}",
+                        'port_range': port_range,
+                        'all_ports': all_ports,
+                        'error': self._prefix_list_errors[pl_id]
+                    })
+                    continue
+                for pl_entry in pl_entries:
+                    sources.append({
+                        'source_type': 'prefix_list',
+                        'prefix_list_id': pl_id,
+                        'cidr': pl_entry.get('Cidr'),
+                        'description': pl_entry.get('Description') or pl.get('Description', '')
+                    })
+            for pair in rule.get('UserIdGroupPairs', []):
+                peer_group_id = pair.get('GroupId')
+                peer_owner = pair.get('UserId') or owner_id
+                edge = {
+                    'group_id': group_id,
+                    'peer_group_id': peer_group_id,
+                    'peer_owner_id': peer_owner,
+                    'vpc_peering_connection_id': pair.get('VpcPeeringConnectionId'),
+                    # 다른 계정이거나 VPC 피어링을 통한 참조, 또는 이 리전 인벤토리에 없는 그룹
+                    'cross_boundary': (
+                        peer_owner != owner_id
+                        or bool(pair.get('VpcPeeringConnectionId'))
+                        or peer_group_id not in self.groups
+                    )
+                }
+                self.references[group_id].append(edge)
+                self.referenced_by.setdefault(peer_group_id, []).append(edge)
+                sources.append({
+                    'source_type': 'security_group',
+                    'peer': edge,
+                    'cidr': None,
+                    'description': pair.get('Description', ''),
+                    'version': None,
+                    'prefix_len': None
+                })
+
+            for source in sources:
+                source.update({
+                    'order': order,
+                    'group_id': group_id,
+                    'rule': rule,
+                    'from_port': from_port,
+                    'to_port': to_port,
+                    'port_range': port_range,
+                    'all_ports': all_ports
+                })
+                yield source
+                order += 1
+
+    def exposing(self, group_id: str, ports: Iterable[int],
+                 max_prefix_v4: Optional[int] = None, max_prefix_v6: Optional[int] = None,
+                 include_all_ports: bool = True) -> List[Dict]:
+        """group_id의 규칙 중 ports 중 하나를 /max_prefix보다 넓은(prefix가 짧은) 대역에 여는 항목
+
+        CIDR 및 prefix list에서 펼쳐진 CIDR이 대상이며, 보안 그룹 참조는 peer_exposure()로 조회한다.
+        """
+        tree = self._trees.get(group_id)
+        if tree is None:
+            return []
+
+        limits = {4: max_prefix_v4, 6: max_prefix_v6}
+        matched = {}
+        for port in ports:
+            for entry in tree.stab(port):
+                if entry['source_type'] == 'security_group':
+                    continue
+                limit = limits[entry['version']]
+                if limit is None or entry['prefix_len'] >= limit:
+                    continue
+                if entry['all_ports'] and not include_all_ports:
+                    continue
+                matched[entry['order']] = entry
+
+        # 원래 규칙 순서대로 반환
+        return [matched[order] for order in sorted(matched)]
+
+    def peer_exposure(self, group_id: str, ports: Iterable[int],
+                      cross_boundary_only: bool = True, include_all_ports: bool = True) -> List[Dict]:
+        """ports 중 하나를 다른 보안 그룹(기본: 다른 계정/피어링/미확인 그룹)에 여는 참조 항목"""
+        tree = self._trees.get(group_id)
+        if tree is None:
+            return []
+
+        matched = {}
+        for port in ports:
+            for entry in tree.stab(port):
+                if entry['source_type'] != 'security_group':
+                    continue
+                if cross_boundary_only and not entry['peer']['cross_boundary']:
+                    continue
+                if entry['all_ports'] and not include_all_ports:
+                    continue
+                matched[entry['order']] = entry
+
+        return [matched[order] for order in sorted(matched)]
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from app.core.analysis_pool import evaluate_documents
+
+class PolicyDocumentStore:
+    """정책 문서를 정규화 해시로 저장하고 분석 결과를 해시 단위로 재사용
+
+    previous에 이전 점검의 분석 결과((analyzer 이름, 해시) → 결과)를 넘기면 내용이 바뀌지 않은 문서는 다시 분석하지 않는다.
+    해시는 문서 내용의 지문(fingerprint)이므로 리소스 이름과 관계없이 같은 내용이면 결과를 그대로 쓸 수 있다.
+    """
+
+    def __init__(self, previous: Optional[Dict[Tuple[str, str], Any]] = None):
+        self._documents: Dict[str, Dict] = {}
+        self._analyses: Dict[Tuple[str, str], Any] = {}
+        self._previous = previous or {}
+        self._lock = threading.Lock()
+        # 이전 점검 결과를 재사용한 문서 수 / 이번 점검에서 새로 분석한 문서 수
+        self.reused = 0
+        self.analyzed = 0
+
+    def _lookup(self, key: Tuple[str, str]) -> bool:
+        # self._lock을 잡은 상태에서 호출. 이미 분석되었거나 이전 점검 결과를 가져올 수 있으면 True
+        if key in self._analyses:
+            return True
+        if key in self._previous:
+            self._analyses[key] = self._previous[key]
+            self.reused += 1
+            return True
+        return False
+
+    @staticmethod
+    def canonicalize(document: Dict) -> str:
+        # 키 순서/공백 차이만 제거 (Statement 순서 등 의미가 있는 부분은 그대로 유지)
+        return json.dumps(document, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+
+    @classmethod
+    def digest(cls, document: Dict) -> str:
+        return hashlib.sha256(cls.canonicalize(document).encode('utf-8')).hexdigest()
+
+    def intern(self, document: Dict) -> Tuple[str, Dict]:
+        """(해시, 대표 문서) 반환. 같은 내용의 문서는 처음 저장된 객체 하나만 유지"""
+        doc_hash = self.digest(document)
+        with self._lock:
+            return doc_hash, self._documents.setdefault(doc_hash, document)
+
+    def analyze(self, analyzer_name: str, document: Dict, analyzer: Callable[[Dict], Any]) -> Tuple[str, Any]:
+        """(해시, 분석 결과) 반환. 같은 문서는 analyzer별로 한 번만 분석"""
+        doc_hash, document = self.intern(document)
+        key = (analyzer_name, doc_hash)
+        with self._lock:
+            if self._lookup(key):
+                return doc_hash, self._analyses[key]
+
+        result = analyzer(document)
+        with self._lock:
+            if key not in self._analyses:
+                self.analyzed += 1
+            return doc_hash, self._analyses.setdefault(key, result)
+
+    def analyze_many(self, analyzer_name: str, documents: Iterable[Dict],
+                     analyzer: Callable[[Dict], Any]) -> List[Tuple[str, Any, Optional[str]]]:
+        """analyze()의 일괄 버전. (해시, 분석 결과, 오류) 목록을 입력 순서대로 반환
+
+        아직 분석되지 않은 고유 문서만 모아 한 번에 분석하며(프로세스 풀 사용 가능), 실패한 문서는 캐시하지 않는다.
+        """
+        hashes = []
+        pending: Dict[str, Dict] = {}
+        for document in documents:
+            doc_hash, document = self.intern(document)
+            with self._lock:
+                if not self._lookup((analyzer_name, doc_hash)):
+                    pending.setdefault(doc_hash, document)
+            hashes.append(doc_hash)
+
+        errors: Dict[str, str] = {}
+        if pending:
+            # 프로세스 풀로 보낼 때는 고유 문서만 정규화된 JSON 문자열로 전달
+            evaluated = evaluate_documents(analyzer, list(pending.values()), self.canonicalize)
+            with self._lock:
+                for doc_hash, (verdict, error) in zip(pending, evaluated):
+                    if error is not None:
+                        errors[doc_hash] = error
+                    elif (analyzer_name, doc_hash) not in self._analyses:
+                        self._analyses[(analyzer_name, doc_hash)] = verdict
+                        self.analyzed += 1
+
+        with self._lock:
+            return [
+                (doc_hash, self._analyses.get((analyzer_name, doc_hash)), errors.get(doc_hash))
+                for doc_hash in hashes
+            ]
+
+    def get(self, doc_hash: str) -> Dict:
+        return self._documents[doc_hash]
+
+    def analyses(self) -> Dict[Tuple[str, str], Any]:
+        """이번 점검에서 사용된 분석 결과 (다음 점검의 previous로 전달)"""
+        with self._lock:
+            return dict(self._analyses)
+
+    def documents(self) -> Dict[str, Dict]:
+        with self._lock:
+            return dict(self._documents)
+
+    def __len__(self) -> int:
+        return len(self._documents)
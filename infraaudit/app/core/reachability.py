@@ -0,0 +1,152 @@
+from typing import Dict, Iterable, List, Optional, Set
+from app.core.cidr_classifier import CidrBatch, PRIVATE_RANGES
+from app.core.network_index import SecurityGroupIndex
+
+INTERNET_DESTINATIONS = ('0.0.0.0/0', '::/0')
+# NACL 프로토콜 번호: -1(전체), 6(TCP)
+TCP_PROTOCOLS = ('-1', '6')
+
+def subnet_route_tables(subnets: Iterable[Dict], route_tables: Iterable[Dict]) -> Dict[str, Dict]:
+    """서브넷 → 라우트 테이블 (명시적 연결이 없으면 VPC의 메인 라우트 테이블)"""
+    main_route_tables = {}
+    associated: Dict[str, Dict] = {}
+    for rt in route_tables:
+        for assoc in rt.get('Associations', []):
+            if assoc.get('Main'):
+                main_route_tables[rt['VpcId']] = rt
+            elif assoc.get('SubnetId'):
+                associated[assoc['SubnetId']] = rt
+    for subnet in subnets:
+        if subnet['SubnetId'] not in associated and subnet.get('VpcId') in main_route_tables:
+            associated[subnet['SubnetId']] = main_route_tables[subnet['VpcId']]
+    return associated
+
+def routes_to_internet(route_table: Dict) -> bool:
+    """라우트 테이블에 인터넷 게이트웨이로 가는 기본 라우트가 있는지"""
+    return any(
+        (route.get('DestinationCidrBlock') in INTERNET_DESTINATIONS
+         or route.get('DestinationIpv6CidrBlock') in INTERNET_DESTINATIONS)
+        and route.get('GatewayId', '').startswith('igw-')
+        and route.get('State') != 'blackhole'
+        for route in route_table.get('Routes', [])
+    )
+
+def public_subnet_ids(subnets: Iterable[Dict], route_tables: Iterable[Dict]) -> Set[str]:
+    """라우트 테이블 기준 퍼블릭 서브넷 ID 목록 (NACL/보안 그룹은 보지 않음)"""
+    return {subnet_id for subnet_id, rt in subnet_route_tables(subnets, route_tables).items() if routes_to_internet(rt)}
+
+class ReachabilityEngine:
+    """라우트 테이블 / NACL / 보안 그룹 / ENI로 VPC별 그래프를 만들고 ENI·포트 단위 인터넷 노출을 계산
+
+    모든 데이터는 점검 1회당 한 번 일괄 조회된 목록을 사용하며, 리소스마다 추가 API 호출을 하지 않는다.
+    NACL은 인터넷 대역(사설 대역에 포함되지 않는 CIDR) 규칙만 규칙 번호 순으로 평가하는 근사치다.
+    """
+
+    def __init__(self, subnets: Iterable[Dict], route_tables: Iterable[Dict], network_acls: Iterable[Dict],
+                 network_interfaces: Iterable[Dict], sg_index: SecurityGroupIndex):
+        self.sg_index = sg_index
+        self.subnets: Dict[str, Dict] = {s['SubnetId']: s for s in subnets}
+        self.enis: Dict[str, Dict] = {eni['NetworkInterfaceId']: eni for eni in network_interfaces}
+        self.enis_by_group: Dict[str, List[str]] = {}
+        for eni_id, eni in self.enis.items():
+            for group in eni.get('Groups', []):
+                self.enis_by_group.setdefault(group['GroupId'], []).append(eni_id)
+
+        self._subnet_route_table = subnet_route_tables(self.subnets.values(), route_tables)
+
+        # 서브넷 → NACL 인바운드 규칙 (인터넷 대역 규칙만, 규칙 번호 순)
+        self._subnet_nacl_entries: Dict[str, List[Dict]] = {}
+        for nacl in network_acls:
+            entries = self._internet_ingress_entries(nacl)
+            for assoc in nacl.get('Associations', []):
+                self._subnet_nacl_entries[assoc['SubnetId']] = entries
+
+        self._subnet_public: Dict[str, bool] = {}
+        self._exposure: Dict[tuple, Dict] = {}
+
+    @staticmethod
+    def _internet_ingress_entries(nacl: Dict) -> List[Dict]:
+        entries = [e for e in nacl.get('Entries', []) if not e.get('Egress')]
+        cidrs = [e.get('CidrBlock') or e.get('Ipv6CidrBlock') for e in entries]
+        internal = CidrBatch(cidrs).within(PRIVATE_RANGES)
+        internet_entries = [e for e, is_internal in zip(entries, internal) if not is_internal]
+        return sorted(internet_entries, key=lambda e: e.get('RuleNumber', 32767))
+
+    def subnet_is_public(self, subnet_id: str) -> bool:
+        """서브넷 라우트 테이블에 인터넷 게이트웨이로 가는 기본 라우트가 있는지"""
+        if subnet_id not in self._subnet_public:
+            self._subnet_public[subnet_id] = routes_to_internet(self._subnet_route_table.get(subnet_id, {}))
+        return self._subnet_public[subnet_id]
+
+    def nacl_allows(self, subnet_id: str, port: int) -> bool:
+        """인터넷 대역에서 port(TCP)로 들어오는 트래픽을 NACL이 허용하는지 (첫 번째로 일치하는 규칙 기준)"""
+        if subnet_id not in self._subnet_nacl_entries:
+            # NACL 정보가 없으면 기본 NACL(전체 허용)으로 간주
+            return True
+        for entry in self._subnet_nacl_entries[subnet_id]:
+            if str(entry.get('Protocol')) not in TCP_PROTOCOLS:
+                continue
+            port_range = entry.get('PortRange')
+            if port_range and not (port_range.get('From', 0) <= port <= port_range.get('To', 65535)):
+                continue
+            return entry.get('RuleAction') == 'allow'
+        return False
+
+    def sg_internet_sources(self, group_ids: Iterable[str], port: int) -> List[Dict]:
+        """보안 그룹 중 port를 인터넷 대역 CIDR에 여는 규칙 항목"""
+        sources = []
+        for group_id in group_ids:
+            for entry in self.sg_index.exposing(group_id, [port], max_prefix_v4=33, max_prefix_v6=129):
+                if entry['internet_facing']:
+                    sources.append(entry)
+        return sources
+
+    def eni_exposure(self, eni_id: str, port: int) -> Dict:
+        key = (eni_id, port)
+        if key not in self._exposure:
+            eni = self.enis.get(eni_id, {})
+            subnet_id = eni.get('SubnetId')
+            group_ids = [g['GroupId'] for g in eni.get('Groups', [])]
+            public_ip = (eni.get('Association') or {}).get('PublicIp')
+            has_public_address = bool(public_ip or eni.get('Ipv6Addresses'))
+            subnet_public = bool(subnet_id) and self.subnet_is_public(subnet_id)
+            nacl_allows = bool(subnet_id) and self.nacl_allows(subnet_id, port)
+            sources = self.sg_internet_sources(group_ids, port)
+
+            self._exposure[key] = {
+                'eni_id': eni_id,
+                'port': port,
+                'public_ip': public_ip,
+                'subnet_id': subnet_id,
+                'subnet_public': subnet_public,
+                'nacl_allows': nacl_allows,
+                'sg_sources': [entry['cidr'] for entry in sources],
+                'widest_prefix': min((entry['prefix_len'] for entry in sources), default=None),
+                'exposed': has_public_address and subnet_public and nacl_allows and bool(sources)
+            }
+        return self._exposure[key]
+
+    def enis_for(self, group_ids: Iterable[str], description_contains: Optional[str] = None) -> List[str]:
+        """보안 그룹을 공유하는 ENI (관리형 서비스는 리소스의 보안 그룹으로 ENI를 생성)"""
+        found = []
+        for group_id in group_ids:
+            for eni_id in self.enis_by_group.get(group_id, []):
+                if eni_id in found:
+                    continue
+                description = self.enis[eni_id].get('Description', '')
+                if description_contains and description_contains not in description:
+                    continue
+                found.append(eni_id)
+        return found
+
+    def resource_exposure(self, group_ids: Iterable[str], port: int,
+                          description_contains: Optional[str] = None) -> Dict:
+        """리소스의 보안 그룹/포트 기준 인터넷 노출 요약 (노출된 ENI 목록 포함)"""
+        eni_ids = self.enis_for(list(group_ids), description_contains)
+        exposures = [self.eni_exposure(eni_id, port) for eni_id in eni_ids]
+        return {
+            'port': port,
+            'eni_count': len(exposures),
+            'internet_exposed': any(e['exposed'] for e in exposures),
+            'exposed_enis': [e for e in exposures if e['exposed']]
+        }
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional, Dict
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Dict
 from datetime import datetime
 
 class AuditRequest(BaseModel):
@@ -7,6 +7,22 @@ class AuditRequest(BaseModel):
     role_name: str = "CloudDoctorAuditRole"
     external_id: Optional[str] = None
     checks: Optional[List[str]] = None
+    # 체크별 / 점검 전체 제한 시간(초). 없으면 서버 설정값 사용
+    check_timeout: Optional[float] = Field(default=None, gt=0)
+    deadline: Optional[float] = Field(default=None, gt=0)
+    # False면 점검 ID와 running 상태를 바로 반환 (진행 상황은 /status, 취소는 DELETE /{audit_id})
+    wait: bool = True
+    # True면 결과 캐시를 사용하지 않고 모든 체크를 다시 실행
+    force_refresh: bool = False
+    # True면 결과/raw를 서버 메모리에 모으지 않고 디스크에 기록 (결과가 많은 계정용. 결과는 캐시에 저장하지 않음)
+    spill: bool = False
+    # summary면 결과/raw 없이 요약과 체크별 상태 개수만 반환 (체크는 raw/상세 정보를 만들지 않음)
+    mode: Literal['full', 'summary'] = 'full'
+    # 점검 1회의 AWS API 호출 예산 (전체 / 서비스별, 예: {"iam": 500}). 넘는 호출은 실패하고 점검은 partial로 끝남
+    max_api_calls: Optional[int] = Field(default=None, gt=0)
+    api_call_limits: Optional[Dict[str, int]] = None
+    # True면 지원하는 체크(EC2IMDSv2Check)는 FAIL 대상만 서버 측 필터로 조회하고 PASS 결과를 만들지 않음 (결과 캐시 사용 안 함)
+    fail_only: bool = False
 
 class CheckResult(BaseModel):
     check_id: str
@@ -24,4 +40,28 @@ class AuditResponse(BaseModel):
     results: Optional[List[CheckResult]] = None
     summary: Optional[Dict] = None
     guideline_ids: Optional[Dict[str, int]] = None
+    check_metrics: Optional[Dict[str, Dict]] = None
+    cached_checks: Optional[Dict[str, float]] = None
+    incremental: Optional[Dict[str, int]] = None
+    # 실행 중인 점검의 진행 상황 (끝난 체크 수, 지금까지 만들어진 결과 수)
+    progress: Optional[Dict[str, int]] = None
+    # summary 모드 점검의 체크별 결과 상태 개수 (summary와 같은 형식)
+    check_counts: Optional[Dict[str, Dict[str, int]]] = None
     error: Optional[str] = None
+
+class FindingChange(BaseModel):
+    check_id: str
+    resource_id: str
+    before: List[CheckResult]
+    after: List[CheckResult]
+
+class AuditDiffResponse(BaseModel):
+    from_audit_id: str
+    to_audit_id: str
+    account_id: str
+    new: List[CheckResult]
+    resolved: List[CheckResult]
+    changed: List[FindingChange]
+    # 한쪽 점검에서 실행되지 않았거나 끝까지 판정하지 못해(ERROR/TIMEOUT 등) 비교하지 않은 체크
+    skipped_checks: List[str]
+    summary: Dict[str, int]
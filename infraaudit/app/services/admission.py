@@ -0,0 +1,95 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict
+
+class AdmissionRejected(Exception):
+    """대기열이 가득 차 점검을 받을 수 없음 (retry_after초 후 재시도 권장)"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Audit queue is full. Retry after {retry_after} seconds")
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """프로세스 내 동시 점검 수와 대기열 길이 제한
+
+    실행 슬롯이 없으면 계정별 대기열에 넣고, 슬롯이 비면 계정을 번갈아(라운드 로빈) 가며 시작한다.
+    한 계정이 점검을 몰아서 요청해도 다른 계정의 점검이 그 뒤에 모두 밀리지 않는다.
+    이벤트 루프 스레드에서만 호출되므로 별도 잠금은 두지 않는다.
+    """
+
+    def __init__(self, max_running: int, max_queued: int, default_duration: float, smoothing: float = 0.3):
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.smoothing = smoothing
+        # 점검 1회 평균 실행 시간 (Retry-After 계산용, 기록이 없으면 default_duration)
+        self.average_duration = default_duration
+        self.rejected = 0
+        self._running: Dict[asyncio.Future, float] = {}
+        self._queues: 'OrderedDict[str, Deque[asyncio.Future]]' = OrderedDict()
+        self._queued = 0
+
+    def enqueue(self, account_id: str) -> asyncio.Future:
+        """실행 슬롯을 요청. 반환된 future가 완료되면 실행 가능. 대기열이 가득 차면 AdmissionRejected"""
+        ticket = asyncio.get_running_loop().create_future()
+        if len(self._running) < self.max_running and not self._queued:
+            self._grant(ticket)
+            return ticket
+        if self._queued >= self.max_queued:
+            self.rejected += 1
+            raise AdmissionRejected(self.retry_after())
+        self._queues.setdefault(account_id, deque()).append(ticket)
+        self._queued += 1
+        return ticket
+
+    def release(self, ticket: asyncio.Future) -> None:
+        """점검 종료(완료/실패/취소) 시 호출. 실행 중이면 슬롯을 반환하고, 대기 중이면 대기열에서 제거"""
+        if ticket in self._running:
+            duration = time.monotonic() - self._running.pop(ticket)
+            self.average_duration = self.smoothing * duration + (1 - self.smoothing) * self.average_duration
+            self._dispatch()
+        else:
+            # 대기 중 취소되면 태스크 취소와 함께 ticket도 이미 취소된 상태일 수 있음
+            if not ticket.done():
+                ticket.cancel()
+            for account_id, queue in list(self._queues.items()):
+                if ticket in queue:
+                    queue.remove(ticket)
+                    self._queued -= 1
+                    if not queue:
+                        del self._queues[account_id]
+                    break
+
+    def retry_after(self) -> int:
+        """대기열 앞쪽 점검이 모두 시작될 때까지의 예상 시간(초)"""
+        waves = (self._queued + 1) / max(self.max_running, 1)
+        return max(1, math.ceil(self.average_duration * waves))
+
+    def snapshot(self) -> Dict:
+        return {
+            'running': len(self._running),
+            'max_running': self.max_running,
+            'queued': self._queued,
+            'max_queued': self.max_queued,
+            'queued_accounts': len(self._queues),
+            'saturated': self._queued >= self.max_queued,
+            'rejected': self.rejected,
+            'retry_after_seconds': self.retry_after()
+        }
+
+    def _grant(self, ticket: asyncio.Future) -> None:
+        self._running[ticket] = time.monotonic()
+        ticket.set_result(None)
+
+    def _dispatch(self) -> None:
+        while len(self._running) < self.max_running and self._queues:
+            # 가장 앞의 계정에서 하나를 꺼내고, 남은 요청이 있으면 그 계정을 맨 뒤로 보냄
+            account_id, queue = next(iter(self._queues.items()))
+            ticket = queue.popleft()
+            self._queued -= 1
+            if queue:
+                self._queues.move_to_end(account_id)
+            else:
+                del self._queues[account_id]
+            self._grant(ticket)
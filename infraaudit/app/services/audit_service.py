@@ -1,7 +1,22 @@
+import asyncio
+import contextvars
+import os
+import tempfile
+import time
 import uuid
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List
-from app.core.aws_client import AWSClientManager
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+from app.core.aws_client import AWSClientManager, AuditSession
+from app.core.call_tracker import current_check
+from app.core.inventory import AuditInventory
+from app.services.admission import AdmissionController
+from app.services.check_history import CheckHistory
+from app.services.result_cache import CheckResultCache
+from app.services.result_index import VERDICT_STATUSES, ResultIndex, diff_indexes, normalize_status
+from app.core.serialization import loads
+from app.services.result_sink import ResultSink, SpillSink, SummarySink, iter_spilled_results
 from app.checks.ec2_checks import EC2IMDSv2Check, EC2AMIPrivateCheck, EBSSnapshotPrivateCheck, SecurityGroupRemoteAccessCheck
 from app.checks.s3_checks import S3PublicAccessAndPolicyCheck, S3ACLCheck, S3ReplicationRuleCheck, S3EncryptionCheck
 from app.checks.iam_checks import IAMTrustPolicyWildcardCheck, IAMIdPAssumeRoleCheck, IAMCrossAccountAssumeRoleCheck, IAMAccessKeyAgeCheck, IAMRootAccessKeyCheck, IAMMFACheck, IAMPassRoleWildcardResourceCheck
@@ -25,11 +40,52 @@ from app.checks.documentdb_check import DocumentDBSnapshotPrivateCheck, Document
 from app.checks.bedrock_checks import BedrockModelAccessCheck
 from app.checks.ses_checks import SESOverlyPermissiveCheck
 from app.checks.appstream_checks import AppStreamOverlyPermissiveCheck
+from app.checks.base_check import BaseCheck, RawRecord, StreamingCheck
+
+# assume_role 직후 인벤토리를 미리 조회하는 스레드 수
+PREFETCH_WORKERS = int(os.environ.get('AUDIT_PREFETCH_WORKERS', '8'))
+# 점검 1회에서 동시에 실행하는 체크 수
+CHECK_CONCURRENCY = int(os.environ.get('AUDIT_CHECK_CONCURRENCY', '8'))
+# 체크 하나의 최대 실행 시간 / 점검 전체 제한 시간 (초)
+CHECK_TIMEOUT = float(os.environ.get('AUDIT_CHECK_TIMEOUT', '300'))
+AUDIT_DEADLINE = float(os.environ.get('AUDIT_DEADLINE', '900'))
+# 프로세스에서 동시에 실행하는 점검 수 / 실행을 기다릴 수 있는 점검 수 (초과 시 429)
+MAX_CONCURRENT_AUDITS = int(os.environ.get('AUDIT_MAX_CONCURRENT', '4'))
+MAX_QUEUED_AUDITS = int(os.environ.get('AUDIT_MAX_QUEUED', '20'))
+# 점검 실행 시간 기록이 없을 때 Retry-After 계산에 쓰는 점검 1회 예상 시간(초)
+RETRY_AFTER = float(os.environ.get('AUDIT_RETRY_AFTER', '30'))
+# 체크 실행 스레드 수 (프로세스 전체). 시간 초과로 버려진 체크 스레드가 끝날 때까지 자리를 차지하므로 동시 실행 체크 수의 2배
+CHECK_WORKERS = int(os.environ.get('AUDIT_CHECK_WORKERS', str(MAX_CONCURRENT_AUDITS * CHECK_CONCURRENCY * 2)))
+# 계정/체크별 결과 재사용 시간(초). 0이면 캐시하지 않음
+RESULT_CACHE_TTL = float(os.environ.get('AUDIT_RESULT_CACHE_TTL', '300'))
+# 점검 1회의 AWS API 호출 예산 (요청에서 지정하지 않았을 때). 0이면 제한 없음
+MAX_API_CALLS = int(os.environ.get('AUDIT_MAX_API_CALLS', '0'))
+# spill 모드 점검의 결과/raw 기록 위치 (점검별 하위 디렉터리) / 파일에 내려 쓰기 전 쓰기 버퍼 크기(MB)
+# 버퍼 크기는 점검 전체 메모리 상한이 아님 (AUDIT_SPILL_MEMORY_MB는 이전 이름)
+SPILL_DIR = os.environ.get('AUDIT_SPILL_DIR') or os.path.join(tempfile.gettempdir(), 'infraaudit-spill')
+SPILL_BUFFER_SIZE = int(float(
+    os.environ.get('AUDIT_SPILL_BUFFER_MB') or os.environ.get('AUDIT_SPILL_MEMORY_MB', '16')
+) * 1024 * 1024)
 
 class AuditService:
     def __init__(self):
         self.aws_client_manager = AWSClientManager()
         self.audits: Dict[str, Dict] = {}
+        # 결과가 있는 점검(completed/partial/cancelled)의 (check_id, resource_id) 색인 (점검 간 비교용)
+        self.result_indexes: Dict[str, ResultIndex] = {}
+        # 실행 중인 점검의 태스크와 세션 (취소용)
+        self._running: Dict[str, Dict] = {}
+        self.admission = AdmissionController(MAX_CONCURRENT_AUDITS, MAX_QUEUED_AUDITS, RETRY_AFTER)
+        # (계정, 역할, external_id, 체크 집합) → 진행 중인 점검 ID (같은 요청은 새로 실행하지 않고 합류)
+        self._inflight: Dict[tuple, str] = {}
+        self.prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix='inventory-prefetch')
+        # 체크 전용 스레드 풀 (asyncio 기본 executor와 분리해 멈춘 체크가 다른 작업을 막지 않도록 함)
+        self.check_executor = ThreadPoolExecutor(max_workers=CHECK_WORKERS, thread_name_prefix='audit-check')
+        # 계정/체크별 실행 시간 기록 (다음 점검에서 오래 걸리는 체크부터 시작)
+        self.check_history = CheckHistory()
+        self.result_cache = CheckResultCache(RESULT_CACHE_TTL)
+        # 계정별 마지막 점검의 정책 분석 결과 ((analyzer, 문서 해시) → 결과). 내용이 같은 문서는 다음 점검에서 다시 분석하지 않음
+        self.policy_analyses: Dict[str, Dict[Tuple[str, str], object]] = {}
         
         self.check_registry = {
             'EC2IMDSv2Check': EC2IMDSv2Check,
@@ -73,54 +129,256 @@ class AuditService:
             'RDSSnapshotPublicAccessCheck': RDSSnapshotPublicAccessCheck,
         }
     
-    async def run_audit(self, account_id: str, role_name: str, checks: List[str] = None, external_id: str = None) -> Dict:
+    async def run_audit(self, account_id: str, role_name: str, checks: List[str] = None, external_id: str = None,
+                        check_timeout: Optional[float] = None, deadline: Optional[float] = None,
+                        wait: bool = True, force_refresh: bool = False, spill: bool = False,
+                        mode: str = 'full', max_api_calls: Optional[int] = None,
+                        api_call_limits: Optional[Dict[str, int]] = None, fail_only: bool = False) -> Dict:
+        """점검을 시작한다. wait=False면 현재 상태(queued/running)를 바로 반환하고 백그라운드에서 계속 진행
+
+        TTL 안에 같은 계정에서 실행된 체크는 결과 캐시를 사용한다 (force_refresh=True면 모두 다시 실행).
+        spill=True면 결과/raw를 메모리에 모으지 않고 디스크에 기록하며, 점검 기록에는 요약만 남긴다.
+        mode='summary'면 결과/raw 없이 요약과 체크별 상태 개수(check_counts)만 남긴다.
+        max_api_calls(점검 전체)/api_call_limits(서비스별)를 넘는 AWS 호출은 실패하고, 전체 예산을 다 쓰면 남은 체크는 실행하지 않는다.
+        fail_only=True면 fail_only_requires를 선언한 체크는 FAIL 대상만 서버 측 필터로 조회하고 PASS 결과를 만들지 않는다.
+        같은 계정/역할/external_id/체크 집합과 같은 실행 옵션의 점검이 진행 중이면 새로 실행하지 않고 그 점검의 ID와 결과를 공유한다.
+        실행 슬롯이 없으면 대기열에서 차례를 기다리며, 대기열이 가득 차면 AdmissionRejected를 발생시킨다.
+        """
+        checks_to_run = checks if checks else list(self.check_registry.keys())
+        check_names = list(dict.fromkeys(name for name in checks_to_run if name in self.check_registry))
+        call_budget = {'max_calls': max_api_calls or MAX_API_CALLS or None, 'service_limits': api_call_limits}
+        # 실행 옵션(캐시 무시, 기록 방식, 제한 시간, 호출 예산)이 다른 요청은 결과가 달라질 수 있으므로 합류하지 않음
+        key = (
+            account_id, role_name, external_id, frozenset(check_names), mode, force_refresh, spill, fail_only,
+            check_timeout or CHECK_TIMEOUT, deadline or AUDIT_DEADLINE,
+            call_budget['max_calls'], frozenset((api_call_limits or {}).items())
+        )
+        
+        audit_id = self._inflight.get(key)
+        if audit_id is None:
+            audit_id = self._start_audit(
+                key, check_names, check_timeout, deadline, force_refresh, spill, mode, call_budget, fail_only
+            )
+        running = self._running.get(audit_id)
+        
+        if not wait or running is None:
+            return self.audits[audit_id]
+        task = running['task']
+        try:
+            # 합류한 요청 중 하나의 연결이 끊겨도 공유 중인 점검은 취소되지 않도록 shield
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # DELETE로 취소된 점검은 취소 시점까지의 결과를 응답
+            if task.cancelled():
+                return self.audits[audit_id]
+            raise
+    
+    def _start_audit(self, key: tuple, check_names: List[str], check_timeout: Optional[float],
+                     deadline: Optional[float], force_refresh: bool, spill: bool, mode: str, call_budget: Dict,
+                     fail_only: bool) -> str:
+        account_id, role_name, external_id = key[:3]
+        # 대기열이 가득 찬 경우 점검 기록을 남기지 않고 바로 거절
+        ticket = self.admission.enqueue(account_id)
         audit_id = str(uuid.uuid4())
-        started_at = datetime.utcnow()
+        self.audits[audit_id] = {
+            'audit_id': audit_id,
+            'account_id': account_id,
+            'status': 'running' if ticket.done() else 'queued',
+            'started_at': datetime.utcnow()
+        }
+        task = asyncio.create_task(self._execute_audit(
+            audit_id, account_id, role_name, check_names, external_id, check_timeout, deadline, force_refresh, spill,
+            mode, call_budget, fail_only, ticket
+        ))
+        self._running[audit_id] = {'task': task, 'session': None, 'ticket': ticket, 'key': key}
+        self._inflight[key] = audit_id
+        task.add_done_callback(lambda finished: self._on_audit_done(audit_id, finished))
+        return audit_id
+    
+    async def cancel_audit(self, audit_id: str) -> Dict:
+        """실행 중인 점검 취소. 대기 중인 체크는 시작하지 않고, 실행 중인 체크의 이후 AWS 호출은 실패시킨다"""
+        running = self._running.get(audit_id)
+        if running is None:
+            return self.get_audit_status(audit_id)
+        if running['session'] is not None:
+            # 스레드는 강제 종료할 수 없으므로 먼저 호출을 막아 체크/선조회 스레드가 바로 끝나도록 함
+            running['session'].interrupt('점검 취소')
+        running['task'].cancel()
+        # 취소 처리(완료된 결과 기록)가 끝날 때까지 대기
+        await asyncio.wait({running['task']})
+        return self.audits[audit_id]
+    
+    def _on_audit_done(self, audit_id: str, task: asyncio.Task) -> None:
+        running = self._running.pop(audit_id, None)
+        if running is not None:
+            if self._inflight.get(running['key']) == audit_id:
+                del self._inflight[running['key']]
+            # 실행 슬롯 반환 (대기 중에 취소된 경우 대기열에서 제거) 후 다음 점검 시작
+            self.admission.release(running['ticket'])
+        if task.cancelled():
+            audit_data = self.audits[audit_id]
+            if audit_data['status'] in ('queued', 'running'):
+                # 실행이 시작되기 전(대기 중)에 취소된 경우
+                audit_data.update({'status': 'cancelled', 'completed_at': datetime.utcnow()})
+        else:
+            # 백그라운드 실행(wait=False)의 예외는 점검 기록(failed)으로만 남김
+            task.exception()
+    
+    async def _execute_audit(self, audit_id: str, account_id: str, role_name: str, check_names: List[str],
+                             external_id: Optional[str], check_timeout: Optional[float],
+                             deadline: Optional[float], force_refresh: bool, spill: bool, mode: str,
+                             call_budget: Dict, fail_only: bool, ticket: asyncio.Future) -> Dict:
+        started_at = self.audits[audit_id]['started_at']
+        # 실행 슬롯을 받을 때까지 대기 (제한 시간은 실행이 시작된 시점부터 계산)
+        await ticket
+        self.audits[audit_id]['status'] = 'running'
+        # 점검 전체 제한 시각 (assume_role 포함)
+        deadline_at = time.monotonic() + (deadline or AUDIT_DEADLINE)
+        prefetch = {}
+        session = None
+        # 취소되더라도 완료된 체크의 결과를 남길 수 있도록 호출 측에서 보관
+        outputs = {}
+        check_metrics = {}
+        sink = None
         
         try:
             credentials = self.aws_client_manager.assume_role(account_id, role_name, external_id)
-            session = self.aws_client_manager.get_session(credentials)
+            # 체크 스레드들이 공유하는 세션 (클라이언트 재사용, 체크별 API 호출 수 집계)
+            session = AuditSession(self.aws_client_manager.get_session(credentials), **call_budget)
+            self._running[audit_id]['session'] = session
+            # 체크 간 공유되는 인벤토리 (역할 목록 등은 점검 1회당 한 번만 조회)
+            previous_analyses = self.policy_analyses.get(account_id, {})
+            inventory = AuditInventory(session, previous_analyses)
             
-            results = []
-            raw_data = {}
-            guideline_ids = {}
-            checks_to_run = checks if checks else list(self.check_registry.keys())
+            # 스트리밍 체크의 결과는 만들어지는 즉시 sink로 전달 (실행 중 /status에서 진행 상황 확인 가능)
+            # summary/spill 모드에서는 모든 체크의 결과가 sink를 거쳐 개수만 세거나 디스크에 기록되고 outputs에는 guideline_id만 남음
+            summary_only = mode == 'summary'
+            if summary_only:
+                sink = SummarySink()
+            elif spill:
+                sink = SpillSink(os.path.join(SPILL_DIR, audit_id), SPILL_BUFFER_SIZE)
+            else:
+                sink = ResultSink()
             
-            for check_name in checks_to_run:
-                if check_name in self.check_registry:
-                    check_class = self.check_registry[check_name]
-                    check_instance = check_class(session)
-                    check_results = await check_instance.check()
-                    
-                    if isinstance(check_results, dict) and 'results' in check_results:
-                        for result in check_results['results']:
-                            result['check_id'] = check_name
-                        results.extend(check_results['results'])
-                        if 'raw' in check_results:
-                            raw_data[check_name] = check_results['raw']
-                        if 'guideline_id' in check_results:
-                            guideline_ids[check_name] = check_results['guideline_id']
-                    else:
-                        for result in check_results:
-                            result['check_id'] = check_name
-                        results.extend(check_results)
+            # 캐시된 체크 결과 사용 (assume_role은 캐시와 관계없이 수행해 요청자의 계정 접근 권한을 확인)
+            # 같은 계정이라도 역할/external_id가 다르면 권한이 다를 수 있으므로 주체 단위로 캐시
+            principal = (account_id, role_name, external_id)
+            # FAIL 대상만 조회하는 체크는 전체 결과와 섞이지 않도록 캐시를 읽지도 저장하지도 않음
+            narrowed = {
+                name for name in check_names if fail_only and self.check_registry[name].fail_only_requires is not None
+            }
+            cached = {} if force_refresh else self._cached_outputs(
+                principal, [name for name in check_names if name not in narrowed]
+            )
+            policy_documents = {}
+            for check_name, (entry, age) in cached.items():
+                outputs[check_name] = sink.absorb(check_name, entry['output'])
+                policy_documents.update(entry['policy_documents'])
+                check_metrics[check_name] = {
+                    'duration_seconds': 0.0, 'api_calls': 0, 'cached': True, 'cache_age_seconds': round(age, 1)
+                }
+            pending = [name for name in check_names if name not in cached]
+            
+            # 자격 증명을 받자마자 체크들이 선언한 데이터셋을 백그라운드에서 조회 시작 (기다리지 않음)
+            # 체크는 바로 시작하고, 아직 조회 중인 데이터셋은 인벤토리의 key별 잠금에서 완료를 기다린다
+            prefetch = self._prefetch_datasets(inventory, [self.check_registry[name] for name in pending], fail_only)
+            
+            self._running[audit_id].update({'sink': sink, 'outputs': outputs, 'check_total': len(check_names)})
+            await self._run_checks(
+                account_id, session, inventory, self._schedule(account_id, pending),
+                check_timeout or CHECK_TIMEOUT, deadline_at, outputs, check_metrics, sink, summary_only, narrowed
+            )
+            timed_out = [name for name, metrics in check_metrics.items() if metrics.get('timed_out')]
+            if timed_out:
+                # 제한 시간 이후에는 남은 선조회 스레드의 호출도 중단
+                self._stop_prefetch(session, prefetch, '점검 제한 시간 초과')
+            # 선조회도 점검 제한 시각까지만 기다림 (응답이 늦은 AWS 호출 하나가 점검을 제한 시간 뒤로 끌지 않도록)
+            # 끝나지 않은 데이터셋을 읽으려던 체크는 인벤토리 잠금에서 기다리다 이미 TIMEOUT 처리됨
+            unfinished = await self._await_prefetch(prefetch, deadline_at)
+            if unfinished:
+                self._stop_prefetch(session, prefetch, '점검 제한 시간 초과')
+                for check_name in pending:
+                    datasets = [name for name in self.check_registry[check_name].datasets(fail_only) if name in unfinished]
+                    if datasets and check_name in check_metrics:
+                        check_metrics[check_name]['unfinished_datasets'] = datasets
+            # 호출 예산 초과로 막힌 호출이 있거나 실행하지 못한 체크가 있으면 결과가 온전하지 않음
+            # (선조회에서 막힌 호출은 해당 데이터셋을 쓰는 체크의 오류로 반영됨)
+            budget_exceeded = bool(session.call_tracker.rejected) or any(
+                metrics.get('budget_exceeded') for metrics in check_metrics.values()
+            )
+            
+            results, raw_data, guideline_ids = self._collect_outputs(check_names, outputs)
+            
+            policy_documents.update(inventory.policies.documents())
+            analyses = inventory.policies.analyses()
+            if timed_out or budget_exceeded or cached:
+                # 이번 점검에서 보지 못한 문서의 결과도 유지 (전체를 다시 본 점검이면 사라진 문서의 결과는 버림)
+                analyses = {**previous_analyses, **analyses}
+            self.policy_analyses[account_id] = analyses
+            # summary/spill 모드에서는 메모리에 결과가 없으므로 캐시하지 않음
+            for check_name in ([] if isinstance(sink, SummarySink) else pending):
+                if check_name in narrowed:
+                    continue
+                metrics = check_metrics[check_name]
+                if not (metrics.get('timed_out') or metrics.get('budget_exceeded')) and self._cacheable(outputs[check_name]):
+                    # 캐시된 결과가 policy_hash로 참조하는 문서도 함께 보관 (같은 점검의 체크들이 dict 공유)
+                    self.result_cache.store(principal, check_name, {
+                        'output': outputs[check_name], 'policy_documents': policy_documents
+                    })
             
             audit_data = {
                 'audit_id': audit_id,
                 'account_id': account_id,
-                'status': 'completed',
+                # 시간 초과되거나 호출 예산을 넘은 체크가 있으면 나머지 결과만으로 완료 처리
+                'status': 'partial' if timed_out or budget_exceeded else 'completed',
                 'started_at': started_at,
                 'completed_at': datetime.utcnow(),
                 'results': results,
                 'raw': raw_data,
+                # raw/결과에서 policy_hash로 참조하는 정책 문서 원본 (중복 없이 한 번만 보관)
+                'policy_documents': policy_documents,
                 'guideline_ids': guideline_ids,
+                'check_metrics': check_metrics,
+                # 캐시에서 가져온 체크와 캐시된 결과의 경과 시간(초)
+                'cached_checks': {name: round(age, 1) for name, (_, age) in cached.items()},
+                # 이전 점검 결과를 재사용한 정책 문서 수 / 새로(또는 내용이 바뀌어) 분석한 문서 수
+                'incremental': {
+                    'reused_analyses': inventory.policies.reused,
+                    'new_analyses': inventory.policies.analyzed
+                },
                 'summary': self._generate_summary(results)
             }
+            self._finish_results(audit_data, check_names, outputs, sink)
+            # 서비스/작업별 AWS API 호출 수와 예산 사용 현황
+            audit_data['summary']['api_calls'] = session.call_tracker.report()
             
             self.audits[audit_id] = audit_data
             return audit_data
         
+        except asyncio.CancelledError:
+            self._stop_prefetch(session, prefetch, '점검 취소')
+            # 취소 전에 끝난 체크의 결과만 기록
+            results, raw_data, guideline_ids = self._collect_outputs(check_names, outputs)
+            audit_data = {
+                'audit_id': audit_id,
+                'account_id': account_id,
+                'status': 'cancelled',
+                'started_at': started_at,
+                'completed_at': datetime.utcnow(),
+                'results': results,
+                'raw': raw_data,
+                'guideline_ids': guideline_ids,
+                'check_metrics': check_metrics,
+                'summary': self._generate_summary(results)
+            }
+            self._finish_results(audit_data, check_names, outputs, sink)
+            if session is not None:
+                audit_data['summary']['api_calls'] = session.call_tracker.report()
+            self.audits[audit_id] = audit_data
+            raise
+        
         except Exception as e:
+            self._stop_prefetch(session, prefetch, '점검 실패')
             audit_data = {
                 'audit_id': audit_id,
                 'account_id': account_id,
@@ -131,23 +389,282 @@ class AuditService:
             self.audits[audit_id] = audit_data
             raise
     
+    def _finish_results(self, audit_data: Dict, check_names: List[str], outputs: Dict[str, object],
+                        sink: Optional[ResultSink]) -> None:
+        """결과 색인 생성. summary/spill 모드면 요약을 sink의 상태별 개수로 계산하고 결과 대신 체크별 개수/기록 위치를 남김"""
+        if not isinstance(sink, SummarySink):
+            self.result_indexes[audit_data['audit_id']] = self._result_index(audit_data['results'], audit_data['check_metrics'])
+            return
+        # 끝난 체크의 결과만 사용 (취소 시 실행 중이던 체크가 남긴 결과는 제외)
+        finished = [name for name in check_names if name in outputs]
+        audit_data.update({
+            'results': None,
+            'raw': None,
+            'summary': self._summarize_statuses(sink.status_counts(finished))
+        })
+        if isinstance(sink, SpillSink):
+            audit_data['spill'] = {'directory': sink.directory, 'checks': finished}
+        else:
+            audit_data['check_counts'] = {name: self._summarize_statuses(sink.status_counts([name])) for name in finished}
+    
+    @staticmethod
+    def _result_index(results: Iterable[Dict], check_metrics: Dict[str, Dict]) -> ResultIndex:
+        # 실행된 체크 기준으로 비교 (결과가 없는 체크도 포함, 끝까지 실행되지 못한 체크는 비교하지 않음)
+        incomplete = [
+            name for name, metrics in check_metrics.items()
+            if metrics.get('timed_out') or metrics.get('budget_exceeded')
+        ]
+        return ResultIndex(results, check_metrics.keys(), incomplete)
+    
+    def _cached_outputs(self, principal: tuple, check_names: List[str]) -> Dict[str, Tuple[Dict, float]]:
+        cached = {}
+        for check_name in check_names:
+            hit = self.result_cache.get(principal, check_name)
+            if hit is not None:
+                cached[check_name] = hit
+        return cached
+    
+    @staticmethod
+    def _cacheable(output: object) -> bool:
+        # 오류(권한 부족, 스로틀링 등. 'ERROR', '오류' 등 PASS/FAIL/WARN 외의 상태)가 포함된 결과는 다음 점검에서 다시 실행
+        # '양호'/'취약'처럼 한국어 상태를 내는 체크도 판정 결과이므로 표준 상태로 바꿔 확인
+        results = output['results'] if isinstance(output, dict) else output
+        return all(normalize_status(result.get('status')) in VERDICT_STATUSES for result in results)
+    
+    @staticmethod
+    def _collect_outputs(check_names: List[str], outputs: Dict[str, object]) -> Tuple[List[Dict], Dict, Dict[str, int]]:
+        """체크 출력을 실행 순서와 관계없이 요청한 체크 순서로 정리 (출력이 없는 체크는 제외)"""
+        results = []
+        raw_data = {}
+        guideline_ids = {}
+        for check_name in check_names:
+            if check_name not in outputs:
+                continue
+            check_results = outputs[check_name]
+            if isinstance(check_results, dict) and 'results' in check_results:
+                for result in check_results['results']:
+                    result['check_id'] = check_name
+                results.extend(check_results['results'])
+                if 'raw' in check_results:
+                    raw_data[check_name] = check_results['raw']
+                if 'guideline_id' in check_results:
+                    guideline_ids[check_name] = check_results['guideline_id']
+            else:
+                for result in check_results:
+                    result['check_id'] = check_name
+                results.extend(check_results)
+        return results, raw_data, guideline_ids
+    
+    def _prefetch_datasets(self, inventory: AuditInventory, check_classes: Iterable[Type[BaseCheck]],
+                           fail_only: bool = False) -> Dict[str, asyncio.Future]:
+        """체크가 선언한 데이터셋(BaseCheck.datasets)을 중복 없이 백그라운드 조회 시작. 많은 체크가 쓰는 데이터셋부터 조회"""
+        demand = Counter(name for check_class in check_classes for name in set(check_class.datasets(fail_only)))
+        loop = asyncio.get_running_loop()
+        # run_in_executor는 즉시 작업을 제출하므로 첫 체크가 이벤트 루프를 점유해도 조회는 진행됨
+        return {
+            name: loop.run_in_executor(self.prefetch_executor, inventory.dataset, name)
+            for name, _ in demand.most_common()
+        }
+    
+    @staticmethod
+    def _stop_prefetch(session: Optional[AuditSession], prefetch: Dict[str, asyncio.Future], reason: str) -> None:
+        """선조회 중단: 아직 시작하지 않은 조회는 취소하고, 실행 중인 조회 스레드의 이후 AWS 호출(재시도 포함)은 실패시킨다"""
+        if session is not None:
+            session.interrupt(reason)
+        for future in prefetch.values():
+            future.cancel()
+    
+    @staticmethod
+    async def _await_prefetch(prefetch: Dict[str, asyncio.Future], deadline_at: float) -> List[str]:
+        """선조회가 끝나기를 deadline_at까지 기다리고, 그때까지 끝나지 않은(중단된) 데이터셋 이름을 반환
+
+        미리 조회한 데이터셋의 실패는 해당 체크 결과에 이미 반영되므로 예외는 확인만 한다.
+        """
+        if not prefetch:
+            return []
+        done, _ = await asyncio.wait(prefetch.values(), timeout=max(deadline_at - time.monotonic(), 0))
+        for future in done:
+            if not future.cancelled():
+                future.exception()
+        return [name for name, future in prefetch.items() if future not in done or future.cancelled()]
+    
+    def _schedule(self, account_id: str, check_names: List[str]) -> List[str]:
+        """예상 실행 시간이 긴 체크부터 시작 (LPT). 계정별 기록이 없으면 체크 클래스의 cost_hint 사용"""
+        def expected_duration(check_name):
+            estimate = self.check_history.estimate(account_id, check_name)
+            return estimate if estimate is not None else self.check_registry[check_name].cost_hint
+        
+        return sorted(check_names, key=expected_duration, reverse=True)
+    
+    async def _run_checks(self, account_id: str, session: AuditSession, inventory: AuditInventory,
+                          order: List[str], check_timeout: float, deadline_at: float,
+                          outputs: Dict[str, object], check_metrics: Dict[str, Dict], sink: ResultSink,
+                          summary_only: bool = False, fail_only_checks: Iterable[str] = ()) -> None:
+        """order 순서대로 최대 CHECK_CONCURRENCY개의 체크를 각각 별도 스레드에서 실행
+
+        체크별 제한 시간(check_timeout)과 점검 제한 시각(deadline_at) 중 먼저 도달하는 시점에 체크를 중단하고
+        그때까지 만든 결과와 TIMEOUT 결과를 반환한다. 스레드는 강제 종료할 수 없으므로 이후 AWS 호출을 막아 스스로 끝나게 한다.
+        완료된 체크의 출력/지표는 outputs, check_metrics에 바로 기록한다 (취소 시에도 남도록).
+        summary_only면 get_result가 details를 버리고, summary_only를 확인하는 체크(IAM 신뢰 정책 스트리밍 체크)는 raw를 만들지 않는다
+        (나머지 체크의 raw는 sink가 버림. 개수를 반환하므로 모든 리소스는 끝까지 판정).
+        fail_only_checks에 포함된 체크는 FAIL 대상만 조회한다.
+        """
+        queue = deque(order)
+        loop = asyncio.get_running_loop()
+        
+        async def worker():
+            while queue:
+                check_name = queue.popleft()
+                check_instance = self.check_registry[check_name](session, inventory)
+                check_instance.summary_only = summary_only
+                check_instance.fail_only = check_name in fail_only_checks
+                timeout = min(check_timeout, deadline_at - time.monotonic())
+                if timeout <= 0:
+                    # 시작하기 전에 점검 제한 시간이 지난 체크
+                    outputs[check_name] = sink.absorb(
+                        check_name, self._timeout_output(check_instance, [], check_timeout, started=False)
+                    )
+                    check_metrics[check_name] = {'duration_seconds': 0.0, 'api_calls': 0, 'timed_out': True}
+                    continue
+                if session.call_tracker.exhausted:
+                    # 점검 전체 호출 예산을 다 쓴 뒤에는 남은 체크를 시작하지 않음 (호출마다 실패할 뿐이므로)
+                    outputs[check_name] = sink.absorb(check_name, {'results': [check_instance.get_result(
+                        'ERROR', 'N/A', "AWS API 호출 예산을 모두 사용해 체크를 실행하지 못했습니다.",
+                        {'max_api_calls': session.call_tracker.max_calls}
+                    )]})
+                    check_metrics[check_name] = {'duration_seconds': 0.0, 'api_calls': 0, 'budget_exceeded': True}
+                    continue
+                
+                started = time.perf_counter()
+                try:
+                    # 체크마다 컨텍스트를 복사해 current_check가 풀 스레드에 남지 않도록 함
+                    context = contextvars.copy_context()
+                    output = await asyncio.wait_for(
+                        loop.run_in_executor(
+                            self.check_executor, context.run, self._execute_check, check_name, check_instance, sink
+                        ),
+                        timeout
+                    )
+                    timed_out = False
+                except asyncio.TimeoutError:
+                    # 중단 시점까지 만든 결과만 사용하고, 체크 스레드의 이후 호출은 실패시켜 종료 유도
+                    if isinstance(check_instance, StreamingCheck):
+                        partial = sink.take(check_name)
+                    else:
+                        partial = list(check_instance.emitted_results)
+                    session.interrupt('체크 실행 시간 초과', check_name)
+                    output = self._timeout_output(check_instance, partial, timeout, started=True)
+                    timed_out = True
+                outputs[check_name] = sink.absorb(check_name, output)
+                
+                duration = time.perf_counter() - started
+                api_calls = session.call_tracker.calls_for(check_name)
+                rejected_calls = session.call_tracker.rejected_for(check_name)
+                if not rejected_calls:
+                    # 시간 초과도 최소 실행 시간으로 기록해 다음 점검에서 먼저 시작되도록 함 (예산으로 호출이 막힌 실행은 제외)
+                    self.check_history.record(account_id, check_name, duration, api_calls)
+                check_metrics[check_name] = {'duration_seconds': round(duration, 3), 'api_calls': api_calls}
+                if rejected_calls:
+                    # 호출 예산 초과로 일부 호출이 실패한 체크 (해당 리소스는 ERROR 등으로 결과에 반영됨)
+                    check_metrics[check_name].update({'budget_exceeded': True, 'rejected_calls': rejected_calls})
+                if timed_out:
+                    check_metrics[check_name]['timed_out'] = True
+        
+        await asyncio.gather(*(worker() for _ in range(min(CHECK_CONCURRENCY, len(order)))))
+    
+    @staticmethod
+    def _timeout_output(check_instance: BaseCheck, partial: List[Dict], timeout: float, started: bool) -> Dict:
+        if started:
+            message = f"체크 실행 시간이 제한({timeout:g}초)을 초과해 중단되었습니다. 중단 전까지의 결과 {len(partial)}건이 포함되어 있습니다."
+        else:
+            message = "점검 제한 시간이 지나 체크를 실행하지 못했습니다."
+        timeout_result = check_instance.get_result(
+            'TIMEOUT', 'N/A', message,
+            {'timeout_seconds': round(timeout, 3), 'partial_results': len(partial)}
+        )
+        return {'results': partial + [timeout_result]}
+    
+    @classmethod
+    def _execute_check(cls, check_name: str, check_instance: BaseCheck, sink: ResultSink):
+        # 체크 스레드: 이 스레드(컨텍스트)에서 발생한 AWS 호출을 체크 이름으로 집계
+        current_check.set(check_name)
+        if isinstance(check_instance, StreamingCheck):
+            return asyncio.run(cls._consume_stream(check_name, check_instance, sink))
+        return asyncio.run(check_instance.check())
+    
+    @staticmethod
+    async def _consume_stream(check_name: str, check_instance: StreamingCheck, sink: ResultSink) -> Dict:
+        async for item in check_instance.stream():
+            if isinstance(item, RawRecord):
+                sink.add_raw(check_name, item.data)
+            else:
+                sink.add_result(check_name, item)
+        return sink.output(check_name, check_instance.guideline_id)
+    
     def get_audit_status(self, audit_id: str) -> Dict:
         if audit_id not in self.audits:
             raise Exception(f"Audit {audit_id} not found")
-        return self.audits[audit_id]
+        audit = self.audits[audit_id]
+        running = self._running.get(audit_id)
+        if audit['status'] == 'running' and running is not None and 'sink' in running:
+            # 실행 중인 점검: 끝난 체크 수와 지금까지 만들어진 결과 수
+            return {**audit, 'progress': {
+                'checks_total': running['check_total'],
+                'checks_completed': len(running['outputs']),
+                'streamed_results': running['sink'].streamed
+            }}
+        return audit
+    
+    def diff_audits(self, from_audit_id: str, to_audit_id: str) -> Dict:
+        """같은 계정의 두 점검 결과 비교 (새로 생긴 / 해결된 / 바뀐 finding). 비교할 수 없으면 ValueError"""
+        before = self.get_audit_status(from_audit_id)
+        after = self.get_audit_status(to_audit_id)
+        if before['account_id'] != after['account_id']:
+            raise ValueError("Audits belong to different accounts")
+        indexes = []
+        for audit in (before, after):
+            index = self.result_indexes.get(audit['audit_id'])
+            if index is None and audit.get('spill'):
+                # spill 모드 점검은 색인을 유지하지 않고 비교할 때 디스크의 기록으로 만듦
+                spill = audit['spill']
+                index = self._result_index(
+                    (loads(line) for line in iter_spilled_results(spill['directory'], spill['checks'])),
+                    audit['check_metrics']
+                )
+            if index is None:
+                raise ValueError(f"Audit {audit['audit_id']} has no results (status: {audit['status']})")
+            indexes.append(index)
+        
+        diff = diff_indexes(*indexes)
+        diff.update({
+            'from_audit_id': from_audit_id,
+            'to_audit_id': to_audit_id,
+            'account_id': after['account_id'],
+            'summary': {
+                'new': len(diff['new']),
+                'resolved': len(diff['resolved']),
+                'changed': len(diff['changed'])
+            }
+        })
+        return diff
     
     def _generate_summary(self, results: List[Dict]) -> Dict:
+        return self._summarize_statuses(Counter(result['status'] for result in results))
+    
+    @staticmethod
+    def _summarize_statuses(statuses: Counter) -> Dict:
         summary = {
-            'total': len(results),
+            'total': sum(statuses.values()),
             'pass': 0,
             'fail': 0,
             'warn': 0,
-            'error': 0
+            'error': 0,
+            'timeout': 0
         }
         
-        for result in results:
-            status = result['status'].lower()
+        for status, count in statuses.items():
+            status = status.lower()
             if status in summary:
-                summary[status] += 1
+                summary[status] += count
         
         return summary
@@ -0,0 +1,44 @@
+import threading
+from typing import Dict, Optional
+
+class CheckHistory:
+    """계정/체크별 실행 시간과 API 호출 수 기록 (다음 점검의 실행 순서 결정에 사용)
+
+    실행 시간은 지수 이동 평균으로 유지해 한 번의 느린 실행(스로틀링 등)에 과하게 흔들리지 않도록 한다.
+    """
+
+    def __init__(self, smoothing: float = 0.5):
+        self.smoothing = smoothing
+        self._records: Dict[tuple, Dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, account_id: str, check_name: str, duration: float, api_calls: int) -> None:
+        key = (account_id, check_name)
+        with self._lock:
+            previous = self._records.get(key)
+            if previous is None:
+                average = duration
+                runs = 1
+            else:
+                average = self.smoothing * duration + (1 - self.smoothing) * previous['duration_seconds']
+                runs = previous['runs'] + 1
+            self._records[key] = {
+                'duration_seconds': average,
+                'last_duration_seconds': duration,
+                'api_calls': api_calls,
+                'runs': runs
+            }
+
+    def estimate(self, account_id: str, check_name: str) -> Optional[float]:
+        """예상 실행 시간(초). 기록이 없으면 None"""
+        with self._lock:
+            record = self._records.get((account_id, check_name))
+            return record['duration_seconds'] if record else None
+
+    def for_account(self, account_id: str) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                check_name: dict(record)
+                for (record_account, check_name), record in self._records.items()
+                if record_account == account_id
+            }
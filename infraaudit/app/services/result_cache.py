@@ -0,0 +1,40 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+class CheckResultCache:
+    """점검 주체/체크별 체크 출력 캐시 (TTL 동안 같은 주체로 다시 점검하면 AWS 호출 없이 재사용)
+
+    주체(principal)는 (계정, 역할, external_id)이다. 체크 결과는 assume한 역할의 권한에 따라 달라지므로
+    다른 역할로 만든 결과는 공유하지 않는다. 저장된 출력은 여러 점검 결과에서 공유되므로 읽기 전용으로 취급한다. ttl이 0 이하이면 캐시하지 않는다.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[tuple, Tuple[float, object]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, principal: tuple, check_name: str) -> Optional[Tuple[object, float]]:
+        """(체크 출력, 경과 시간(초)). 없거나 만료되었으면 None"""
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get((principal, check_name))
+            if entry is None:
+                return None
+            age = time.monotonic() - entry[0]
+            if age >= self.ttl:
+                del self._entries[(principal, check_name)]
+                return None
+            return entry[1], age
+
+    def store(self, principal: tuple, check_name: str, output: object) -> None:
+        if self.ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            # 만료된 항목 정리 (항목 수는 주체 수 x 체크 수 수준)
+            expired = [key for key, (stored_at, _) in self._entries.items() if now - stored_at >= self.ttl]
+            for key in expired:
+                del self._entries[key]
+            self._entries[(principal, check_name)] = (now, output)
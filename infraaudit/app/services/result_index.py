@@ -0,0 +1,83 @@
+import json
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# 조치가 필요한 결과(finding)로 보는 상태
+FINDING_STATUSES = ('FAIL', 'WARN')
+# 체크가 끝까지 판정한 결과의 상태. 그 밖의 상태(ERROR, TIMEOUT, '오류' 등)가 있는 체크는 해결 여부를 판단할 수 없음
+VERDICT_STATUSES = ('PASS', 'FAIL', 'WARN')
+# 일부 체크가 내보내는 한국어 상태 → 표준 상태 (응답의 상태는 그대로 두고 비교/캐시 판단에만 사용)
+LOCALIZED_STATUSES = {'양호': 'PASS', '취약': 'FAIL', '경고': 'WARN', '오류': 'ERROR'}
+
+def normalize_status(status: Optional[str]) -> Optional[str]:
+    return LOCALIZED_STATUSES.get(status, status)
+
+class ResultIndex:
+    """한 점검의 결과를 (check_id, resource_id) 기준으로 색인 (점검 간 비교용)
+
+    같은 key의 결과가 여러 건이면 함께 묶고, 상태/메시지/상세로 만든 지문으로 변경 여부를 비교한다.
+    checks는 점검에서 실행된 체크 이름이며 (문제가 없으면 결과를 내지 않는 체크도 비교 대상),
+    incomplete_checks는 시간 초과/호출 예산 초과 등으로 끝까지 실행되지 못한 체크다.
+    """
+
+    def __init__(self, results: Iterable[Dict], checks: Iterable[str] = (),
+                 incomplete_checks: Optional[Iterable[str]] = None):
+        self.results: Dict[Tuple[str, str], List[Dict]] = {}
+        self.checks: Set[str] = set(checks)
+        self.incomplete_checks: Set[str] = set(incomplete_checks or ())
+        for result in results:
+            check_id = result['check_id']
+            self.results.setdefault((check_id, result['resource_id']), []).append(result)
+            self.checks.add(check_id)
+            # 한국어 상태('양호', '취약')도 판정 결과로 보고 표준 상태로 비교
+            if normalize_status(result['status']) not in VERDICT_STATUSES:
+                self.incomplete_checks.add(check_id)
+
+        self.findings = {
+            key: results for key, results in self.results.items()
+            if any(normalize_status(result['status']) in FINDING_STATUSES for result in results)
+        }
+        self._fingerprints: Dict[Tuple[str, str], str] = {}
+
+    def fingerprint(self, key: Tuple[str, str]) -> str:
+        if key not in self._fingerprints:
+            # details는 레코드의 읽기 전용 mapping과 디스크에서 읽은 dict를 같게 취급
+            self._fingerprints[key] = json.dumps(sorted(
+                json.dumps(
+                    [normalize_status(r['status']), r['message'], dict(r.get('details') or {})], sort_keys=True, default=str
+                )
+                for r in self.results[key]
+            ))
+        return self._fingerprints[key]
+
+def diff_indexes(before: ResultIndex, after: ResultIndex) -> Dict:
+    """before → after 사이에 새로 생긴 / 해결된 / 바뀐 finding
+
+    두 점검 모두에서 끝까지 실행된 체크만 비교한다 (한쪽에서 실행되지 않았거나 PASS/FAIL/WARN(한국어 상태 포함) 외의 결과가 있는 체크는 skipped_checks).
+    """
+    comparable = (before.checks & after.checks) - before.incomplete_checks - after.incomplete_checks
+    skipped = sorted((before.checks | after.checks) - comparable)
+
+    new, resolved, changed = [], [], []
+    # finding이 있는 key만 보므로 PASS로 유지된 리소스는 비교하지 않음
+    for key in after.findings.keys() - before.findings.keys():
+        if key[0] in comparable:
+            new.extend(after.findings[key])
+    for key in before.findings.keys() - after.findings.keys():
+        if key[0] in comparable:
+            resolved.extend(before.findings[key])
+    for key in before.findings.keys() & after.findings.keys():
+        if key[0] in comparable and before.fingerprint(key) != after.fingerprint(key):
+            changed.append({
+                'check_id': key[0],
+                'resource_id': key[1],
+                'before': before.findings[key],
+                'after': after.findings[key]
+            })
+
+    order = lambda item: (item['check_id'], item['resource_id'])
+    return {
+        'new': sorted(new, key=order),
+        'resolved': sorted(resolved, key=order),
+        'changed': sorted(changed, key=order),
+        'skipped_checks': skipped
+    }
@@ -0,0 +1,209 @@
+import gzip
+import os
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from app.checks.result_record import CheckResultRecord
+from app.core.serialization import dumps, loads
+
+class ResultSink:
+    """체크가 내보낸 결과/raw 항목을 받는 곳 (점검 1회당 하나, 체크 스레드에서 호출)
+
+    기본 구현은 체크별로 메모리에 모아 두며, 체크가 끝나면 output()으로 기존 체크 출력 형식을 만든다.
+    """
+
+    def __init__(self):
+        self._results: Dict[str, List] = {}
+        self._raw: Dict[str, List] = {}
+        # 시간 초과로 부분 결과를 꺼낸 체크 (이후 스레드가 내보내는 항목은 버림)
+        self._closed = set()
+        self._lock = threading.Lock()
+        # 지금까지 받은 결과 수 (실행 중 점검의 진행 상황 표시용)
+        self.streamed = 0
+
+    def add_result(self, check_name: str, result: Any) -> None:
+        with self._lock:
+            if check_name in self._closed:
+                return
+            self._results.setdefault(check_name, []).append(result)
+            self.streamed += 1
+
+    def add_raw(self, check_name: str, entry: Any) -> None:
+        with self._lock:
+            if check_name not in self._closed:
+                self._raw.setdefault(check_name, []).append(entry)
+
+    def take(self, check_name: str) -> List:
+        """지금까지 받은 결과를 꺼내고 이후 항목은 받지 않음 (시간 초과로 중단된 체크의 부분 결과)"""
+        with self._lock:
+            self._closed.add(check_name)
+            self._raw.pop(check_name, None)
+            return self._results.pop(check_name, [])
+
+    def output(self, check_name: str, guideline_id: Optional[int]) -> Dict:
+        with self._lock:
+            output = {
+                'results': self._results.pop(check_name, []),
+                'raw': self._raw.pop(check_name, [])
+            }
+        if guideline_id is not None:
+            output['guideline_id'] = guideline_id
+        return output
+
+    def absorb(self, check_name: str, output: Any) -> Any:
+        """체크 출력(일반 체크의 list/dict 포함)을 보관 형태로 변환. 메모리 sink는 그대로 반환"""
+        return output
+
+class SummarySink(ResultSink):
+    """결과를 보관하지 않고 체크별 결과 상태 개수만 세는 sink (summary 모드). raw 항목은 버림"""
+
+    def __init__(self):
+        super().__init__()
+        # 체크별 결과 상태 개수 (요약용. 결과 자체는 메모리에 두지 않음)
+        self.statuses: Dict[str, Counter] = {}
+
+    def status_counts(self, check_names: List[str]) -> Counter:
+        """check_names에 해당하는 체크들의 결과 상태별 개수 합계"""
+        with self._lock:
+            return sum((self.statuses.get(name, Counter()) for name in check_names), Counter())
+
+    def add_result(self, check_name: str, result: Any) -> None:
+        with self._lock:
+            if check_name in self._closed:
+                return
+            self._count(check_name, result['status'])
+            self.streamed += 1
+
+    def add_raw(self, check_name: str, entry: Any) -> None:
+        pass
+
+    def take(self, check_name: str) -> List:
+        """이후 항목은 받지 않음. 결과는 보관하지 않으므로 빈 목록을 반환하고 지금까지 센 개수는 유지"""
+        with self._lock:
+            self._closed.add(check_name)
+        return []
+
+    def output(self, check_name: str, guideline_id: Optional[int]) -> Dict:
+        return self._marker(guideline_id)
+
+    def absorb(self, check_name: str, output: Any) -> Dict:
+        """일반 체크의 출력은 상태 개수만 세고, 결과 없이 guideline_id만 남긴 출력을 반환"""
+        results = output['results'] if isinstance(output, dict) else output
+        with self._lock:
+            for result in results:
+                self._count(check_name, result['status'])
+        return self._marker(output.get('guideline_id') if isinstance(output, dict) else None)
+
+    @staticmethod
+    def _marker(guideline_id: Optional[int]) -> Dict:
+        marker = {'results': []}
+        if guideline_id is not None:
+            marker['guideline_id'] = guideline_id
+        return marker
+
+    def _count(self, check_name: str, status: str) -> None:
+        # self._lock을 잡은 상태에서 호출
+        self.statuses.setdefault(check_name, Counter())[status] += 1
+
+class SpillSink(SummarySink):
+    """결과/raw 항목을 체크별 gzip JSONL 세그먼트 파일에 이어 쓰고, 메모리에는 상태별 개수만 유지
+
+    직렬화한 항목은 buffer_size 바이트까지만 쓰기 버퍼에 모았다가 파일에 내려 쓰며, 체크가 끝날 때도 그 체크의 버퍼를 비운다.
+    buffer_size는 이 쓰기 버퍼만 제한한다. 스트리밍 체크가 아닌 체크의 출력은 체크가 끝난 뒤 absorb()로 한꺼번에 들어오므로
+    체크 실행 중에는 그 체크의 결과/raw 전체가 메모리에 있다.
+    세그먼트는 버퍼를 비울 때마다 gzip member를 덧붙이는 방식이라 한 파일로 이어서 읽을 수 있다.
+    """
+
+    def __init__(self, directory: str, buffer_size: int):
+        super().__init__()
+        self.directory = directory
+        self.buffer_size = buffer_size
+        os.makedirs(directory, exist_ok=True)
+        self._buffers: Dict[Tuple[str, str], List[bytes]] = {}
+        self._buffered = 0
+
+    def path(self, kind: str, check_name: str) -> str:
+        return segment_path(self.directory, kind, check_name)
+
+    def add_result(self, check_name: str, result: Any) -> None:
+        with self._lock:
+            if check_name in self._closed:
+                return
+            self._write_result(check_name, result)
+            self.streamed += 1
+
+    def add_raw(self, check_name: str, entry: Any) -> None:
+        with self._lock:
+            if check_name not in self._closed:
+                self._append('raw', check_name, entry)
+
+    def take(self, check_name: str) -> List:
+        with self._lock:
+            self._closed.add(check_name)
+            self._flush(('results', check_name))
+            self._buffered -= sum(len(line) for line in self._buffers.pop(('raw', check_name), []))
+            taken = [loads(line) for line in read_segment(self.path('results', check_name))]
+            for kind in ('results', 'raw'):
+                if os.path.exists(self.path(kind, check_name)):
+                    os.remove(self.path(kind, check_name))
+            self.statuses.pop(check_name, None)
+            return taken
+
+    def output(self, check_name: str, guideline_id: Optional[int]) -> Dict:
+        with self._lock:
+            self._flush(('results', check_name))
+            self._flush(('raw', check_name))
+        return self._marker(guideline_id)
+
+    def absorb(self, check_name: str, output: Any) -> Dict:
+        """일반 체크의 출력도 세그먼트로 내려 쓰고, 결과 없이 guideline_id만 남긴 출력을 반환"""
+        results = output['results'] if isinstance(output, dict) else output
+        raw = output.get('raw', []) if isinstance(output, dict) else []
+        with self._lock:
+            for result in results:
+                self._write_result(check_name, result)
+            for entry in raw:
+                self._append('raw', check_name, entry)
+            self._flush(('results', check_name))
+            self._flush(('raw', check_name))
+        return self._marker(output.get('guideline_id') if isinstance(output, dict) else None)
+
+    def _write_result(self, check_name: str, result: Any) -> None:
+        # self._lock을 잡은 상태에서 호출. 응답과 같은 필드만 기록 (check_id는 등록 이름)
+        payload = {field: result.get(field) for field in CheckResultRecord.FIELDS}
+        payload['check_id'] = check_name
+        self._append('results', check_name, payload)
+        self._count(check_name, payload['status'])
+
+    def _append(self, kind: str, check_name: str, payload: Any) -> None:
+        line = dumps(payload)
+        self._buffers.setdefault((kind, check_name), []).append(line)
+        self._buffered += len(line)
+        if self._buffered > self.buffer_size:
+            for key in list(self._buffers):
+                self._flush(key)
+
+    def _flush(self, key: Tuple[str, str]) -> None:
+        lines = self._buffers.pop(key, None)
+        if not lines:
+            return
+        with gzip.open(self.path(*key), 'ab') as segment:
+            segment.write(b'\n'.join(lines) + b'\n')
+        self._buffered -= sum(len(line) for line in lines)
+
+def segment_path(directory: str, kind: str, check_name: str) -> str:
+    return os.path.join(directory, f'{kind}-{check_name}.jsonl.gz')
+
+def read_segment(path: str) -> Iterator[bytes]:
+    if not os.path.exists(path):
+        return
+    with gzip.open(path, 'rb') as segment:
+        for line in segment:
+            line = line.rstrip(b'\n')
+            if line:
+                yield line
+
+def iter_spilled_results(directory: str, check_names: List[str]) -> Iterator[bytes]:
+    """디스크에 기록된 결과(JSON bytes)를 체크 순서대로 한 줄씩 반환"""
+    for check_name in check_names:
+        yield from read_segment(segment_path(directory, 'results', check_name))
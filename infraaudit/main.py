@@ -32,7 +32,8 @@ app.include_router(audit.router, prefix="/api/audit", tags=["audit"])
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy"}
+    # 점검 실행/대기 현황 (saturated: 대기열이 가득 차 새 점검을 429로 거절 중)
+    return {"status": "healthy", "audits": audit.audit_service.admission.snapshot()}
 
 if __name__ == "__main__":
     import uvicorn